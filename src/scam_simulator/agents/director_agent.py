@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Optional
 from scam_simulator.prompts.loader import load_prompt
 
 
 from scam_simulator.config import Config
+from scam_simulator.orchestration.scenario import ScenarioEngine, ScenarioTracker, get_scenario_engine
 from scam_simulator.llm.providers import make_chat
+from scam_simulator.runtime import run_sync
+from scam_simulator.telemetry import annotate_usage, span
 
 
 class DirectorAgent:
@@ -13,16 +17,49 @@ class DirectorAgent:
     Directeur de scénario : ne parle pas à l'utilisateur, produit un objectif court.
     """
 
-    def __init__(self) -> None:
-        self.llm = make_chat(Config.MODEL_DIRECTOR or "gpt-4.1-mini", temperature=0.2)
+    def __init__(self, scenarios: Optional[ScenarioEngine] = None) -> None:
+        self.model = Config.MODEL_DIRECTOR or "gpt-4.1-mini"
+        self.llm = make_chat(self.model, temperature=0.2, cache=Config.LLM_CACHE_DIRECTOR, coalesce=True)
         self.system = load_prompt("director_system.txt")
+        # Scripts YAML : objectif direct quand le match est net, LLM seulement si ambigu
+        if scenarios is None and Config.SCENARIO_ENGINE:
+            scenarios = get_scenario_engine()
+        self.scenarios = scenarios
+        self.llm_calls = 0
+        self.script_hits = 0
 
-    def analyze(self, user_input: str) -> str:
-        prompt = (
+    def new_tracker(self) -> Optional[ScenarioTracker]:
+        return self.scenarios.tracker() if self.scenarios is not None else None
+
+    def _prompt(self, user_input: str) -> str:
+        return (
             f"{self.system}\n\n"
             "Analyse le message de l'arnaqueur et donne UN objectif court pour Jeanne.\n"
             "Format strict: une seule phrase (pas de markdown).\n\n"
             f"Message arnaqueur: {user_input}"
         )
-        msg = self.llm.invoke(prompt)
+
+    def from_script(self, user_input: str, tracker: Optional[ScenarioTracker] = None) -> Optional[str]:
+        """Objectif donné par le script YAML (sans LLM), ou None si le match n'est pas net."""
+        if tracker is None:
+            return None
+        with span("director.script") as sp:
+            objective = tracker.observe(user_input)
+            sp.set(matched=bool(objective), stage=tracker.stage)
+        if objective:
+            self.script_hits += 1
+        return objective
+
+    async def aanalyze(self, user_input: str, tracker: Optional[ScenarioTracker] = None) -> str:
+        objective = self.from_script(user_input, tracker)
+        if objective:
+            return objective
+
+        self.llm_calls += 1
+        with span("director.llm", model=self.model):
+            msg = await self.llm.ainvoke(self._prompt(user_input))
+            annotate_usage(msg)
         return (msg.content or "").strip() or "Rester confuse et demander de répéter."
+
+    def analyze(self, user_input: str, tracker: Optional[ScenarioTracker] = None) -> str:
+        return run_sync(self.aanalyze(user_input, tracker))
@@ -7,6 +7,8 @@ from typing import List
 
 from scam_simulator.config import Config
 from scam_simulator.llm.providers import make_chat
+from scam_simulator.runtime import run_sync
+from scam_simulator.telemetry import annotate_usage, span
 
 
 class ModeratorAgent:
@@ -15,12 +17,13 @@ class ModeratorAgent:
     """
 
     def __init__(self) -> None:
-        self.llm = make_chat(Config.MODEL_MODERATOR or "gpt-4.1-mini", temperature=0.3)
+        self.model = Config.MODEL_MODERATOR or "gpt-4.1-mini"
+        self.llm = make_chat(self.model, temperature=0.3, cache=Config.LLM_CACHE_MODERATOR, coalesce=True)
         self.system = load_prompt("moderator_system.txt")
 
-    def pick_three(self, proposals: List[str], context: str) -> List[str]:
+    def _prompt(self, proposals: List[str], context: str) -> str:
         proposals_txt = "\n".join([f"- {p}" for p in proposals]) or "- (aucune proposition)"
-        prompt = (
+        return (
             f"{self.system}\n\n"
             "Contexte actuel:\n"
             f"{context}\n\n"
@@ -29,9 +32,16 @@ class ModeratorAgent:
             "Tâche: garde uniquement les idées sûres et cohérentes, puis renvoie EXACTEMENT 3 choix.\n"
             "Format strict: 3 lignes, sans puces, sans numéros.\n"
         )
-        msg = self.llm.invoke(prompt)
+
+    async def apick_three(self, proposals: List[str], context: str) -> List[str]:
+        with span("moderator.llm", model=self.model, proposals=len(proposals)):
+            msg = await self.llm.ainvoke(self._prompt(proposals, context))
+            annotate_usage(msg)
         lines = [l.strip() for l in (msg.content or "").splitlines() if l.strip()]
         # fallback si le modèle fait n'importe quoi
         while len(lines) < 3:
             lines.append("La télé est trop forte")
         return lines[:3]
+
+    def pick_three(self, proposals: List[str], context: str) -> List[str]:
+        return run_sync(self.apick_three(proposals, context))
@@ -1,114 +1,392 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Optional, List
+import logging
+import time
+from contextlib import suppress
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, List, Set
 
 from langchain_core.messages import (
     SystemMessage,
     HumanMessage,
     ToolMessage,
     AIMessage,
+    AIMessageChunk,
     BaseMessage,
 )
-from langchain_openai import ChatOpenAI
-
-from langchain_mcp_adapters.client import MultiServerMCPClient
 
 from scam_simulator.config import Config
+from scam_simulator.llm.gateway import get_gateway
+from scam_simulator.llm.memory import ConversationMemory
+from scam_simulator.llm.providers import make_chat
 from scam_simulator.prompts.loader import load_prompt
+from scam_simulator.runtime import iterate_sync, run_sync
+from scam_simulator.telemetry import annotate_usage, emit_span, span
+from scam_simulator.tools.dispatch import ToolDispatcher, get_dispatcher
+from scam_simulator.tools.backends import Soundboard, make_soundboard
+from scam_simulator.tools.mcp_session import ToolSpec
+from scam_simulator.tools.schema_cache import load_tool_specs
+
+logger = logging.getLogger(__name__)
+
+OBJECTIVE_PREFIX = "OBJECTIF:"
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+
+class ObjectiveSplitter:
+    """
+    Mode fusionné (directeur + victime en un appel) : la sortie commence par « OBJECTIF: ... ».
+    Cette première ligne est retirée du flux affiché et gardée dans `objective`.
+    Ligne de texte plutôt que sortie structurée (JSON) : la réponse reste streamable token par token
+    et compatible avec le tool calling du même appel.
+    Si le modèle ne respecte pas le format, tout le texte passe tel quel (objective = None)
+    et l'appelant garde l'objectif du tour précédent.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self.done = False
+        self.objective: Optional[str] = None
+
+    def feed(self, chunk: str) -> str:
+        if self.done:
+            return chunk
+        self._buffer += chunk
+        head = self._buffer.lstrip()
+        if len(head) < len(OBJECTIVE_PREFIX):
+            if OBJECTIVE_PREFIX.startswith(head.upper()):
+                return ""  # encore ambigu : on attend la suite
+            return self._release()
+        if not head.upper().startswith(OBJECTIVE_PREFIX):
+            return self._release()
+        if "\n" not in head:
+            return ""
+        line, rest = head.split("\n", 1)
+        self.objective = line[len(OBJECTIVE_PREFIX):].strip() or None
+        self.done = True
+        return rest.lstrip()
+
+    def finish(self) -> str:
+        if self.done:
+            return ""
+        head = self._buffer.lstrip()
+        if head.upper().startswith(OBJECTIVE_PREFIX):
+            # sortie réduite à la ligne d'objectif
+            self.objective = head[len(OBJECTIVE_PREFIX):].strip() or None
+            self.done = True
+            return ""
+        return self._release()
+
+    def _release(self) -> str:
+        self.done = True
+        out, self._buffer = self._buffer, ""
+        return out
 
 
 class VictimAgent:
     """
     Victime (Jeanne Dubois) :
-    - Charge les tools via MCP (langchain-mcp-adapters) en stdio
-    - Le client démarre automatiquement le serveur MCP en subprocess (command + args)
+    - Charge les tools du soundboard via le backend Config.TOOL_BACKEND (in-process, MCP stdio ou HTTP)
+    - Le serveur MCP est lancé une fois puis gardé ouvert (SoundboardPool) pendant la vie de l'agent
     """
 
-    def __init__(self) -> None:
-        self.system_template = load_prompt("victim_system.txt")
+    def __init__(self, soundboard: Optional[Soundboard] = None) -> None:
+        # Prompt système statique (préfixe stable) ; objectif/audience dans un message à part, en fin
+        self.system_prompt = load_prompt("victim_system.txt")
+        self.context_template = load_prompt("victim_context.txt")
+        self.fused_template = load_prompt("victim_context_fused.txt")
+        # Mode fusionné : dernier objectif produit par la victime (None si absent de la sortie)
+        self.last_objective: Optional[str] = None
+        # Tools exécutés pendant le dernier tour (nom, args, sortie) : persistance des sessions
+        self.last_tool_calls: List[Dict[str, Any]] = []
 
-        self.llm = ChatOpenAI(
-            model=Config.MODEL_VICTIM or "gpt-4.1-mini",
+        self.model = Config.MODEL_VICTIM or "gpt-4.1-mini"
+        self.llm = make_chat(
+            self.model,
             temperature=0.6,
-            api_key=Config.OPENAI_API_KEY,
+            cache=Config.LLM_CACHE_VICTIM,
         )
 
-        self.history: List[BaseMessage] = []
-        self._tools_loaded = False
-        self._tools = []
-        self._tool_by_name = {}
-
-        # Client MCP (stdio) : le subprocess serveur sera lancé quand on récupère/appele les tools
-        self._mcp_client = MultiServerMCPClient(
-            {
-                "soundboard": {
-                    "transport": "stdio",
-                    "command": Config.MCP_SOUNDBOARD_COMMAND,
-                    "args": Config.MCP_SOUNDBOARD_ARGS,
-                }
-            }
+        # Mémoire bornée en tokens + résumé glissant (replié en arrière-plan)
+        self.memory = ConversationMemory(
+            summarizer=make_chat(Config.MODEL_SUMMARY or self.model, temperature=0.2),
         )
+        self._tools_loaded = False
+        self._tool_names: Set[str] = set()
+        # Pré-dispatch : contrainte audience -> tool exécuté avant le LLM (une fois par contrainte)
+        self.dispatcher: Optional[ToolDispatcher] = None
+        self._dispatched_constraint: Optional[str] = None
+        self._pending_dispatch: Optional[str] = None
+
+        # Sessions MCP persistantes : le serveur n'est contacté qu'au premier tool call (ou par awarm)
+        self._owns_soundboard = soundboard is None
+        self.soundboard = soundboard or make_soundboard()
+        self._warm: Optional[asyncio.Task] = None
+
+        # Schémas en cache disque : tools bindés dès la construction, sans handshake MCP
+        specs = load_tool_specs()
+        if specs is not None:
+            self._bind_tools(specs)
+
+    def _bind_tools(self, specs: List[ToolSpec]) -> None:
+        self._tool_names = {s.name for s in specs}
+        if Config.TOOL_PREDISPATCH:
+            self.dispatcher = get_dispatcher(specs)
+
+        # On “bind” les tools au modèle (tool calling)
+        self.llm = self.llm.bind_tools([s.to_openai() for s in specs])
+
+        self._tools_loaded = True
 
     async def _ensure_tools(self) -> None:
         if self._tools_loaded:
             return
-        tools = await self._mcp_client.get_tools()  # récupère les tools MCP convertis en tools LangChain
-        self._tools = tools
-        self._tool_by_name = {t.name: t for t in tools}
+        # serveur distant : un list_tools par agent (pas de cache disque, sa version n'est pas connue ici)
+        with span("victim.ensure_tools"):
+            specs = await self.soundboard.list_tools()
+        self._bind_tools(specs)
 
-        # On “bind” les tools au modèle (tool calling)
-        self.llm = self.llm.bind_tools(self._tools)
+    async def awarm(self) -> None:
+        """
+        Pré-chauffage (en tâche de fond, pendant que l'arnaqueur tape son premier message) :
+        session MCP ouverte, tools bindés, connexion HTTP vers le fournisseur LLM établie.
+        La construction reste instantanée ; sans awarm(), tout ceci se fait au premier tour.
+        """
+        with span("victim.warm") as sp:
+            try:
+                await self.soundboard.start()
+                await self._ensure_tools()
+            except Exception as exc:
+                # pas bloquant : le premier tool call relancera la session
+                logger.warning("Pré-chauffage MCP échoué: %r", exc)
+                sp.set(error=repr(exc))
+            if Config.LLM_BACKEND != "fake" and Config.LLM_GATEWAY:
+                sp.set(http=await get_gateway().awarm(Config.OPENAI_BASE_URL or DEFAULT_BASE_URL))
 
-        self._tools_loaded = True
+    def prewarm(self) -> None:
+        """awarm() en tâche de fond sur la boucle courante, sans l'attendre (annulée par aclose)."""
+        if self._warm is None:
+            self._warm = asyncio.ensure_future(self.awarm())
 
-    def respond(self, user_input: str, objective: str, constraint: Optional[str] = None) -> str:
-        # Load tools (1ère fois) — loop sync -> on encapsule async
-        asyncio.run(self._ensure_tools())
+    async def aclose(self) -> None:
+        if self._warm is not None and not self._warm.done():
+            self._warm.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._warm
+        if self._owns_soundboard:
+            await self.soundboard.aclose()
 
-        system_text = self.system_template.format(
+    def close(self) -> None:
+        run_sync(self.aclose())
+
+    def _build_messages(
+        self, user_input: str, objective: str, constraint: Optional[str], fused: bool = False
+    ) -> List[BaseMessage]:
+        template = self.fused_template if fused else self.context_template
+        context_text = template.format(
             dynamic_context=objective,
             audience_event=constraint or "Aucun"
         )
 
-        messages: List[BaseMessage] = [SystemMessage(content=system_text)]
-        messages.extend(self.history)
+        # [système + résumé] stable, puis historique, puis contexte du tour (seule partie qui bouge)
+        messages: List[BaseMessage] = [SystemMessage(content=self.system_prompt)]
+        messages.extend(self.memory.messages())
+        messages.append(SystemMessage(content=context_text))
         messages.append(HumanMessage(content=user_input))
+        return messages
+
+    async def _predispatch(
+        self, messages: List[BaseMessage], constraint: Optional[str], tools_gate: Optional[asyncio.Event] = None
+    ) -> bool:
+        """
+        Contrainte audience nouvelle et associée sans ambiguïté à un tool : le tool est exécuté
+        tout de suite et son résultat injecté (AIMessage tool_call + ToolMessage), ce qui évite
+        l'aller-retour LLM « décider d'appeler le tool ». Sinon rien ne change.
+        """
+        if self.dispatcher is None or not constraint or constraint == self._dispatched_constraint:
+            return False
+        name = self.dispatcher.match(constraint)
+        if name is None:
+            return False
+        call = {"name": name, "args": {}, "id": f"predispatch_{name}", "type": "tool_call"}
+        if tools_gate is not None:
+            await tools_gate.wait()
+        with span("tool.predispatch", tool=name):
+            tool_messages = await self._run_tool_calls([call])
+        messages.append(AIMessage(content="", tool_calls=[call]))
+        messages.extend(tool_messages)
+        self._pending_dispatch = constraint
+        return True
+
+    async def arespond(
+        self,
+        user_input: str,
+        objective: str,
+        constraint: Optional[str] = None,
+        fused: bool = False,
+        remember: bool = True,
+    ) -> str:
+        """
+        fused=True : un seul appel produit aussi l'objectif du tour (directeur intégré),
+        récupéré dans `last_objective` ; `objective` est alors l'objectif du tour précédent.
+        remember=False : brouillon (mode spéculatif), mémorisé plus tard via remember() s'il est gardé.
+        """
+        generation = self.memory.generation
+        await self._ensure_tools()
+        self.last_tool_calls = []
+        messages = self._build_messages(user_input, objective, constraint, fused)
+        await self._predispatch(messages, constraint)
+        splitter = ObjectiveSplitter() if fused else None
+        self.last_objective = None
 
         # 1) Appel du modèle (peut demander des tool calls MCP)
-        ai_msg: AIMessage = self.llm.invoke(messages)
+        with span("victim.first_call", model=self.model, fused=fused) as sp:
+            ai_msg: AIMessage = await self.llm.ainvoke(messages)
+            annotate_usage(ai_msg)
+            sp.set(tools=[c.get("name") for c in getattr(ai_msg, "tool_calls", None) or []])
         tool_calls = getattr(ai_msg, "tool_calls", None) or []
+        # texte du premier appel gardé même s'il demande des tools (comme astream_respond)
+        reply = splitter.feed(ai_msg.content or "") if splitter else (ai_msg.content or "")
 
         if tool_calls:
-            tool_messages: List[ToolMessage] = []
+            tool_messages = await self._run_tool_calls(tool_calls)
 
-            for call in tool_calls:
-                name = call.get("name")
-                args = call.get("args") or {}
-                tool = self._tool_by_name.get(name)
+            messages.append(ai_msg)
+            messages.extend(tool_messages)
 
-                if tool is None:
-                    output = f"[TOOL_ERROR: unknown_tool={name}]"
-                else:
-                    # tool MCP converti => invoke(args) déclenche une session MCP et appelle le serveur
-                    output = tool.invoke(args)
+            with span("victim.second_call", model=self.model):
+                final_msg: AIMessage = await self.llm.ainvoke(messages)
+                annotate_usage(final_msg)
+            reply += splitter.feed(final_msg.content or "") if splitter else (final_msg.content or "")
 
-                tool_messages.append(
-                    ToolMessage(content=str(output), tool_call_id=call.get("id", ""))
-                )
+        if splitter:
+            reply += splitter.finish()
+            self.last_objective = splitter.objective
+        if remember:
+            self._remember(user_input, reply, generation)
+        return reply
 
-            messages.append(ai_msg)
-            messages.extend(tool_messages)
+    async def astream_respond(
+        self,
+        user_input: str,
+        objective: str,
+        constraint: Optional[str] = None,
+        fused: bool = False,
+        remember: bool = True,
+        tools_gate: Optional[asyncio.Event] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Version streaming de arespond : yield les morceaux de texte au fil de la génération.
+        Si le modèle demande des tools, ils sont exécutés entre les deux appels puis on stream la suite.
+        En mode fusionné, la ligne « OBJECTIF: » n'est pas streamée (voir `last_objective`).
+        tools_gate : les tools (effets sonores) attendent cet événement, ex: brouillon spéculatif pas encore gardé.
+        """
+        generation = self.memory.generation
+        await self._ensure_tools()
+        self.last_tool_calls = []
+        messages = self._build_messages(user_input, objective, constraint, fused)
+        await self._predispatch(messages, constraint, tools_gate)
+        splitter = ObjectiveSplitter() if fused else None
+        self.last_objective = None
+        parts: List[str] = []
+
+        first: Optional[AIMessageChunk] = None
+        t0 = time.perf_counter()
+        async for chunk in self.llm.astream(messages):
+            first = chunk if first is None else first + chunk
+            text = splitter.feed(chunk.content) if splitter and chunk.content else chunk.content
+            if text:
+                parts.append(text)
+                yield text
 
-            final_msg: AIMessage = self.llm.invoke(messages)
-            self._remember(user_input, final_msg.content)
-            return final_msg.content
+        tool_calls = (getattr(first, "tool_calls", None) or []) if first is not None else []
+        emit_span("victim.first_call", time.perf_counter() - t0, model=self.model, stream=True, fused=fused, tools=[c.get("name") for c in tool_calls])
+        if tool_calls:
+            if tools_gate is not None:
+                await tools_gate.wait()
+            messages.append(first)
+            messages.extend(await self._run_tool_calls(tool_calls))
+            t0 = time.perf_counter()
+            async for chunk in self.llm.astream(messages):
+                text = splitter.feed(chunk.content) if splitter and chunk.content else chunk.content
+                if text:
+                    parts.append(text)
+                    yield text
+            emit_span("victim.second_call", time.perf_counter() - t0, model=self.model, stream=True)
+
+        if splitter:
+            tail = splitter.finish()
+            if tail:
+                parts.append(tail)
+                yield tail
+            self.last_objective = splitter.objective
+        if remember:
+            self._remember(user_input, "".join(parts), generation)
+
+    def stream_respond(
+        self, user_input: str, objective: str, constraint: Optional[str] = None, fused: bool = False
+    ) -> Iterator[str]:
+        return iterate_sync(self.astream_respond(user_input, objective, constraint, fused))
+
+    async def _call_tool(self, call: dict) -> str:
+        name = call.get("name")
+        args = call.get("args") or {}
+        if name not in self._tool_names:
+            return f"[TOOL_ERROR: unknown_tool={name}]"
+        try:
+            # un aller-retour sur la session MCP déjà ouverte
+            with span("tool", tool=name):
+                output = await asyncio.wait_for(self.soundboard.call_tool(name, args), Config.TOOL_CALL_TIMEOUT)
+        except asyncio.TimeoutError:
+            return f"[TOOL_ERROR: timeout={name}]"
+        except Exception as exc:
+            return f"[TOOL_ERROR: {name}: {exc!r}]"
+        return str(output)
+
+    async def _run_tool_calls(self, tool_calls: List[dict]) -> List[ToolMessage]:
+        """
+        Tool calls indépendants lancés en parallèle (latence = max, pas somme).
+        Résultats dans l'ordre des tool_call_id ; un tool lent/en échec -> [TOOL_ERROR: ...].
+        """
+        with span("tools.turn", tools=[c.get("name") for c in tool_calls]):
+            outputs = await asyncio.gather(*(self._call_tool(call) for call in tool_calls))
+        self.last_tool_calls.extend(
+            {"name": call.get("name"), "args": call.get("args") or {}, "output": output}
+            for call, output in zip(tool_calls, outputs)
+        )
+        return [
+            ToolMessage(content=output, tool_call_id=call.get("id", ""))
+            for call, output in zip(tool_calls, outputs)
+        ]
+
+    def respond(
+        self, user_input: str, objective: str, constraint: Optional[str] = None, fused: bool = False
+    ) -> str:
+        # Wrapper sync (CLI / Streamlit) : boucle asyncio partagée, pas de asyncio.run() par tour
+        return run_sync(self.arespond(user_input, objective, constraint, fused))
+
+    @property
+    def history(self) -> List[BaseMessage]:
+        return self.memory.messages()
+
+    def _remember(self, user_input: str, assistant_output: str, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self.memory.generation:
+            # tour annulé puis mémoire vidée / restaurée entre-temps : il n'appartient plus à la conversation
+            logger.info("Tour périmé non mémorisé (mémoire réinitialisée pendant le tour)")
+            return
+        self.memory.add_turn(user_input, assistant_output)
+        # le pré-dispatch ne compte qu'une fois le tour retenu (un brouillon spéculatif jeté le refera)
+        if self._pending_dispatch is not None:
+            self._dispatched_constraint, self._pending_dispatch = self._pending_dispatch, None
 
-        self._remember(user_input, ai_msg.content)
-        return ai_msg.content
+    def mark_dispatched(self, constraint: Optional[str]) -> None:
+        """Contrainte dont le tool a déjà été joué (ex: session reprise) : pas de nouveau pré-dispatch."""
+        self._dispatched_constraint = constraint
+        self._pending_dispatch = None
 
-    def _remember(self, user_input: str, assistant_output: str) -> None:
-        self.history.append(HumanMessage(content=user_input))
-        self.history.append(AIMessage(content=assistant_output))
-        if len(self.history) > 16:
-            self.history = self.history[-16:]
+    def remember(self, user_input: str, assistant_output: str, generation: Optional[int] = None) -> None:
+        """
+        Mémorise un tour produit hors arespond (ex: stream coupé par le guardrail).
+        generation : memory.generation au début du tour ; ignoré si la mémoire a été vidée depuis.
+        """
+        self._remember(user_input, assistant_output, generation)
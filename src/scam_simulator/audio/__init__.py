@@ -0,0 +1,3 @@
+"""
+Audio rendering (soundboard effects -> PCM/WAV timeline)
+"""
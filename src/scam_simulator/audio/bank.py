@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+import wave
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from scam_simulator.config import Config
+
+SAMPLE_RATE = 22050
+
+
+# -----------------------------
+# Samples de secours (synthèse déterministe si aucun WAV n'est fourni)
+# -----------------------------
+def _envelope(n: int, attack: float = 0.01, release: float = 0.1) -> np.ndarray:
+    env = np.ones(n, dtype=np.float32)
+    a, r = int(attack * SAMPLE_RATE), int(release * SAMPLE_RATE)
+    if a:
+        env[:a] = np.linspace(0, 1, a, dtype=np.float32)
+    if r:
+        env[-r:] = np.linspace(1, 0, r, dtype=np.float32)
+    return env
+
+
+def _tone(freq: float, seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE), dtype=np.float32) / SAMPLE_RATE
+    return np.sin(2 * np.pi * freq * t).astype(np.float32)
+
+
+def _noise(seconds: float, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).uniform(-1, 1, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def _doorbell() -> np.ndarray:
+    ding, dong = _tone(660, 0.6), _tone(523, 0.9)
+    return np.concatenate([ding * _envelope(len(ding), release=0.5), dong * _envelope(len(dong), release=0.8)]) * 0.6
+
+
+def _dog_bark() -> np.ndarray:
+    bark = (_noise(0.18, 1) * 0.5 + _tone(320, 0.18) * 0.5) * _envelope(int(0.18 * SAMPLE_RATE), 0.005, 0.12)
+    gap = np.zeros(int(0.25 * SAMPLE_RATE), dtype=np.float32)
+    return np.concatenate([bark, gap, bark, gap, bark]) * 0.8
+
+
+def _coughing_fit() -> np.ndarray:
+    cough = _noise(0.25, 2) * _envelope(int(0.25 * SAMPLE_RATE), 0.005, 0.2)
+    gap = np.zeros(int(0.35 * SAMPLE_RATE), dtype=np.float32)
+    return np.tile(np.concatenate([cough, gap]), 16) * 0.7  # ~10 s
+
+
+def _tv_background() -> np.ndarray:
+    seconds = 8.0
+    speech = _noise(seconds, 3) * 0.3
+    t = np.arange(len(speech), dtype=np.float32) / SAMPLE_RATE
+    modulation = (0.5 + 0.5 * np.sin(2 * np.pi * 3.0 * t)).astype(np.float32)
+    return speech * modulation + _tone(110, seconds) * 0.1
+
+
+SYNTHESIZERS: Dict[str, Callable[[], np.ndarray]] = {
+    "DOORBELL": _doorbell,
+    "DOG_BARKING": _dog_bark,
+    "COUGHING_FIT": _coughing_fit,
+    "TV_BACKGROUND_LOUD": _tv_background,
+}
+
+
+def decode_wav(data: bytes) -> np.ndarray:
+    """WAV PCM 16 bits -> float32 mono à SAMPLE_RATE (rééchantillonnage linéaire si besoin)."""
+    with wave.open(io.BytesIO(data)) as wav:
+        channels, rate, width = wav.getnchannels(), wav.getframerate(), wav.getsampwidth()
+        frames = wav.readframes(wav.getnframes())
+    if width != 2:
+        raise ValueError("Seuls les WAV PCM 16 bits sont supportés")
+    pcm = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        n = int(len(pcm) * SAMPLE_RATE / rate)
+        pcm = np.interp(np.linspace(0, len(pcm) - 1, n), np.arange(len(pcm)), pcm).astype(np.float32)
+    return pcm
+
+
+class SampleBank:
+    """
+    Banque d'effets décodés une seule fois :
+    - data/sounds/<EFFET>.wav si présent, sinon sample synthétisé
+    - converti en .npy dans le cache puis relu en memory-map (partagé entre process via le page cache)
+    """
+
+    def __init__(self, sounds_dir: Optional[str] = None, cache_dir: Optional[str] = None) -> None:
+        self.sounds_dir = Path(sounds_dir or Config.SOUNDS_DIR)
+        self.cache_dir = Path(cache_dir or Config.SOUNDS_CACHE_DIR)
+        self._samples: Dict[str, np.ndarray] = {}
+
+    def _decode(self, effect: str) -> np.ndarray:
+        wav = self.sounds_dir / f"{effect}.wav"
+        if wav.exists():
+            return decode_wav(wav.read_bytes())
+        synth = SYNTHESIZERS.get(effect)
+        if synth is None:
+            raise KeyError(f"Effet sonore inconnu: {effect}")
+        return synth()
+
+    def get(self, effect: str) -> np.ndarray:
+        sample = self._samples.get(effect)
+        if sample is not None:
+            return sample
+        npy = self.cache_dir / f"{effect}.npy"
+        wav = self.sounds_dir / f"{effect}.wav"
+        stale = npy.exists() and wav.exists() and wav.stat().st_mtime > npy.stat().st_mtime
+        if not npy.exists() or stale:
+            self._write_cache(npy, self._decode(effect))
+        sample = np.load(npy, mmap_mode="r")
+        self._samples[effect] = sample
+        return sample
+
+    def _write_cache(self, npy: Path, sample: np.ndarray) -> None:
+        # fichier temporaire du même dossier puis renommage atomique : un autre process
+        # ne peut pas memory-mapper un .npy à moitié écrit
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix=f".{npy.stem}-", suffix=".npy", delete=False) as tmp:
+            try:
+                np.save(tmp, sample.astype(np.float32))
+            except BaseException:
+                tmp.close()
+                Path(tmp.name).unlink(missing_ok=True)
+                raise
+        os.replace(tmp.name, npy)
+
+    def preload(self) -> None:
+        for effect in SYNTHESIZERS:
+            self.get(effect)
+
+    def __contains__(self, effect: str) -> bool:
+        return effect in SYNTHESIZERS or (self.sounds_dir / f"{effect}.wav").exists()
+
+
+@lru_cache(maxsize=1)
+def get_sample_bank() -> SampleBank:
+    """Banque partagée par toutes les sessions du process."""
+    bank = SampleBank()
+    bank.preload()
+    return bank
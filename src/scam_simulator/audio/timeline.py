@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import io
+import wave
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from scam_simulator.audio.bank import SAMPLE_RATE, SampleBank, get_sample_bank
+from scam_simulator.tools.effects import get_effect_registry
+
+# Débit de parole approximatif pour placer les effets d'un tour sur la timeline
+CHARS_PER_SECOND = 14.0
+
+
+@dataclass
+class AudioEvent:
+    effect: str
+    start: int  # en échantillons
+    gain: float = 1.0
+
+
+class Timeline:
+    """
+    Timeline PCM d'une conversation.
+    Les effets sont mixés par addition vectorisée de tranches NumPy ; seuls les nouveaux événements
+    sont mixés à chaque rendu. Mémoire bornée : le buffer ne garde que l'audio depuis le début du
+    dernier tour (les tours précédents ont déjà été joués) et le silence de fin n'est pas stocké.
+    """
+
+    def __init__(self, bank: Optional[SampleBank] = None) -> None:
+        self.bank = bank or get_sample_bank()
+        self.events: List[AudioEvent] = []  # événements pas encore mixés
+        self.cursor = 0  # position (échantillons) du prochain tour
+        self.origin = 0  # position absolue de _buffer[0] ; l'audio avant est abandonné
+        self._buffer = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        self._end = 0  # fin absolue de l'audio mixé
+
+    @property
+    def seconds(self) -> float:
+        return max(self._end, self.cursor) / SAMPLE_RATE
+
+    def add(self, effect: str, at: Optional[float] = None, gain: float = 1.0) -> AudioEvent:
+        start = self.cursor if at is None else int(at * SAMPLE_RATE)
+        event = AudioEvent(effect=effect, start=start, gain=gain)
+        self.events.append(event)
+        return event
+
+    def add_turn(self, reply: str, effects: Optional[List[str]] = None) -> int:
+        """
+        Place les effets d'un tour (tags [SOUND_EFFECT: X] de la réponse, ou liste fournie)
+        au début du tour, puis avance le curseur de la durée parlée estimée. Renvoie le début du tour.
+        """
+        turn_start = self.cursor
+        self._drop_before(turn_start)
+        names = effects if effects is not None else get_effect_registry().find(reply)
+        for name in names:
+            if name in self.bank:
+                self.add(name)
+        self.cursor += int(max(1.0, len(reply) / CHARS_PER_SECOND) * SAMPLE_RATE)
+        return turn_start
+
+    def _ensure_capacity(self, size: int) -> None:
+        if size <= len(self._buffer):
+            return
+        capacity = len(self._buffer)
+        while capacity < size:
+            capacity *= 2
+        grown = np.zeros(capacity, dtype=np.float32)
+        used = self._end - self.origin
+        grown[:used] = self._buffer[:used]
+        self._buffer = grown
+
+    def _mix(self) -> None:
+        for event in self.events:
+            sample = self.bank.get(event.effect)
+            start, end = max(event.start, self.origin), event.start + len(sample)
+            if end <= start:
+                continue  # entièrement avant la fenêtre
+            self._ensure_capacity(end - self.origin)
+            self._buffer[start - self.origin:end - self.origin] += sample[start - event.start:] * np.float32(event.gain)
+            self._end = max(self._end, end)
+        self.events = []
+
+    def _drop_before(self, position: int) -> None:
+        """Abandonne l'audio avant `position` (la fin d'un effet qui déborde est gardée)."""
+        self._mix()
+        kept = self._buffer[max(0, position - self.origin):max(0, self._end - self.origin)]
+        buffer = np.zeros(max(SAMPLE_RATE, len(kept)), dtype=np.float32)
+        buffer[:len(kept)] = kept
+        self._buffer = buffer
+        self.origin = position
+        self._end = max(self._end, position)
+
+    def render(self) -> np.ndarray:
+        """Mixe les nouveaux événements et renvoie la timeline depuis `origin` jusqu'au curseur (float32, non écrêtée)."""
+        self._mix()
+        pcm = self._buffer[: self._end - self.origin]
+        if self.cursor > self._end:
+            # silence de fin (durée parlée du dernier tour) : alloué seulement le temps du rendu
+            pcm = np.concatenate([pcm, np.zeros(self.cursor - self._end, dtype=np.float32)])
+        return pcm
+
+    def segment(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """Tranche [start, end) en positions absolues (rien avant `origin`)."""
+        stop = None if end is None else max(0, end - self.origin)
+        return self.render()[max(0, start - self.origin):stop]
+
+    def to_wav_bytes(self, start: int = 0, end: Optional[int] = None) -> bytes:
+        return encode_wav(self.segment(start, end))
+
+
+def encode_wav(pcm: np.ndarray) -> bytes:
+    """float32 -> WAV PCM 16 bits mono (écrêtage à -1..1 sur le segment seulement)."""
+    data = (np.clip(pcm, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(data)
+    return out.getvalue()
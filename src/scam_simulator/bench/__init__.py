@@ -0,0 +1,3 @@
+"""
+Benchmarks (exécutables hors-ligne : python -m scam_simulator.bench.<module>)
+"""
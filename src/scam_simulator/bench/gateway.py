@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from scam_simulator.config import Config
+from scam_simulator.llm.gateway import get_gateway
+from scam_simulator.llm.providers import make_chat, reset_llm_clients
+from scam_simulator.llm.stub_server import start_stub_server
+from scam_simulator.telemetry import percentile
+
+PROMPTS = [
+    "Bonjour madame, je suis du support technique Microsoft.",
+    "Votre ordinateur est infecté, il faut agir vite.",
+    "Cliquez sur le bouton en bas à gauche de l'écran.",
+    "Je vais vous guider, ne raccrochez surtout pas.",
+]
+
+
+async def run_mode(gateway: bool, requests: int, concurrency: int, unique: int) -> Dict[str, object]:
+    """`requests` appels ainvoke, `concurrency` en parallèle, `unique` prompts distincts (le reste = doublons)."""
+    Config.LLM_GATEWAY = gateway
+    reset_llm_clients()
+    llm = make_chat("stub-model", temperature=0.2, coalesce=True)
+    before = get_gateway().stats() if gateway else {}
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    sem = asyncio.Semaphore(concurrency)
+    group = max(1, requests // max(1, unique))  # requêtes consécutives identiques -> simultanées
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                n = i // group
+                await llm.ainvoke(f"{PROMPTS[n % len(PROMPTS)]} (#{n})")
+                latencies.append(time.perf_counter() - t0)
+            except Exception as exc:
+                errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    after = get_gateway().stats() if gateway else {}
+
+    return {
+        "mode": "gateway" if gateway else "direct",
+        "ok": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "gateway": {k: after[k] - before.get(k, 0) for k in after},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Gateway LLM contre un stub OpenAI local (latence + 429 injectés)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--unique", type=int, default=50, help="prompts distincts (doublons -> coalescence)")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--retry-after", type=float, default=0.05)
+    parser.add_argument("--out", default="data/logs/bench_gateway.json")
+    args = parser.parse_args(argv)
+
+    server = start_stub_server(latency=args.latency, error_rate=args.error_rate, retry_after=args.retry_after, seed=0)
+    Config.LLM_BACKEND = "openai"
+    Config.OPENAI_API_KEY = "stub"
+    Config.OPENAI_BASE_URL = server.base_url
+
+    report: Dict[str, object] = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "stub": vars(args), "modes": []}
+    try:
+        for gateway in (False, True):
+            stub_before = httpx.get(server.base_url.rsplit("/v1", 1)[0] + "/stats").json()
+            result = asyncio.run(run_mode(gateway, args.requests, args.concurrency, args.unique))
+            stub_after = httpx.get(server.base_url.rsplit("/v1", 1)[0] + "/stats").json()
+            result["stub"] = {
+                "requests": stub_after["requests"] - stub_before["requests"],
+                "rate_limited": stub_after["rate_limited"] - stub_before["rate_limited"],
+                "max_in_flight": stub_after["max_in_flight"],
+            }
+            report["modes"].append(result)
+    finally:
+        server.shutdown()
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
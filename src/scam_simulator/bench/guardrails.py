@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import string
+import time
+from typing import Dict, List, Optional
+
+from scam_simulator.guardrails import DEFAULT_KEYWORDS, GuardrailEngine
+
+SAMPLE = (
+    "Oh là là mon petit, attendez, je cherche mes lunettes sur le buffet. "
+    "Mon fils m'a dit de ne rien installer, c'est le bouton bleu ou le rouge ? "
+)
+
+
+def _random_keywords(n: int, rng: random.Random) -> List[str]:
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+        for _ in range(n)
+    ]
+
+
+def measure(rules: int, chars: int, chunk: int, rng: random.Random) -> Dict[str, float]:
+    engine = GuardrailEngine(DEFAULT_KEYWORDS + _random_keywords(rules, rng))
+    text = (SAMPLE * (chars // len(SAMPLE) + 1))[:chars]
+
+    t0 = time.perf_counter()
+    engine.scan(text)
+    full = time.perf_counter() - t0
+
+    guard = engine.stream()
+    t0 = time.perf_counter()
+    for i in range(0, len(text), chunk):
+        guard.feed(text[i:i + chunk])
+    guard.finish()
+    streamed = time.perf_counter() - t0
+
+    return {
+        "rules": rules + len(DEFAULT_KEYWORDS),
+        "chars": chars,
+        "full_scan_ns_per_char": round(full / chars * 1e9, 1),
+        "stream_ns_per_char": round(streamed / chars * 1e9, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Coût par caractère du guardrail selon le nombre de règles")
+    parser.add_argument("--rules", default="10,100,1000,10000")
+    parser.add_argument("--chars", type=int, default=20000)
+    parser.add_argument("--chunk", type=int, default=4, help="taille des morceaux du flux (~1 token)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    results = [measure(int(n), args.chars, args.chunk, rng) for n in args.rules.split(",")]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from scam_simulator.tools.backends import InProcessSoundboard
+from scam_simulator.tools.mcp_session import SoundboardPool, soundboard_connection
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def bench_stateless(calls: int, tool_name: str) -> List[float]:
+    """Ancien chemin : tools MCP sans session, un subprocess serveur par invoke."""
+    client = MultiServerMCPClient({"soundboard": soundboard_connection()})
+    tools = {t.name: t for t in await client.get_tools()}
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        await tools[tool_name].ainvoke({})
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+async def bench_persistent(calls: int, tool_name: str) -> List[float]:
+    """Nouveau chemin : session MCP ouverte une fois, un aller-retour JSON-RPC par appel."""
+    pool = SoundboardPool(health_interval=0)
+    await pool.start()
+    samples = []
+    try:
+        for _ in range(calls):
+            t0 = time.perf_counter()
+            await pool.call_tool(tool_name)
+            samples.append(time.perf_counter() - t0)
+    finally:
+        await pool.aclose()
+    return samples
+
+
+async def bench_inprocess(calls: int, tool_name: str) -> List[float]:
+    """TOOL_BACKEND=inprocess : fonctions FastMCP appelées directement, sans IPC."""
+    board = InProcessSoundboard()
+    await board.start()
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        await board.call_tool(tool_name)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+async def amain(calls: int, tool_name: str) -> Dict[str, object]:
+    stateless = await bench_stateless(calls, tool_name)
+    persistent = await bench_persistent(calls, tool_name)
+    inprocess = await bench_inprocess(calls, tool_name)
+    report = {
+        "tool": tool_name,
+        "stateless": _summary(stateless),
+        "persistent": _summary(persistent),
+        "inprocess": _summary(inprocess),
+    }
+    report["speedup_p50"] = round(report["stateless"]["p50_ms"] / max(report["persistent"]["p50_ms"], 1e-6), 1)
+    report["inprocess_speedup_p50"] = round(report["persistent"]["p50_ms"] / max(report["inprocess"]["p50_ms"], 1e-6), 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latence d'un tool call MCP : sans session vs session persistante vs in-process")
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--tool", default="doorbell")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(amain(args.calls, args.tool)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from scam_simulator.agents.moderator_agent import ModeratorAgent
+from scam_simulator.config import Config
+from scam_simulator.orchestration.premoderation import PreModerator
+
+IDEAS = [
+    "Quelqu'un sonne à la porte",
+    "Le chien aboie fort",
+    "Quinte de toux",
+    "La télé est trop forte",
+    "Le téléphone fixe sonne",
+    "Le chat renverse un vase",
+    "Le petit-fils arrive",
+    "Coupure de courant",
+]
+
+
+def _noisy(text: str, rng: random.Random) -> str:
+    """Variante d'une idée comme un spectateur la taperait (fautes, casse, ponctuation)."""
+    chars = list(text)
+    for _ in range(rng.randint(0, 2)):
+        chars[rng.randrange(len(chars))] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+    out = "".join(chars)
+    return rng.choice([out, out.upper(), out + " !!", out.lower()])
+
+
+def measure(audience: int, rng: random.Random) -> Dict[str, float]:
+    # distribution déséquilibrée : quelques idées très populaires, une longue traîne
+    weights = [1 / (i + 1) for i in range(len(IDEAS))]
+    proposals = [_noisy(rng.choices(IDEAS, weights)[0], rng) for _ in range(audience)]
+    premoderator = PreModerator()
+
+    t0 = time.perf_counter()
+    top = premoderator.top(proposals)
+    elapsed = time.perf_counter() - t0
+
+    moderator = ModeratorAgent()
+    return {
+        "audience": audience,
+        "premoderation_ms": round(elapsed * 1000, 2),
+        "kept": len(top),
+        "moderator_prompt_chars": len(moderator._prompt([c.representative for c in top], "")),
+        "raw_prompt_chars": len(moderator._prompt(proposals, "")),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pré-modération : coût et taille du prompt modérateur selon la taille de l'audience")
+    parser.add_argument("--audience", default="10,100,1000,10000")
+    args = parser.parse_args(argv)
+
+    Config.LLM_BACKEND = "fake"  # seul le prompt du modérateur est mesuré, aucun appel
+    rng = random.Random(0)
+    print(json.dumps([measure(int(n), rng) for n in args.audience.split(",")], indent=2))
+
+
+if __name__ == "__main__":
+    main()
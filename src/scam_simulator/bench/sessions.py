@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from scam_simulator.agents.director_agent import DirectorAgent
+from scam_simulator.agents.moderator_agent import ModeratorAgent
+from scam_simulator.agents.victim_agent import VictimAgent
+from scam_simulator.bench.turns import configure_offline
+from scam_simulator.llm.providers import reset_llm_clients
+from scam_simulator.orchestration.state import SimulationState
+from scam_simulator.orchestration.turn import aplay_turn
+from scam_simulator.tools.mcp_session import SoundboardPool
+
+
+def rss_mb() -> float:
+    """RSS courant (Linux /proc), sinon pic RSS via getrusage."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            pages = int(fh.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 1e6, 2)
+    except OSError:
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3, 2)
+
+
+def open_fds() -> int:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+async def run(mode: str, sessions: int, step: int) -> List[Dict[str, object]]:
+    """
+    Ouvre `sessions` sessions (une par opérateur Streamlit) et relève RSS / fds tous les `step`.
+    shared   : directeur, modérateur, clients LLM, gateway et serveur MCP partagés (resources.py)
+    isolated : ancien comportement, tout est reconstruit par session (clients LLM, gateway et pool HTTP,
+               un subprocess MCP chacune)
+    Les agents de chaque session restent référencés jusqu'à la fin, comme dans une session Streamlit ouverte.
+    """
+    shared_pool = SoundboardPool(health_interval=0) if mode == "shared" else None
+    shared_director = DirectorAgent() if mode == "shared" else None
+    shared_moderator = ModeratorAgent() if mode == "shared" else None
+    victims: List[VictimAgent] = []
+    agents: List[Tuple[DirectorAgent, ModeratorAgent]] = []
+    samples: List[Dict[str, object]] = [{"sessions": 0, "rss_mb": rss_mb(), "fds": open_fds()}]
+
+    try:
+        for i in range(1, sessions + 1):
+            if mode == "shared":
+                director, moderator = shared_director, shared_moderator
+                victim = VictimAgent(soundboard=shared_pool)
+            else:
+                reset_llm_clients()  # clients et gateway propres à la session
+                director, moderator, victim = DirectorAgent(), ModeratorAgent(), VictimAgent()
+            victims.append(victim)
+            agents.append((director, moderator))
+            state = SimulationState()
+            state.scenario = director.new_tracker()
+            state.audience_constraint = "Le chien aboie fort"
+            await aplay_turn("Bonjour madame, je suis du support technique Microsoft.", state, victim, director)
+            if i % step == 0 or i == sessions:
+                samples.append({"sessions": i, "rss_mb": rss_mb(), "fds": open_fds()})
+    finally:
+        await asyncio.gather(*(v.aclose() for v in victims), return_exceptions=True)
+        if shared_pool is not None:
+            await shared_pool.aclose()
+    return samples
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Test de charge : mémoire et descripteurs ouverts selon le nombre de sessions")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--step", type=int, default=10, help="relevé tous les N sessions")
+    parser.add_argument("--modes", default="shared,isolated")
+    parser.add_argument("--out", default="data/logs/bench_sessions.json")
+    args = parser.parse_args(argv)
+
+    configure_offline(latency=0.0, scenario=True)
+    report: Dict[str, object] = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "modes": {}}
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        report["modes"][mode] = asyncio.run(run(mode, args.sessions, args.step))
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+# modules d'entrée : config seul, CLI (main), boucle CLI, ressources Streamlit, victime
+MODULES = [
+    "scam_simulator.config",
+    "scam_simulator.main",
+    "scam_simulator.orchestration.loop",
+    "scam_simulator.resources",
+    "scam_simulator.agents.victim_agent",
+]
+PROMPT = b"Arnaqueur > "
+# mot-clé "chien" : le modèle fake appelle dog_bark -> la session MCP est nécessaire dès le premier tour
+MESSAGE = b"Vous entendez le chien ? Donnez-moi votre code de carte."
+
+
+def _importtime(code: str) -> List[Tuple[int, int, str]]:
+    """Lignes de `python -X importtime` : (temps propre µs, cumulé µs, module)."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (p.strip() for p in line[len("import time:"):].split("|"))
+        rows.append((int(self_us), int(cumulative_us), name))
+    return rows
+
+
+def import_profile(module: str, baseline: Set[str]) -> Tuple[float, Dict[str, float]]:
+    """Total (ms) et temps propre par paquet de premier niveau, hors modules chargés par l'interpréteur seul."""
+    total = 0.0
+    packages: Dict[str, float] = defaultdict(float)
+    for self_us, cumulative_us, name in _importtime(f"import {module}"):
+        if name in baseline:
+            continue
+        packages[name.split(".")[0]] += self_us / 1000
+        if name == module:
+            total = cumulative_us / 1000
+    return total, packages
+
+
+def measure_import(module: str, runs: int, top: int) -> Dict[str, object]:
+    baseline = {name for _, _, name in _importtime("pass")}
+    totals = []
+    packages: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(runs):
+        total, per_package = import_profile(module, baseline)
+        totals.append(total)
+        for name, ms in per_package.items():
+            packages[name].append(ms)
+    heaviest = sorted(((statistics.median(v), k) for k, v in packages.items()), reverse=True)[:top]
+    return {
+        "module": module,
+        "import_ms_p50": round(statistics.median(totals), 1),
+        "top_packages_ms": {k: round(ms, 1) for ms, k in heaviest},
+    }
+
+
+def _read_until(fd: int, marker: bytes, timeout: float) -> None:
+    buffer = b""
+    deadline = time.monotonic() + timeout
+    while marker not in buffer:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{marker!r} non reçu")
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            raise EOFError("CLI terminée avant le prompt")
+        buffer += chunk
+
+
+def measure_cli(prewarm: bool, think: float, tool_backend: str) -> Dict[str, object]:
+    """
+    CLI réelle (modèle fake, hors-ligne) : délai avant le premier prompt, puis délai de la première réponse
+    quand le message arrive `think` secondes plus tard (temps de saisie, mis à profit par le pré-chauffage).
+    """
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY") or "bench",
+        LLM_BACKEND="fake",
+        TOOL_BACKEND=tool_backend,
+        PREWARM="1" if prewarm else "0",
+        SESSIONS_ENABLED="0",
+        TRACE_ENABLED="0",
+    )
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "scam_simulator.main"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env,
+    )
+    try:
+        fd = proc.stdout.fileno()
+        _read_until(fd, PROMPT, 60)
+        first_prompt = time.perf_counter() - t0
+        time.sleep(think)
+        t1 = time.perf_counter()
+        proc.stdin.write(MESSAGE + b"\n")
+        proc.stdin.flush()
+        _read_until(fd, PROMPT, 60)
+        first_reply = time.perf_counter() - t1
+        proc.stdin.write(b"quit\n")
+        proc.stdin.flush()
+        proc.wait(30)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+    return {
+        "prewarm": prewarm,
+        "tool_backend": tool_backend,
+        "think_s": think,
+        "first_prompt_ms": round(first_prompt * 1000, 1),
+        "first_reply_ms": round(first_reply * 1000, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Démarrage à froid : coût des imports et délai du premier prompt / de la première réponse")
+    parser.add_argument("--modules", default=",".join(MODULES))
+    parser.add_argument("--runs", type=int, default=3, help="processus neufs par module (médiane)")
+    parser.add_argument("--top", type=int, default=8, help="paquets les plus coûteux affichés")
+    parser.add_argument("--think", type=float, default=3.0, help="secondes avant l'envoi du premier message")
+    parser.add_argument("--tool-backend", default="stdio", choices=["inprocess", "stdio", "http"])
+    parser.add_argument("--no-cli", action="store_true", help="imports seulement")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, object] = {
+        "imports": [measure_import(m, args.runs, args.top) for m in args.modules.split(",")],
+    }
+    if not args.no_cli:
+        results["cli"] = [measure_cli(prewarm, args.think, args.tool_backend) for prewarm in (False, True)]
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
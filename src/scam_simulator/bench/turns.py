@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import time
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from scam_simulator.agents.director_agent import DirectorAgent
+from scam_simulator.agents.moderator_agent import ModeratorAgent
+from scam_simulator.agents.victim_agent import VictimAgent
+from scam_simulator.config import Config
+from scam_simulator.orchestration.state import SimulationState
+from scam_simulator.orchestration.turn import aplay_turn
+from scam_simulator.telemetry import StageRecorder, percentile, recording
+from scam_simulator.tools.backends import make_soundboard
+
+SCAMMER_LINES = [
+    "Bonjour madame, je suis du support technique Microsoft.",
+    "Votre ordinateur est infecté, il faut agir vite.",
+    "Cliquez sur le bouton en bas à gauche de l'écran.",
+    "Je vais vous guider, ne raccrochez surtout pas.",
+]
+# Un tour sur deux avec une contrainte audience -> le modèle local déclenche un tool MCP
+CONSTRAINTS = [None, "Le chien aboie fort", None, "Quelqu'un sonne à la porte"]
+
+
+def _package_version() -> str:
+    try:
+        return version("scam-simulator")
+    except PackageNotFoundError:
+        return "dev"
+
+
+def configure_offline(latency: float, scenario: bool) -> None:
+    # Avant toute construction d'agent : modèle local, pas de cache (on mesure de vrais appels)
+    Config.LLM_BACKEND = "fake"
+    Config.FAKE_LLM_LATENCY = latency
+    Config.LLM_CACHE_DIRECTOR = False
+    Config.LLM_CACHE_MODERATOR = False
+    Config.LLM_CACHE_VICTIM = False
+    Config.SCENARIO_ENGINE = scenario
+
+
+async def measure_cold_start() -> Dict[str, float]:
+    """
+    Coût de construction des agents, du premier _ensure_tools (nul si les schémas sont en cache)
+    et du premier tool call (lancement paresseux du serveur MCP).
+    """
+    t0 = time.perf_counter()
+    victim = VictimAgent()
+    t1 = time.perf_counter()
+    DirectorAgent()
+    ModeratorAgent()
+    t2 = time.perf_counter()
+    await victim._ensure_tools()
+    t3 = time.perf_counter()
+    await victim.soundboard.call_tool("doorbell")
+    t4 = time.perf_counter()
+    await victim.aclose()
+    return {
+        "victim_construct_ms": round((t1 - t0) * 1000, 3),
+        "director_moderator_construct_ms": round((t2 - t1) * 1000, 3),
+        "first_ensure_tools_ms": round((t3 - t2) * 1000, 3),
+        "first_tool_call_ms": round((t4 - t3) * 1000, 3),
+    }
+
+
+async def run_level(concurrency: int, turns: int, mode: str = "separate") -> Dict[str, object]:
+    """`concurrency` conversations en parallèle, `turns` tours chacune, étapes chronométrées."""
+    director = DirectorAgent()
+    soundboard = make_soundboard(health_interval=0)
+    await soundboard.start()
+    recorder = StageRecorder()
+    turn_latencies: List[float] = []
+
+    async def conversation() -> None:
+        victim = VictimAgent(soundboard=soundboard)
+        state = SimulationState()
+        state.scenario = director.new_tracker()
+        for i in range(turns):
+            state.audience_constraint = CONSTRAINTS[i % len(CONSTRAINTS)]
+            t0 = time.perf_counter()
+            await aplay_turn(SCAMMER_LINES[i % len(SCAMMER_LINES)], state, victim, director, mode=mode)
+            turn_latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    try:
+        with recording(recorder):
+            await asyncio.gather(*(conversation() for _ in range(concurrency)))
+    finally:
+        await soundboard.aclose()
+    elapsed = time.perf_counter() - started
+    # allers-retours LLM séquentiels : directeur (hors script) + 1er appel victime + 2e si tool call
+    round_trips = sum(len(recorder.samples.get(n, [])) for n in ("director.llm", "victim.first_call", "victim.second_call"))
+
+    return {
+        "director_mode": mode,
+        "concurrency": concurrency,
+        "turns": len(turn_latencies),
+        "turns_per_second": round(len(turn_latencies) / elapsed, 2),
+        "llm_round_trips_per_turn": round(round_trips / max(1, len(turn_latencies)), 2),
+        "turn": {
+            "p50_ms": round(percentile(turn_latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(turn_latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(turn_latencies, 99) * 1000, 3),
+        },
+        "stages": recorder.summary(),
+    }
+
+
+async def amain(levels: List[int], turns: int, modes: List[str]) -> Dict[str, object]:
+    report: Dict[str, object] = {
+        "package_version": _package_version(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "llm_latency_s": Config.FAKE_LLM_LATENCY,
+        "scenario_engine": Config.SCENARIO_ENGINE,
+        "cold_start": await measure_cold_start(),
+        "levels": [],
+    }
+    for mode in modes:
+        for level in levels:
+            report["levels"].append(await run_level(level, turns, mode))
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hors-ligne : latence par étape d'un tour (LLM local + vrai serveur MCP)")
+    parser.add_argument("--levels", default="1,4,16", help="niveaux de concurrence (conversations simultanées)")
+    parser.add_argument("--turns", type=int, default=8, help="tours par conversation")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence simulée d'un appel LLM (s)")
+    parser.add_argument("--scenario", action="store_true", help="laisser le moteur de scripts court-circuiter le directeur")
+    parser.add_argument("--modes", default="separate,fused,speculative", help="modes directeur comparés (Config.DIRECTOR_MODE)")
+    parser.add_argument("--out", default="data/logs/bench_turns.json")
+    args = parser.parse_args(argv)
+
+    configure_offline(args.latency, args.scenario)
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    report = asyncio.run(amain(levels, args.turns, modes))
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+from scam_simulator.orchestration.votes import VoteServer
+
+CHOICES = ["Quelqu'un sonne à la porte", "Le chien aboie fort", "Quinte de toux"]
+
+
+def _serve(port: int, ready: "mp.synchronize.Event") -> None:
+    async def run() -> None:
+        server = VoteServer("127.0.0.1", port)
+        await server.start()
+        server.open(CHOICES, duration=3600)
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+async def _connection(port: int, voters: range, depth: int, batch: int, duplicates: float) -> int:
+    """Une connexion keep-alive : `depth` requêtes pipelinées par écriture (ou des lots de `batch` votes)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    ids = list(voters)
+    ids += ids[: int(len(ids) * duplicates)]  # re-votes : doivent être ignorés par le service
+    if batch > 1:
+        requests = []
+        for i in range(0, len(ids), batch):
+            body = "".join(f"v{v},{v % 3}\n" for v in ids[i:i + batch]).encode()
+            requests.append(b"POST /votes HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+    else:
+        requests = [b"POST /vote?voter=v%d&choice=%d HTTP/1.1\r\nHost: x\r\n\r\n" % (v, v % 3) for v in ids]
+    for i in range(0, len(requests), depth):
+        chunk = requests[i:i + depth]
+        writer.write(b"".join(chunk))
+        for _ in chunk:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+            await reader.readexactly(length)
+    writer.close()
+    return len(ids)
+
+
+def _client(port: int, start: int, count: int, connections: int, depth: int, batch: int, duplicates: float, out: "mp.Queue") -> None:
+    async def run() -> int:
+        step = max(1, count // connections)
+        ranges = [range(start + i, min(start + count, start + i + step)) for i in range(0, count, step)]
+        done = await asyncio.gather(*(_connection(port, r, depth, batch, duplicates) for r in ranges))
+        return sum(done)
+
+    out.put(asyncio.run(run()))
+
+
+def run_load(port: int, votes: int, workers: int, connections: int, depth: int, batch: int, duplicates: float) -> Dict[str, object]:
+    out: "mp.Queue" = mp.Queue()
+    per_worker = votes // workers
+    procs = [
+        mp.Process(target=_client, args=(port, w * per_worker, per_worker, connections, depth, batch, duplicates, out))
+        for w in range(workers)
+    ]
+    t0 = time.perf_counter()
+    for p in procs:
+        p.start()
+    sent = sum(out.get() for _ in procs)
+    elapsed = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/tally") as resp:
+        tally = json.loads(resp.read())
+    return {
+        "mode": f"batch{batch}" if batch > 1 else "single",
+        "votes_sent": sent,
+        "seconds": round(elapsed, 3),
+        "votes_per_second": round(sent / elapsed),
+        "unique_voters": tally["votes"],
+        "duplicates_ignored": tally["duplicates"],
+        "counts": tally["counts"],
+        "counts_consistent": sum(tally["counts"]) == tally["votes"] == workers * per_worker,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Générateur de charge pour le service de vote audience")
+    parser.add_argument("--votes", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=2, help="process générateurs")
+    parser.add_argument("--connections", type=int, default=16, help="connexions keep-alive par process")
+    parser.add_argument("--depth", type=int, default=32, help="requêtes pipelinées par écriture")
+    parser.add_argument("--batch", default="1,500", help="votes par requête (1 = POST /vote, >1 = POST /votes)")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="part de re-votes")
+    parser.add_argument("--port", type=int, default=8791)
+    args = parser.parse_args(argv)
+
+    results = []
+    for i, batch in enumerate(int(b) for b in args.batch.split(",")):
+        port = args.port + i  # un service neuf (fenêtre vide) par mode
+        ready = mp.Event()
+        server = mp.Process(target=_serve, args=(port, ready), daemon=True)
+        server.start()
+        ready.wait(10)
+        try:
+            results.append(run_load(port, args.votes, args.workers, args.connections, args.depth, batch, args.duplicates))
+        finally:
+            server.terminate()
+            server.join()
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
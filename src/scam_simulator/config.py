@@ -1,19 +1,149 @@
 import os
-from dotenv import load_dotenv
+import threading
+from typing import Any, Callable, List, Optional
 
-load_dotenv()
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """Charge le .env une seule fois, au premier accès à Config (pas à l'import du module)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _env_loaded = True
+
+
+def flag(value: str) -> bool:
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def csv(value: str) -> List[str]:
+    return [k.strip() for k in value.split(",") if k.strip()]
+
+
+class Env:
+    """Attribut de Config lu dans l'environnement au premier accès, puis figé sur la classe (surchargeable)."""
+
+    def __init__(self, name: str, default: Optional[str] = None, cast: Optional[Callable[[str], Any]] = None) -> None:
+        self.name = name
+        self.default = default
+        self.cast = cast
+
+    def __set_name__(self, owner: type, attr: str) -> None:
+        self.attr = attr
+
+    def __get__(self, obj: Any, owner: type) -> Any:
+        load_env()
+        raw = os.getenv(self.name, self.default)
+        value = self.cast(raw) if self.cast is not None and raw is not None else raw
+        setattr(owner, self.attr, value)
+        return value
 
 
 class Config:
 
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-    MODEL_VICTIM = os.getenv("MODEL_VICTIM")
-    MODEL_DIRECTOR = os.getenv("MODEL_DIRECTOR")
-    MODEL_MODERATOR = os.getenv("MODEL_MODERATOR")
-    
-    MCP_SOUNDBOARD_COMMAND = os.getenv("MCP_SOUNDBOARD_COMMAND", "python")
-    MCP_SOUNDBOARD_ARGS = os.getenv(
-        "MCP_SOUNDBOARD_ARGS",
-        "-m scam_simulator.tools.mcp_server"
-    ).split()
+    OPENAI_API_KEY = Env("OPENAI_API_KEY")
+
+    MODEL_VICTIM = Env("MODEL_VICTIM")
+    MODEL_DIRECTOR = Env("MODEL_DIRECTOR")
+    MODEL_MODERATOR = Env("MODEL_MODERATOR")
+
+    # "openai" (défaut) ou "fake" : modèle local déterministe, sans réseau
+    LLM_BACKEND = Env("LLM_BACKEND", "openai")
+    FAKE_LLM_LATENCY = Env("FAKE_LLM_LATENCY", "0", float)
+    OPENAI_BASE_URL = Env("OPENAI_BASE_URL")  # ex: stub local (python -m scam_simulator.llm.stub_server)
+
+    # Gateway LLM : pool HTTP partagé, limites de concurrence, débit (0 = illimité), retries 429/5xx
+    LLM_GATEWAY = Env("LLM_GATEWAY", "1", flag)
+    LLM_MAX_CONCURRENCY = Env("LLM_MAX_CONCURRENCY", "32", int)
+    LLM_MODEL_CONCURRENCY = Env("LLM_MODEL_CONCURRENCY", "16", int)
+    LLM_RATE_PER_SECOND = Env("LLM_RATE_PER_SECOND", "0", float)
+    LLM_RATE_BURST = Env("LLM_RATE_BURST", "10", int)
+    LLM_MAX_RETRIES = Env("LLM_MAX_RETRIES", "4", int)
+    LLM_BACKOFF_BASE = Env("LLM_BACKOFF_BASE", "0.5", float)
+    LLM_BACKOFF_MAX = Env("LLM_BACKOFF_MAX", "8", float)
+    LLM_HTTP_MAX_CONNECTIONS = Env("LLM_HTTP_MAX_CONNECTIONS", "100", int)
+    LLM_HTTP_MAX_KEEPALIVE = Env("LLM_HTTP_MAX_KEEPALIVE", "20", int)
+    LLM_TIMEOUT = Env("LLM_TIMEOUT", "60", float)
+
+    MCP_SOUNDBOARD_COMMAND = Env("MCP_SOUNDBOARD_COMMAND", "python")
+    MCP_SOUNDBOARD_ARGS = Env("MCP_SOUNDBOARD_ARGS", "-m scam_simulator.tools.mcp_server", str.split)
+    # Backend des tools : "inprocess" (appel direct), "stdio" (subprocess MCP) ou "http" (serveur partagé)
+    TOOL_BACKEND = Env("TOOL_BACKEND", "stdio")
+    MCP_SOUNDBOARD_URL = Env("MCP_SOUNDBOARD_URL", "http://127.0.0.1:8765/mcp")
+    # Schémas des tools en cache disque (clé = backend + hash du serveur) : bind_tools sans handshake MCP
+    TOOL_SCHEMA_CACHE_DIR = Env("TOOL_SCHEMA_CACHE_DIR", "data/cache/tools")
+    MCP_SOUNDBOARD_POOL_SIZE = Env("MCP_SOUNDBOARD_POOL_SIZE", "1", int)
+    MCP_HEALTH_INTERVAL = Env("MCP_HEALTH_INTERVAL", "30", float)
+    TOOL_CALL_TIMEOUT = Env("TOOL_CALL_TIMEOUT", "5", float)
+    # Contrainte audience associée à un tool -> exécuté avant le LLM (un appel modèle au lieu de deux)
+    TOOL_PREDISPATCH = Env("TOOL_PREDISPATCH", "1", flag)
+    # Démarrage : session MCP + connexion LLM ouvertes en fond pendant la saisie du premier message
+    PREWARM = Env("PREWARM", "1", flag)
+
+    # "separate" : directeur puis victime (2 appels) ; "fused" : la victime produit aussi l'objectif (1 appel)
+    # "speculative" : brouillon victime avec l'objectif précédent pendant que le directeur tourne
+    DIRECTOR_MODE = Env("DIRECTOR_MODE", "separate")
+    # Similarité (Jaccard sur les mots) au-dessus de laquelle le brouillon spéculatif est gardé
+    SPECULATIVE_SIMILARITY = Env("SPECULATIVE_SIMILARITY", "0.6", float)
+
+    SCRIPTS_DIR = Env("SCRIPTS_DIR", "data/scripts")
+    SCENARIO_ENGINE = Env("SCENARIO_ENGINE", "1", flag)
+    # Signaux distincts requis sur une étape pour sauter le directeur LLM (un mot-clé isolé ne suffit pas)
+    SCENARIO_MIN_SIGNALS = Env("SCENARIO_MIN_SIGNALS", "2", int)
+
+    # Audio (rendu des effets sonores)
+    SOUNDS_DIR = Env("SOUNDS_DIR", "data/sounds")
+    SOUNDS_CACHE_DIR = Env("SOUNDS_CACHE_DIR", "data/cache/sounds")
+
+    # Cache LLM (LRU mémoire + SQLite) ; la victime (temp 0.6) n'est pas cachée par défaut
+    LLM_CACHE_SIZE = Env("LLM_CACHE_SIZE", "1024", int)
+    LLM_CACHE_TTL = Env("LLM_CACHE_TTL", "86400", float)
+    LLM_CACHE_PATH = Env("LLM_CACHE_PATH", "data/cache/llm_cache.sqlite")
+    LLM_CACHE_DIRECTOR = Env("LLM_CACHE_DIRECTOR", "1", flag)
+    LLM_CACHE_MODERATOR = Env("LLM_CACHE_MODERATOR", "1", flag)
+    LLM_CACHE_VICTIM = Env("LLM_CACHE_VICTIM", "0", flag)
+
+    # Mémoire de la victime : budget de tokens + résumé glissant toutes les K évictions
+    MEMORY_TOKEN_BUDGET = Env("MEMORY_TOKEN_BUDGET", "1500", int)
+    MEMORY_SUMMARY_EVERY = Env("MEMORY_SUMMARY_EVERY", "3", int)
+    MEMORY_SUMMARY_SENTENCES = Env("MEMORY_SUMMARY_SENTENCES", "5", int)
+    MODEL_SUMMARY = Env("MODEL_SUMMARY")
+
+    # Pré-modération audience : quasi-doublons regroupés (Jaccard n-grammes), top-K clusters au modérateur
+    PREMODERATION_SIMILARITY = Env("PREMODERATION_SIMILARITY", "0.5", float)
+    PREMODERATION_TOP_K = Env("PREMODERATION_TOP_K", "5", int)
+    PREMODERATION_BLOCKED_KEYWORDS = Env("PREMODERATION_BLOCKED_KEYWORDS", "", csv)
+
+    # Persistance des conversations (SQLite WAL, commits par lots) + pagination du transcript (Streamlit)
+    SESSIONS_ENABLED = Env("SESSIONS_ENABLED", "1", flag)
+    SESSIONS_DB = Env("SESSIONS_DB", "data/sessions.sqlite")
+    SESSIONS_BATCH_SIZE = Env("SESSIONS_BATCH_SIZE", "64", int)
+    SESSIONS_FLUSH_INTERVAL = Env("SESSIONS_FLUSH_INTERVAL", "0.5", float)
+    TRANSCRIPT_PAGE_SIZE = Env("TRANSCRIPT_PAGE_SIZE", "10", int)
+    # Streamlit : période de rafraîchissement (s) de la réponse en cours et du vote public
+    UI_POLL_INTERVAL = Env("UI_POLL_INTERVAL", "0.5", float)
+
+    # Vote audience via service HTTP (asyncio) : fenêtre minutée, une voix par votant, décompte en SSE
+    VOTE_SERVICE = Env("VOTE_SERVICE", "0", flag)
+    VOTE_HOST = Env("VOTE_HOST", "127.0.0.1")
+    VOTE_PORT = Env("VOTE_PORT", "8790", int)
+    VOTE_WINDOW = Env("VOTE_WINDOW", "20", float)
+
+    # Guardrail : mots-clés interdits en plus des règles par défaut (séparés par des virgules)
+    GUARDRAIL_EXTRA_KEYWORDS = Env("GUARDRAIL_EXTRA_KEYWORDS", "", csv)
+
+    # Tracing : un span par appel agent / tool, écrit en JSONL (data/logs) par un thread de fond
+    TRACE_ENABLED = Env("TRACE_ENABLED", "1", flag)
+    TRACE_PATH = Env("TRACE_PATH", "data/logs/traces.jsonl")
+    TRACE_MAX_BYTES = Env("TRACE_MAX_BYTES", "10000000", int)
+    TRACE_BACKUPS = Env("TRACE_BACKUPS", "5", int)
+    TRACE_BATCH_SIZE = Env("TRACE_BATCH_SIZE", "256", int)
+    TRACE_FLUSH_INTERVAL = Env("TRACE_FLUSH_INTERVAL", "1", float)
+    TRACE_EXPORTER = Env("TRACE_EXPORTER", "")  # "module:fonction" appelée avec chaque lot
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from scam_simulator.config import Config
+from scam_simulator.matching import compile_keywords, normalize
+from scam_simulator.telemetry import span
+
+BLOCKED_MESSAGE = "🚫 La réponse contenait potentiellement des informations sensibles. Réponse bloquée."
+
+DEFAULT_KEYWORDS = ["iban", "rib", "numéro de carte", "carte bancaire", "cvc", "cvv", "mot de passe", "code sms"]
+
+# IBAN en majuscules (compact ou par groupes) : la suite d'un mot en minuscules n'est pas avalée
+_IBAN = re.compile(r"\b[A-Z]{2}\d{2}(?:[ ]?[A-Z0-9]){11,30}")
+_CARD = re.compile(r"(?<!\d)(?:\d[ -]?){12,18}\d(?!\d)")
+# « code postal » n'est pas un code de vérification
+_OTP = re.compile(r"\bcode\b(?!\s+postal)\D{0,25}?(?<!\d)(\d{4,8})(?!\d)", re.IGNORECASE)
+
+# Longueur d'IBAN par pays (ISO 13616) ; pays absent : tous les préfixes de 15 à 34 caractères
+IBAN_LENGTHS = {
+    "AT": 20, "BE": 16, "CH": 21, "DE": 22, "ES": 24, "FR": 27, "GB": 22,
+    "IT": 27, "LU": 20, "MC": 27, "NL": 18, "PT": 25,
+}
+
+# Plus long motif détectable (IBAN espacé ~42 car.) : marge gardée entre deux morceaux de stream
+OVERLAP = 64
+# Le flux est scanné tous les SCAN_STEP nouveaux caractères (et non à chaque token) : chaque caractère
+# passe ~ (OVERLAP + SCAN_STEP) / SCAN_STEP fois dans le scanner au lieu de ~ OVERLAP / taille d'un token
+SCAN_STEP = 32
+
+
+def iban_valid(candidate: str) -> bool:
+    """Contrôle ISO 13616 : déplacement des 4 premiers caractères, lettres -> nombres, mod 97 == 1."""
+    s = re.sub(r"\s", "", candidate).upper()
+    if not 15 <= len(s) <= 34:
+        return False
+    digits = "".join(str(int(c, 36)) for c in s[4:] + s[:4])
+    return int(digits) % 97 == 1
+
+
+def find_iban(candidate: str) -> Optional[str]:
+    """
+    Plus long préfixe valide (mod-97) d'un candidat : la regex peut déborder sur les groupes
+    qui suivent l'IBAN (« ... 189 DE MON FILS »), le préfixe à la longueur du pays reste détecté.
+    """
+    s = re.sub(r"\s", "", candidate)
+    expected = IBAN_LENGTHS.get(s[:2])
+    lengths = [expected] if expected else range(min(len(s), 34), 14, -1)
+    for n in lengths:
+        if n <= len(s) and iban_valid(s[:n]):
+            return s[:n]
+    return None
+
+
+def luhn_valid(candidate: str) -> bool:
+    digits = [int(c) for c in candidate if c.isdigit()]
+    if not 13 <= len(digits) <= 19:
+        return False
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2 == 1:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+@dataclass
+class Violation:
+    rule: str  # "keyword" | "iban" | "card" | "otp"
+    match: str
+
+
+class GuardrailEngine:
+    """
+    Détection d'infos sensibles dans une réponse de Jeanne :
+    - mots-clés interdits compilés en une seule regex (coût indépendant du nombre de règles)
+    - IBAN validé mod-97, numéro de carte validé Luhn, code SMS (OTP) près du mot « code »
+    """
+
+    def __init__(self, keywords: Iterable[str] = DEFAULT_KEYWORDS) -> None:
+        self.keywords = compile_keywords(keywords)
+
+    def scan(self, text: str) -> Optional[Violation]:
+        found = self.keywords.search(normalize(text))
+        if found:
+            return Violation("keyword", found.group())
+        for m in _IBAN.finditer(text):
+            iban = find_iban(m.group())
+            if iban is not None:
+                return Violation("iban", iban)
+        for m in _CARD.finditer(text):
+            if luhn_valid(m.group()):
+                return Violation("card", m.group())
+        m = _OTP.search(text)
+        if m:
+            return Violation("otp", m.group(1))
+        return None
+
+    def check(self, text: str) -> Optional[Violation]:
+        with span("guardrail") as sp:
+            violation = self.scan(text)
+            sp.set(blocked=violation is not None, rule=violation.rule if violation else None)
+            return violation
+
+    def stream(self) -> "StreamGuard":
+        return StreamGuard(self)
+
+
+class StreamGuard:
+    """
+    Guardrail incrémental sur un flux de tokens.
+    feed() renvoie le texte sûr à afficher ; les OVERLAP derniers caractères sont retenus
+    tant qu'un motif (IBAN, carte...) pourrait encore se compléter avec le morceau suivant.
+    Chaque scan ne couvre que le texte nouveau + OVERLAP caractères déjà vus, une fois par SCAN_STEP
+    caractères reçus. Le texte complet n'est pas gardé (l'appelant concatène ce que feed() renvoie).
+    Dès qu'une violation apparaît, `violation` est renseigné et plus rien n'est relâché.
+    """
+
+    def __init__(self, engine: GuardrailEngine) -> None:
+        self.engine = engine
+        self._tail = ""  # derniers caractères seulement (fenêtre de scan bornée)
+        self._length = 0
+        self._scanned = 0  # texte déjà passé au scanner
+        self.released = 0
+        self.violation: Optional[Violation] = None
+
+    def feed(self, chunk: str) -> str:
+        if self.violation is not None:
+            return ""
+        self._tail += chunk
+        self._length += len(chunk)
+        if self._length - self._scanned < SCAN_STEP:
+            return ""
+        return self._scan()
+
+    def _scan(self) -> str:
+        tail_offset = self._length - len(self._tail)
+        start = max(0, self._scanned - OVERLAP - tail_offset)
+        # ne pas démarrer la fenêtre au milieu d'un mot / d'une suite de chiffres
+        while start > 0 and self._tail[start - 1].isalnum():
+            start -= 1
+        self.violation = self.engine.scan(self._tail[start:])
+        self._scanned = self._length
+        if self.violation is not None:
+            return ""
+
+        safe_end = max(self.released, self._length - OVERLAP)
+        out = self._tail[self.released - tail_offset:safe_end - tail_offset]
+        self.released = safe_end
+        self._tail = self._tail[-2 * OVERLAP:]
+        return out
+
+    def finish(self) -> str:
+        """Fin du flux : scanne le reste puis relâche la marge retenue si elle est sûre."""
+        if self.violation is not None:
+            return ""
+        out = self._scan() if self._scanned < self._length else ""
+        if self.violation is not None:
+            return ""
+        tail_offset = self._length - len(self._tail)
+        out += self._tail[self.released - tail_offset:]
+        self.released = self._length
+        return out
+
+
+@lru_cache(maxsize=1)
+def get_guardrails() -> GuardrailEngine:
+    """Moteur partagé (CLI + Streamlit) : règles par défaut + GUARDRAIL_EXTRA_KEYWORDS."""
+    return GuardrailEngine(DEFAULT_KEYWORDS + list(Config.GUARDRAIL_EXTRA_KEYWORDS))
+
+
+def guardrails_check(text: str) -> Optional[str]:
+    """
+    Anti-catastrophe : si Jeanne lâche des infos sensibles, on bloque.
+    Renvoie le message de remplacement, ou None si la réponse est sûre.
+    """
+    return BLOCKED_MESSAGE if get_guardrails().check(text) else None
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import hashlib
+import json
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from scam_simulator.config import Config
+from scam_simulator.telemetry import annotate
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: Any) -> str:
+    """Prompt (str ou liste de messages) -> texte canonique (espaces compactés)."""
+    if isinstance(prompt, str):
+        return _WS.sub(" ", prompt).strip()
+    parts = []
+    for m in prompt:
+        if isinstance(m, BaseMessage):
+            calls = getattr(m, "tool_calls", None) or []
+            extra = json.dumps(calls, sort_keys=True, ensure_ascii=False) if calls else ""
+            parts.append(f"{m.type}:{_WS.sub(' ', str(m.content)).strip()}{extra}")
+        else:
+            parts.append(_WS.sub(" ", str(m)).strip())
+    return "\n".join(parts)
+
+
+def cache_key(model: str, temperature: float, prompt: Any, salt: str = "") -> str:
+    raw = json.dumps([model, round(float(temperature), 3), salt, normalize_prompt(prompt)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+_FLUSH = object()
+_CLEAR = object()
+
+
+class LLMCache:
+    """
+    Cache des réponses LLM :
+    - LRU en mémoire (taille max + TTL)
+    - persistance SQLite optionnelle (survit aux redémarrages), jamais sur la boucle asyncio :
+      put() met l'écriture en file (thread d'écriture, un commit par lot, comme SessionStore),
+      aget() fait la lecture disque dans un thread
+    - compteurs hits / misses
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 86400.0,
+        path: Optional[str] = None,
+        batch_size: int = 64,
+        flush_interval: float = 0.5,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._mem: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.dropped = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._writer = _connect(path)
+            self._writer.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._writer.commit()
+            self._db = _connect(path)  # lectures (WAL : ne bloquent pas l'écrivain)
+            self._read_lock = threading.Lock()
+            self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+            self._flushed = threading.Condition()
+            self._pending = 0
+            self._thread = threading.Thread(target=self._run, name="llm-cache-writer", daemon=True)
+            self._thread.start()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl > 0 and time.time() - created > self.ttl
+
+    def _mem_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._mem.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._mem[key]
+            if self._db is None:
+                self.misses += 1
+            return None
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._read_lock:
+            row = self._db.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is not None and not self._expired(row[1]):
+                value = json.loads(row[0])
+                self._store_mem(key, row[1], value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._mem_get(key)
+        if value is None and self._db is not None:
+            value = self._disk_get(key)
+        return value
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """Comme get(), la lecture SQLite dans un thread : la boucle partagée n'attend pas le disque."""
+        value = self._mem_get(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+        return value
+
+    def _store_mem(self, key: str, created: float, value: Dict[str, Any]) -> None:
+        self._mem[key] = (created, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._store_mem(key, now, value)
+        if self._db is not None:
+            self._enqueue((key, json.dumps(value, ensure_ascii=False), now))
+
+    # -----------------------------
+    # Écriture disque (thread dédié)
+    # -----------------------------
+    def _enqueue(self, item: Any) -> None:
+        with self._flushed:
+            self._pending += 1
+        self._queue.put(item)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[tuple] = []
+            done = 0
+            clear = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if item is _FLUSH:
+                    break
+                done += 1
+                if item is _CLEAR:
+                    batch, clear = [], True  # les écritures en file avant le clear sont caduques
+                    continue
+                batch.append(item)
+            if batch or clear:
+                try:
+                    with self._writer:  # une transaction (un commit) pour tout le lot
+                        if clear:
+                            self._writer.execute("DELETE FROM llm_cache")
+                        self._writer.executemany(
+                            "INSERT OR REPLACE INTO llm_cache (key, value, created) VALUES (?, ?, ?)", batch
+                        )
+                except sqlite3.Error:
+                    self.dropped += len(batch)
+            with self._flushed:
+                self._pending -= done
+                self._flushed.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        if self._db is None:
+            return
+        with self._flushed:
+            if self._pending > 0:
+                self._queue.put(_FLUSH)
+            self._flushed.wait_for(lambda: self._pending <= 0, timeout)
+
+    def close(self) -> None:
+        if self._db is None:
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._writer.close()
+        self._db.close()
+        self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": len(self._mem),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+        if self._db is not None:
+            self._enqueue(_CLEAR)
+            self.flush()
+
+
+class CachedChat:
+    """
+    Enveloppe un chat model LangChain : invoke/ainvoke passent par le cache.
+    Le reste (astream, with_config, ...) est délégué au modèle sous-jacent.
+    """
+
+    def __init__(self, llm: Any, cache: LLMCache, model: str, temperature: float, salt: str = "") -> None:
+        self._llm = llm
+        self._cache = cache
+        self.model = model
+        self.temperature = temperature
+        self._salt = salt
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._llm, name)
+
+    @property
+    def cache(self) -> LLMCache:
+        return self._cache
+
+    def _key(self, prompt: Any) -> str:
+        return cache_key(self.model, self.temperature, prompt, self._salt)
+
+    @staticmethod
+    def _to_value(msg: AIMessage) -> Dict[str, Any]:
+        return {"content": msg.content, "tool_calls": list(getattr(msg, "tool_calls", None) or [])}
+
+    @staticmethod
+    def _to_message(value: Dict[str, Any]) -> AIMessage:
+        return AIMessage(content=value.get("content", ""), tool_calls=value.get("tool_calls") or [])
+
+    def invoke(self, prompt: Any, *args: Any, **kwargs: Any) -> AIMessage:
+        key = self._key(prompt)
+        value = self._cache.get(key)
+        annotate(cache_hit=value is not None)
+        if value is not None:
+            return self._to_message(value)
+        msg = self._llm.invoke(prompt, *args, **kwargs)
+        self._cache.put(key, self._to_value(msg))
+        return msg
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> AIMessage:
+        key = self._key(prompt)
+        value = await self._cache.aget(key)
+        annotate(cache_hit=value is not None)
+        if value is not None:
+            return self._to_message(value)
+        msg = await self._llm.ainvoke(prompt, *args, **kwargs)
+        self._cache.put(key, self._to_value(msg))
+        return msg
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any) -> "CachedChat":
+        # les tools font partie de la clé : même prompt + autres tools = autre réponse
+        salt = hashlib.sha256(json.dumps(tools, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return CachedChat(self._llm.bind_tools(tools, **kwargs), self._cache, self.model, self.temperature, salt)
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> LLMCache:
+    """Cache partagé par tous les agents du process (écritures disque en attente vidées à la sortie)."""
+    cache = LLMCache(
+        max_entries=Config.LLM_CACHE_SIZE,
+        ttl=Config.LLM_CACHE_TTL,
+        path=Config.LLM_CACHE_PATH or None,
+    )
+    atexit.register(cache.close)
+    return cache
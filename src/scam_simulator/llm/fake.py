@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+# Contrainte audience / message -> tool appelé par le faux modèle
+DEFAULT_TOOL_KEYWORDS: Dict[str, str] = {
+    "porte": "doorbell",
+    "sonne": "doorbell",
+    "chien": "dog_bark",
+    "aboie": "dog_bark",
+    "toux": "coughing_fit",
+    "tousse": "coughing_fit",
+    "télé": "tv_background",
+}
+
+JEANNE_LINES = [
+    "Pardon ? Vous pouvez répéter plus lentement, mon petit ?",
+    "Attendez, je cherche mes lunettes… elles étaient sur le buffet.",
+    "Mon fils m'a dit de ne jamais rien faire au téléphone, vous comprenez.",
+    "C'est le bouton bleu ou le bouton rouge ? Je ne vois rien du tout.",
+    "Oh là là, l'ordinateur fait un drôle de bruit, c'est normal ?",
+    "Je ne suis pas sûre d'avoir compris, c'est pour la banque ou pour la télé ?",
+]
+
+_AUDIENCE_LINE = re.compile(r"Audience Event:\s*(.*)")
+DIRECTOR_OBJECTIVE = "Gagner du temps en posant des questions et ne rien donner."
+
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Modèle de chat hors-ligne et déterministe (batch, benchmarks) :
+    - latence configurable (simulée par sleep)
+    - réponses prévisibles selon le rôle détecté (directeur, modérateur, victime)
+    - tool calls préprogrammés via des mots-clés (contrainte audience / message arnaqueur)
+    """
+
+    model: str = "fake-offline"
+    latency: float = 0.0
+    tool_keywords: Dict[str, str] = Field(default_factory=lambda: dict(DEFAULT_TOOL_KEYWORDS))
+    bound_tools: List[str] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-offline"
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any) -> "FakeChatModel":
+        names = []
+        for t in tools:
+            if isinstance(t, dict):
+                names.append(t.get("function", t).get("name", ""))
+            else:
+                names.append(getattr(t, "name", str(t)))
+        return self.model_copy(update={"bound_tools": names})
+
+    # -----------------------------
+    # Réponses canned
+    # -----------------------------
+    def _pick(self, seed: str, options: List[str]) -> str:
+        return options[zlib.crc32(seed.encode("utf-8")) % len(options)]
+
+    def _tool_for(self, messages: List[BaseMessage]) -> Optional[str]:
+        if not self.bound_tools or not isinstance(messages[-1], HumanMessage):
+            return None
+        haystack = _text(messages[-1]).lower()
+        for m in messages:
+            found = _AUDIENCE_LINE.search(_text(m))
+            if found:
+                haystack += " " + found.group(1).lower()
+        for keyword, tool in self.tool_keywords.items():
+            if keyword in haystack and tool in self.bound_tools:
+                return tool
+        return None
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        prompt = "\n".join(_text(m) for m in messages)
+        last = _text(messages[-1])
+
+        if "RÉSUMÉ MIS À JOUR" in prompt:
+            said = [l.split(": ", 1)[1] for l in prompt.splitlines() if l.startswith("Arnaqueur: ")]
+            content = "L'arnaqueur a dit: " + " / ".join(s[:40] for s in said[-3:])
+        elif "EXACTEMENT 3 choix" in prompt:
+            proposals = [l[2:].strip() for l in prompt.splitlines() if l.startswith("- ") and "aucune" not in l]
+            choices = (proposals + ["Quelqu'un sonne à la porte", "Le chien aboie fort", "Quinte de toux"])[:3]
+            content = "\n".join(choices)
+        elif "objectif court" in prompt:
+            content = DIRECTOR_OBJECTIVE
+        elif isinstance(messages[-1], ToolMessage):
+            effects = " ".join(_text(m) for m in messages if isinstance(m, ToolMessage))
+            content = f"{effects} Oh pardon, une seconde… Vous disiez ?"
+        else:
+            tool = self._tool_for(messages)
+            if tool:
+                call_id = f"call_{zlib.crc32((prompt + tool).encode('utf-8')):08x}"
+                return AIMessage(content="", tool_calls=[{"name": tool, "args": {}, "id": call_id}])
+            content = self._pick(last, JEANNE_LINES)
+        if "OBJECTIF: <" in prompt and "RÉSUMÉ MIS À JOUR" not in prompt:
+            # mode fusionné : objectif du directeur en première ligne
+            content = f"OBJECTIF: {DIRECTOR_OBJECTIVE}\n{content}"
+
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": _estimate_tokens(prompt),
+                "output_tokens": _estimate_tokens(content),
+                "total_tokens": _estimate_tokens(prompt) + _estimate_tokens(content),
+            },
+        )
+
+    # -----------------------------
+    # Interface BaseChatModel
+    # -----------------------------
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        msg = self._respond(messages)
+        if msg.tool_calls:
+            chunks = [
+                {"name": c["name"], "args": "{}", "id": c["id"], "index": i}
+                for i, c in enumerate(msg.tool_calls)
+            ]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=chunks))
+            return
+        words = re.findall(r"\S+\s*", msg.content)
+        for i, word in enumerate(words):
+            usage = msg.usage_metadata if i == len(words) - 1 else None
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word, usage_metadata=usage))
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+import weakref
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from scam_simulator.config import Config
+from scam_simulator.llm.cache import cache_key
+from scam_simulator.telemetry import annotate
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def _status(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """429 / 5xx / coupure réseau : on réessaie. Le reste (400, 401...) remonte tout de suite."""
+    status = _status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # openai.APIConnectionError / APITimeoutError (et leurs sous-classes langchain-openai), httpx.TransportError
+    # comparés par nom : httpx n'est pas importé tant qu'aucun client n'est construit
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    return isinstance(exc, (asyncio.TimeoutError, ConnectionError)) or bool(
+        names & {"APIConnectionError", "APITimeoutError", "TransportError"}
+    )
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Limiteur de débit (requêtes/s) partagé par tous les threads et boucles du process."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Prend un jeton ; renvoie l'attente nécessaire (0 si dispo). Les réservations font la queue."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class _LoopState:
+    """Sémaphores et requêtes en vol : les primitives asyncio appartiennent à une seule boucle."""
+
+    def __init__(self, max_concurrency: int) -> None:
+        self.global_sem = asyncio.Semaphore(max_concurrency)
+        self.model_sems: Dict[str, asyncio.Semaphore] = {}
+        self.inflight: Dict[str, asyncio.Task] = {}
+
+
+class LLMGateway:
+    """
+    Passage obligé de tous les appels LLM du process :
+    - pool HTTP partagé (keep-alive) pour tous les clients ChatOpenAI
+    - limites de concurrence globale et par modèle
+    - token bucket (requêtes/s)
+    - retries avec backoff exponentiel + jitter sur 429 / 5xx (Retry-After respecté)
+    - coalescence des requêtes identiques en vol (un seul appel, résultat partagé), pour les appelants
+      qui l'acceptent (GatewayChat(coalesce=True)) : pas pour une réponse échantillonnée propre à une session
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        model_concurrency: int = 8,
+        rate: float = 0.0,
+        burst: int = 10,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        timeout: float = 60.0,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.model_concurrency = max(1, model_concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # import différé : httpx n'est chargé qu'à la construction du gateway, pas à l'import de providers
+        from scam_simulator.llm.transports import http_clients
+
+        # transports créés à la première requête (ou par awarm) : construire le gateway est instantané
+        self.http_client, self.http_async_client = http_clients(max_connections, max_keepalive, timeout)
+
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._loops_lock = threading.Lock()
+        self._sync_global = threading.BoundedSemaphore(self.max_concurrency)
+        self._sync_models: Dict[str, threading.BoundedSemaphore] = {}
+
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    # -----------------------------
+    # État par boucle
+    # -----------------------------
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._loops_lock:
+            state = self._loops.get(loop)
+            if state is None:
+                state = self._loops[loop] = _LoopState(self.max_concurrency)
+            return state
+
+    def _model_sem(self, state: _LoopState, model: str) -> asyncio.Semaphore:
+        sem = state.model_sems.get(model)
+        if sem is None:
+            sem = state.model_sems[model] = asyncio.Semaphore(self.model_concurrency)
+        return sem
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        hinted = retry_after(exc)
+        if hinted is not None:
+            return min(self.backoff_max, hinted)
+        # "full jitter" : évite que toutes les conversations réessaient en même temps
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _on_error(self, exc: BaseException, attempt: int) -> bool:
+        """Comptabilise l'erreur ; True s'il faut réessayer."""
+        if _status(exc) == 429:
+            self.rate_limited += 1
+        if attempt >= self.max_retries or not is_retryable(exc):
+            self.failures += 1
+            return False
+        self.retries += 1
+        return True
+
+    # -----------------------------
+    # Appels
+    # -----------------------------
+    async def run(self, model: str, call: Callable[[], Awaitable[T]], key: Optional[str] = None) -> T:
+        """Exécute `call` sous les limites ; `key` : requêtes identiques en vol regroupées."""
+        if key is None:
+            return await self._execute(model, call)
+        state = self._state()
+        task = state.inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            annotate(coalesced=True)
+            return await asyncio.shield(task)
+        task = asyncio.get_running_loop().create_task(self._execute(model, call))
+        state.inflight[key] = task
+        task.add_done_callback(lambda _: state.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _execute(self, model: str, call: Callable[[], Awaitable[T]]) -> T:
+        state = self._state()
+        attempt = 0
+        while True:
+            async with state.global_sem, self._model_sem(state, model):
+                wait = self.bucket.reserve()
+                if wait:
+                    await asyncio.sleep(wait)
+                self.requests += 1
+                try:
+                    result = await call()
+                    if attempt:
+                        annotate(retries=attempt)
+                    return result
+                except Exception as exc:
+                    if not self._on_error(exc, attempt):
+                        raise
+                    delay = self._backoff(attempt, exc)
+            # backoff hors sémaphores : un appel en attente ne bloque pas les autres
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def stream(self, model: str, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Stream sous les limites (slot tenu jusqu'à la fin) ; retry seulement avant le premier morceau."""
+        state = self._state()
+        attempt = 0
+        while True:
+            async with state.global_sem, self._model_sem(state, model):
+                wait = self.bucket.reserve()
+                if wait:
+                    await asyncio.sleep(wait)
+                self.requests += 1
+                started = False
+                try:
+                    async for chunk in factory():
+                        started = True
+                        yield chunk
+                    return
+                except Exception as exc:
+                    if started or not self._on_error(exc, attempt):
+                        raise
+                    delay = self._backoff(attempt, exc)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def run_sync(self, model: str, call: Callable[[], T]) -> T:
+        """Variante bloquante (invoke) : mêmes limites via des sémaphores de threads."""
+        with self._loops_lock:
+            model_sem = self._sync_models.setdefault(model, threading.BoundedSemaphore(self.model_concurrency))
+        attempt = 0
+        while True:
+            with self._sync_global, model_sem:
+                wait = self.bucket.reserve()
+                if wait:
+                    time.sleep(wait)
+                self.requests += 1
+                try:
+                    return call()
+                except Exception as exc:
+                    if not self._on_error(exc, attempt):
+                        raise
+                    delay = self._backoff(attempt, exc)
+            time.sleep(delay)
+            attempt += 1
+
+    async def awarm(self, url: str, timeout: float = 5.0) -> bool:
+        """
+        Ouvre une connexion keep-alive vers `url` (DNS + TCP + TLS) dans le pool de la boucle courante :
+        le premier appel LLM réutilise la socket. Réponse ignorée (401/404 attendus), jamais d'exception.
+        """
+        import httpx
+
+        try:
+            await self.http_async_client.head(url, timeout=timeout)
+        except httpx.HTTPError:
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+        }
+
+
+class GatewayChat:
+    """
+    Enveloppe un chat model LangChain : invoke/ainvoke/astream passent par le gateway.
+    Même principe que CachedChat (le reste est délégué au modèle sous-jacent).
+    """
+
+    def __init__(
+        self, llm: Any, gateway: LLMGateway, model: str, temperature: float, salt: str = "", coalesce: bool = False
+    ) -> None:
+        self._llm = llm
+        self._gateway = gateway
+        self.model = model
+        self.temperature = temperature
+        self._salt = salt
+        # coalesce=True : un prompt identique en vol partage la réponse (directeur, modérateur) ;
+        # False pour la victime, dont chaque session doit avoir son propre tirage
+        self.coalesce = coalesce
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._llm, name)
+
+    @property
+    def gateway(self) -> LLMGateway:
+        return self._gateway
+
+    def invoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._gateway.run_sync(self.model, lambda: self._llm.invoke(prompt, *args, **kwargs))
+
+    async def ainvoke(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        key = None
+        if self.coalesce and not args and not kwargs:
+            key = cache_key(self.model, self.temperature, prompt, self._salt)
+        return await self._gateway.run(self.model, lambda: self._llm.ainvoke(prompt, *args, **kwargs), key)
+
+    async def astream(self, prompt: Any, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        async for chunk in self._gateway.stream(self.model, lambda: self._llm.astream(prompt, *args, **kwargs)):
+            yield chunk
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any) -> "GatewayChat":
+        salt = hashlib.sha256(json.dumps(tools, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return GatewayChat(
+            self._llm.bind_tools(tools, **kwargs), self._gateway, self.model, self.temperature, salt, self.coalesce
+        )
+
+
+@lru_cache(maxsize=1)
+def get_gateway() -> LLMGateway:
+    """Gateway partagé par tous les agents du process."""
+    return LLMGateway(
+        max_concurrency=Config.LLM_MAX_CONCURRENCY,
+        model_concurrency=Config.LLM_MODEL_CONCURRENCY,
+        rate=Config.LLM_RATE_PER_SECOND,
+        burst=Config.LLM_RATE_BURST,
+        max_retries=Config.LLM_MAX_RETRIES,
+        backoff_base=Config.LLM_BACKOFF_BASE,
+        backoff_max=Config.LLM_BACKOFF_MAX,
+        max_connections=Config.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive=Config.LLM_HTTP_MAX_KEEPALIVE,
+        timeout=Config.LLM_TIMEOUT,
+    )
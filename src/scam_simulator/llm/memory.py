@@ -1,10 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, Callable, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from scam_simulator.config import Config
+from scam_simulator.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Any:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # tiktoken absent ou encodage indisponible hors-ligne
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Nombre de tokens (tiktoken si dispo, sinon ~4 caractères par token)."""
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text))
+    return max(1, len(text) // 4)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    return count_tokens(str(message.content)) + 4  # ~overhead par message (rôle, séparateurs)
+
+
+SUMMARY_PROMPT = (
+    "Tu tiens le résumé d'un appel téléphonique entre un arnaqueur et Mme Jeanne Dubois.\n"
+    "Mets à jour le résumé avec les nouveaux échanges. Garde les faits utiles "
+    "(ce que l'arnaqueur prétend, ce qu'il demande, ce que Jeanne a déjà dit ou inventé).\n"
+    "Format strict: {max_sentences} phrases maximum, pas de markdown.\n\n"
+    "Résumé actuel:\n{summary}\n\n"
+    "Nouveaux échanges:\n{exchanges}\n\n"
+    "RÉSUMÉ MIS À JOUR:"
+)
+
+
 class ConversationMemory:
+    """
+    Mémoire de conversation bornée en tokens :
+    - les derniers échanges sont gardés tels quels tant qu'ils tiennent dans le budget
+    - les plus anciens sont évincés (hors du prompt) puis repliés dans un résumé incrémental,
+      recalculé en arrière-plan toutes les `summarize_every` évictions (pas à chaque appel)
+    - préfixe stable (résumé) : il ne change qu'au repli, le cache de prompt côté fournisseur reste chaud
+    """
+
+    def __init__(
+        self,
+        budget_tokens: Optional[int] = None,
+        summarize_every: Optional[int] = None,
+        summarizer: Any = None,
+        counter: Callable[[BaseMessage], int] = message_tokens,
+    ) -> None:
+        self.budget_tokens = budget_tokens or Config.MEMORY_TOKEN_BUDGET
+        self.summarize_every = max(1, summarize_every or Config.MEMORY_SUMMARY_EVERY)
+        self.summarizer = summarizer
+        self._count = counter
+
+        self.summary = ""
+        self.history: List[BaseMessage] = []  # fenêtre récente (paires Human/AI)
+        self._pending: List[BaseMessage] = []  # évincés, pas encore repliés dans le résumé
+        self._pending_tokens = 0
+        self._tokens = 0
+        self._fold_task: Optional[asyncio.Task] = None
+        self._generation = 0  # incrémenté par clear() : un repli lancé avant est ignoré
+
+    # -----------------------------
+    # Ancienne API (role, content)
+    # -----------------------------
+    def add(self, role: str, content: str) -> None:
+        message = HumanMessage(content=content) if role in {"user", "human", "scammer"} else AIMessage(content=content)
+        self._append(message)
+        self._evict()
+
+    def get(self) -> List[BaseMessage]:
+        return self.messages()
+
+    # -----------------------------
+    # API principale
+    # -----------------------------
+    def add_turn(self, user_input: str, assistant_output: str) -> None:
+        self._append(HumanMessage(content=user_input))
+        self._append(AIMessage(content=assistant_output))
+        self._evict()
+        self._maybe_fold()
+
+    def amend_last_reply(self, text: str) -> None:
+        """Remplace la dernière réponse mémorisée (ex: réponse bloquée par le guardrail)."""
+        if self.history and isinstance(self.history[-1], AIMessage):
+            self._tokens -= self._count(self.history[-1])
+            self.history[-1] = AIMessage(content=text)
+            self._tokens += self._count(self.history[-1])
 
-    def __init__(self):
+    def messages(self) -> List[BaseMessage]:
+        """Résumé (préfixe stable) + fenêtre récente ; les évincés n'y reviennent qu'une fois repliés."""
+        out: List[BaseMessage] = []
+        if self.summary:
+            out.append(SystemMessage(content=f"Résumé de l'appel jusqu'ici: {self.summary}"))
+        out.extend(self.history)
+        return out
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens
+
+    @property
+    def generation(self) -> int:
+        """Change à chaque clear() (reset, reprise de session) : un tour commencé avant ne doit plus écrire."""
+        return self._generation
+
+    def clear(self) -> None:
+        self._generation += 1
+        task, self._fold_task = self._fold_task, None
+        if task is not None and not task.done():
+            # clear() peut venir d'un autre thread (Streamlit) que celui de la boucle
+            task.get_loop().call_soon_threadsafe(task.cancel)
+        self.summary = ""
         self.history = []
+        self._pending = []
+        self._pending_tokens = 0
+        self._tokens = 0
+
+    def _append(self, message: BaseMessage) -> None:
+        self.history.append(message)
+        self._tokens += self._count(message)
+
+    def _evict(self) -> None:
+        # on garde toujours le dernier échange, même s'il dépasse seul le budget
+        while self._tokens > self.budget_tokens and len(self.history) > 2:
+            for message in self.history[:2]:
+                tokens = self._count(message)
+                self._tokens -= tokens
+                self._pending.append(message)
+                self._pending_tokens += tokens
+            self.history = self.history[2:]
+
+        if self.summarizer is None and self._pending:
+            # pas de résumeur : éviction sèche
+            self._pending = []
+            self._pending_tokens = 0
+        # résumeur en panne : on borne en tokens ce qui attend le repli (taille du prompt de résumé)
+        while self._pending_tokens > self.budget_tokens and len(self._pending) > 2:
+            for message in self._pending[:2]:
+                self._pending_tokens -= self._count(message)
+            self._pending = self._pending[2:]
 
-    def add(self, role, content):
-        self.history.append((role, content))
+    def _maybe_fold(self) -> None:
+        if self.summarizer is None or len(self._pending) < 2 * self.summarize_every:
+            return
+        if self._fold_task is not None and not self._fold_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # hors boucle : le repli se fera au prochain appel async (afold)
+        self._fold_task = loop.create_task(self.afold(), name="memory-summary")
 
-    def get(self):
-        return self.history
+    async def afold(self) -> None:
+        """Replie les messages évincés dans le résumé (un appel LLM pour K échanges)."""
+        batch = list(self._pending)
+        if not batch or self.summarizer is None:
+            return
+        generation = self._generation
+        exchanges = "\n".join(
+            f"{'Arnaqueur' if isinstance(m, HumanMessage) else 'Jeanne'}: {m.content}" for m in batch
+        )
+        prompt = SUMMARY_PROMPT.format(
+            max_sentences=Config.MEMORY_SUMMARY_SENTENCES,
+            summary=self.summary or "(vide)",
+            exchanges=exchanges,
+        )
+        try:
+            with span("memory.summary", messages=len(batch)):
+                msg = await self.summarizer.ainvoke(prompt)
+        except Exception as exc:
+            logger.warning("Résumé de mémoire en échec, nouvel essai plus tard: %r", exc)
+            return
+        text = str(msg.content or "").strip()
+        if generation != self._generation:
+            return  # mémoire vidée ou restaurée pendant l'appel : résumé d'une autre conversation
+        if text:
+            self.summary = text
+            # les évictions arrivées pendant l'appel restent en attente
+            folded = {id(m) for m in batch}
+            self._pending = [m for m in self._pending if id(m) not in folded]
+            self._pending_tokens = sum(self._count(m) for m in self._pending)
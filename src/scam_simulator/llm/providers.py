@@ -1,16 +1,87 @@
 from __future__ import annotations
 
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
+from typing import TYPE_CHECKING, Union
+
 from scam_simulator.config import Config
+from scam_simulator.llm.cache import CachedChat, get_llm_cache
+from scam_simulator.llm.gateway import GatewayChat, get_gateway
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
+    from scam_simulator.llm.fake import FakeChatModel
 
-def make_chat(model: str, temperature: float = 0.2) -> ChatOpenAI:
+
+def make_chat(
+    model: str, temperature: float = 0.2, cache: bool = False, coalesce: bool = False
+) -> Union[ChatOpenAI, FakeChatModel, GatewayChat, CachedChat]:
     """
     Fabrique un ChatOpenAI LangChain.
     La clé est lue via OPENAI_API_KEY (.env).
+    cache=True : réponses mises en cache (clé = modèle + température + prompt normalisé).
+    LLM_BACKEND=fake : modèle hors-ligne déterministe (batch, benchmarks), aucun appel réseau.
+    LLM_GATEWAY=1 : appels planifiés par le gateway (pool HTTP partagé, limites, retries).
+    coalesce=True : prompts identiques en vol regroupés en un appel (réponse partagée entre sessions).
+
+    Les clients sont partagés par le process (un seul pool HTTP par modèle/température) :
+    ils sont sans état, bind_tools() renvoie une nouvelle instance sans toucher l'original.
     """
+    return _shared_chat(
+        model,
+        float(temperature),
+        bool(cache),
+        bool(coalesce),
+        Config.LLM_BACKEND,
+        Config.FAKE_LLM_LATENCY,
+        Config.LLM_GATEWAY,
+    )
+
+
+@lru_cache(maxsize=None)
+def _shared_chat(
+    model: str, temperature: float, cache: bool, coalesce: bool, backend: str, fake_latency: float, gateway: bool
+) -> Union[ChatOpenAI, FakeChatModel, GatewayChat, CachedChat]:
+    if backend == "fake":
+        from scam_simulator.llm.fake import FakeChatModel
+
+        llm = FakeChatModel(model=model, latency=fake_latency)
+    else:
+        llm = _openai_chat(model, temperature, gateway)
+    if gateway:
+        llm = GatewayChat(llm, get_gateway(), model=model, temperature=temperature, coalesce=coalesce)
+    if cache:
+        return CachedChat(llm, get_llm_cache(), model=model, temperature=temperature)
+    return llm
+
+
+def reset_llm_clients() -> None:
+    """
+    Oublie les clients LLM partagés et le gateway (pool HTTP) : les prochains make_chat() en créent de neufs.
+    Pour les benchs (sessions isolées, bascule de Config) ; les agents existants gardent leurs clients.
+    """
+    _shared_chat.cache_clear()
+    get_gateway.cache_clear()
+
+
+def _openai_chat(model: str, temperature: float, gateway: bool) -> ChatOpenAI:
+    # import différé (~1 s avec le SDK openai) : payé à la construction du premier client, pas à l'import
+    from langchain_openai import ChatOpenAI
+
+    if gateway:
+        # retries gérés par le gateway (sinon double backoff)
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            api_key=Config.OPENAI_API_KEY,
+            base_url=Config.OPENAI_BASE_URL or None,
+            max_retries=0,
+            http_client=get_gateway().http_client,
+            http_async_client=get_gateway().http_async_client,
+        )
     return ChatOpenAI(
         model=model,
         temperature=temperature,
         api_key=Config.OPENAI_API_KEY,
+        base_url=Config.OPENAI_BASE_URL or None,
     )
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from scam_simulator.llm.fake import FakeChatModel
+
+# Serveur local compatible OpenAI (/v1/chat/completions) pour tester le gateway :
+# réponses du FakeChatModel, latence injectée et erreurs 429 aléatoires.
+
+
+def _to_messages(raw: List[Dict[str, Any]]) -> List[BaseMessage]:
+    out: List[BaseMessage] = []
+    for m in raw:
+        content = m.get("content") or ""
+        if not isinstance(content, str):
+            content = " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+        role = m.get("role")
+        if role in {"system", "developer"}:
+            out.append(SystemMessage(content=content))
+        elif role == "assistant":
+            out.append(AIMessage(content=content))
+        elif role == "tool":
+            out.append(ToolMessage(content=content, tool_call_id=m.get("tool_call_id", "")))
+        else:
+            out.append(HumanMessage(content=content))
+    return out
+
+
+class StubState:
+    def __init__(self, latency: float, jitter: float, error_rate: float, retry_after: float, seed: Optional[int]) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: "StubServer"
+    protocol_version = "HTTP/1.1"  # keep-alive : on vérifie que les connexions sont réutilisées
+
+    def log_message(self, format: str, *args: Any) -> None:  # silencieux
+        pass
+
+    def _json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") == "/stats":
+            self._json(200, self.server.state.stats())
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", "0"))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "not found"}})
+            return
+
+        state = self.server.state
+        with state.lock:
+            state.requests += 1
+            limited = state.rng.random() < state.error_rate
+            if limited:
+                state.rate_limited += 1
+            delay = state.latency + state.rng.uniform(0, state.jitter)
+        if limited:
+            self._json(
+                429,
+                {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+                {"Retry-After": str(state.retry_after)},
+            )
+            return
+
+        with state.lock:
+            state.in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            time.sleep(delay)
+            self._complete(payload)
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+
+    def _complete(self, payload: Dict[str, Any]) -> None:
+        model = payload.get("model", "stub")
+        tools = [t.get("function", {}).get("name", "") for t in payload.get("tools") or []]
+        msg = FakeChatModel(model=model, bound_tools=tools)._respond(_to_messages(payload.get("messages") or []))
+        usage = msg.usage_metadata or {}
+        usage_body = {
+            "prompt_tokens": usage.get("input_tokens", 0),
+            "completion_tokens": usage.get("output_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+        }
+        tool_calls = [
+            {"id": c["id"], "type": "function", "function": {"name": c["name"], "arguments": json.dumps(c["args"])}}
+            for c in msg.tool_calls
+        ]
+        finish = "tool_calls" if tool_calls else "stop"
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": model}
+
+        if not payload.get("stream"):
+            message: Dict[str, Any] = {"role": "assistant", "content": msg.content or None}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            self._json(200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+                "usage": usage_body,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> None:
+            chunk = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        if tool_calls:
+            send({"role": "assistant", "tool_calls": [{**c, "index": i} for i, c in enumerate(tool_calls)]})
+        else:
+            for word in (msg.content or "").split(" "):
+                send({"content": word + " "})
+        send({}, finish)
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            usage_chunk = {**base, "object": "chat.completion.chunk", "choices": [], "usage": usage_body}
+            self.wfile.write(f"data: {json.dumps(usage_chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # beaucoup de connexions simultanées pendant les tests de charge
+
+    def __init__(self, host: str, port: int, state: StubState) -> None:
+        super().__init__((host, port), StubHandler)
+        self.state = state
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_stub_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.05,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    retry_after: float = 0.1,
+    seed: Optional[int] = None,
+) -> StubServer:
+    """Démarre le stub dans un thread daemon (port 0 = port libre) ; arrêt via server.shutdown()."""
+    server = StubServer(host, port, StubState(latency, jitter, error_rate, retry_after, seed))
+    threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serveur local compatible OpenAI (latence + 429 injectés)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.2, help="latence par requête (s)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="latence aléatoire en plus (s)")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="proportion de réponses 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="en-tête Retry-After des 429 (s)")
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.host, args.port, StubState(args.latency, args.jitter, args.error_rate, args.retry_after, None))
+    print(f"Stub OpenAI sur {server.base_url} (OPENAI_BASE_URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+# Transports httpx du gateway : module importé à la construction du premier LLMGateway,
+# httpx reste hors du chemin d'import de providers et des agents
+
+import asyncio
+import threading
+import weakref
+from typing import Optional, Tuple
+
+import httpx
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    Pool de connexions async par boucle asyncio : un AsyncClient unique peut être partagé
+    par la boucle de runtime.py, un asyncio.run() de batch/CLI, etc. sans mélanger les sockets.
+    """
+
+    def __init__(self, limits: httpx.Limits) -> None:
+        self._limits = limits
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = self._transports[loop] = httpx.AsyncHTTPTransport(limits=self._limits)
+        return await transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+class _LazyTransport(httpx.BaseTransport):
+    """Transport sync créé au premier appel : le contexte SSL (certifi) ne coûte rien à la construction."""
+
+    def __init__(self, limits: httpx.Limits) -> None:
+        self._limits = limits
+        self._transport: Optional[httpx.HTTPTransport] = None
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self._transport is None:
+            with self._lock:
+                if self._transport is None:
+                    self._transport = httpx.HTTPTransport(limits=self._limits)
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+
+def http_clients(max_connections: int, max_keepalive: int, timeout: float) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Clients sync/async partagés ; transports créés à la première requête (ou par awarm)."""
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+    return (
+        httpx.Client(transport=_LazyTransport(limits), timeout=timeout),
+        httpx.AsyncClient(transport=_PerLoopTransport(limits), timeout=timeout),
+    )
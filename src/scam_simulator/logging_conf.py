@@ -1,5 +1,7 @@
 import logging
 
+from scam_simulator.telemetry import setup_tracing
+
 
 def setup_logging():
 
@@ -7,3 +9,5 @@ def setup_logging():
         level=logging.INFO,
         format="%(asctime)s | %(levelname)s | %(message)s"
     )
+    # Spans structurés (agents + tools) -> data/logs/traces.jsonl
+    setup_tracing()
@@ -1,8 +1,17 @@
-from scam_simulator.orchestration.loop import run_simulation
+import argparse
+
+from scam_simulator.logging_conf import setup_logging
 
 
 def main():
-    run_simulation()
+    parser = argparse.ArgumentParser(description="Simulateur d'arnaque (CLI)")
+    parser.add_argument("--resume", metavar="SESSION_ID", help="reprendre une session enregistrée")
+    args = parser.parse_args()
+    setup_logging()
+    # importé après le parsing : --help ne charge ni rich ni l'orchestration
+    from scam_simulator.orchestration.loop import run_simulation
+
+    run_simulation(args.resume)
 
 
 if __name__ == "__main__":
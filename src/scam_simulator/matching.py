@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Dict, Iterable
+
+
+def normalize(text: str) -> str:
+    """Minuscules + suppression des accents (même longueur en caractères que l'entrée)."""
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return unicodedata.normalize("NFC", stripped)
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    # "" marque la fin d'un mot ; les branches partagent leur préfixe (pas d'alternation géante)
+    end = "" in node
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch != ""]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if end else body
+
+
+def compile_keywords(words: Iterable[str], whole_words: bool = True) -> "re.Pattern[str]":
+    """
+    Compile une liste de mots-clés en UNE regex, construite comme un trie
+    (coût quasi indépendant du nombre de mots, proche d'un Aho-Corasick).
+    Les mots sont normalisés : appliquer normalize() au texte avant la recherche.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        word = normalize(word.strip())
+        if not word:
+            continue
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    if not trie:
+        return re.compile(r"(?!x)x")  # ne matche jamais
+    pattern = _trie_pattern(trie)
+    if whole_words:
+        pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+    return re.compile(pattern)
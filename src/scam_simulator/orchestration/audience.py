@@ -3,15 +3,14 @@ from typing import List
 
 
 def collect_proposals() -> List[str]:
-    print("\nAudience > Propose 1 à 5 idées (ligne vide pour finir).")
+    # Pas de limite : les idées sont regroupées / filtrées par la pré-modération avant le modérateur
+    print("\nAudience > Propose des idées (ligne vide pour finir).")
     proposals: List[str] = []
     while True:
         line = input("Audience idée > ").strip()
         if not line:
             break
         proposals.append(line)
-        if len(proposals) >= 5:
-            break
     return proposals
 
 
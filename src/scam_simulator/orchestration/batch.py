@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+from scam_simulator.agents.director_agent import DirectorAgent
+from scam_simulator.agents.moderator_agent import ModeratorAgent
+from scam_simulator.agents.victim_agent import VictimAgent
+from scam_simulator.config import Config
+from scam_simulator.logging_conf import setup_logging
+from scam_simulator.orchestration.state import SimulationState
+from scam_simulator.orchestration.turn import aplay_turn
+from scam_simulator.tools.backends import Soundboard, make_soundboard
+
+DEFAULT_PROPOSALS = ["Quelqu'un sonne à la porte", "Le chien aboie fort", "Quinte de toux", "La télé est trop forte"]
+
+
+def load_utterances(path: Path) -> List[List[str]]:
+    """
+    Répliques d'arnaqueur à rejouer, une liste par script :
+    - *.txt : une réplique par ligne
+    - *.yaml : champ `lines` de chaque étape (sinon une phrase construite à partir des signaux)
+    """
+    files = [path] if path.is_file() else sorted(p for p in path.iterdir() if p.suffix in {".txt", ".yaml", ".yml"})
+    scripts: List[List[str]] = []
+    for f in files:
+        if f.suffix == ".txt":
+            lines = [l.strip() for l in f.read_text(encoding="utf-8").splitlines() if l.strip()]
+        else:
+            data = yaml.safe_load(f.read_text(encoding="utf-8")) or {}
+            lines = []
+            for step in data.get("steps") or []:
+                step_lines = step.get("lines") or []
+                if not step_lines and step.get("signals"):
+                    step_lines = [f"Madame, c'est important : {', '.join(step['signals'])}."]
+                lines.extend(step_lines)
+        if lines:
+            scripts.append(lines)
+    return scripts
+
+
+async def run_conversation(
+    index: int,
+    utterances: List[str],
+    director: DirectorAgent,
+    moderator: ModeratorAgent,
+    soundboard: Soundboard,
+    out_dir: Path,
+    audience_every: int = 3,
+    seed: int = 0,
+) -> Dict[str, object]:
+    """Joue une conversation complète et écrit son transcript JSONL."""
+    rng = random.Random(seed + index)
+    victim = VictimAgent(soundboard=soundboard)
+    state = SimulationState()
+    state.scenario = director.new_tracker()
+    started = time.perf_counter()
+
+    path = out_dir / f"conv-{index:05d}.jsonl"
+    with path.open("w", encoding="utf-8") as fh:
+        for scammer in utterances:
+            if audience_every and state.turn and state.turn % audience_every == 0:
+                proposals = rng.sample(DEFAULT_PROPOSALS, k=3)
+                choices = await moderator.apick_three(proposals, context=state.current_objective)
+                state.audience_constraint = rng.choice(choices)
+            result = await aplay_turn(scammer, state, victim, director)
+            fh.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+
+    return {"conversation": index, "turns": state.turn, "seconds": round(time.perf_counter() - started, 4)}
+
+
+async def arun_slice(
+    scripts: List[List[str]],
+    indices: List[int],
+    concurrency: int,
+    out_dir: Path,
+    seed: int = 0,
+) -> Dict[str, object]:
+    """Conversations `indices` dans la boucle courante (un process) ; agents et tools partagés."""
+    # Stateless : partagés par toutes les conversations ; une victime (historique) par conversation
+    director = DirectorAgent()
+    moderator = ModeratorAgent()
+    soundboard = make_soundboard()
+    await soundboard.start()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i: int) -> Dict[str, object]:
+        async with semaphore:
+            return await run_conversation(i, scripts[i % len(scripts)], director, moderator, soundboard, out_dir, seed=seed)
+
+    try:
+        results = await asyncio.gather(*(bounded(i) for i in indices))
+    finally:
+        await soundboard.aclose()
+    return {
+        "turns": sum(r["turns"] for r in results),
+        "director_llm_calls": director.llm_calls,
+        "director_script_hits": director.script_hits,
+    }
+
+
+def _run_slice_process(
+    overrides: Dict[str, object],
+    scripts: List[List[str]],
+    indices: List[int],
+    concurrency: int,
+    out_dir: Path,
+    seed: int,
+) -> Dict[str, object]:
+    # process fils : Config ajustée par la ligne de commande du parent, boucle asyncio propre
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+    setup_logging()
+    return asyncio.run(arun_slice(scripts, indices, concurrency, out_dir, seed))
+
+
+def run_batch(
+    scripts_path: Path,
+    conversations: int,
+    concurrency: int,
+    out_root: Path,
+    seed: int = 0,
+    processes: int = 1,
+) -> Dict[str, object]:
+    """
+    processes > 1 : conversations réparties sur un pool de process (une boucle asyncio chacun,
+    `concurrency` conversations par process). Avec TOOL_BACKEND=http tous partagent le même serveur MCP ;
+    en stdio chaque process lance le sien.
+    """
+    scripts = load_utterances(scripts_path)
+    if not scripts:
+        raise SystemExit(f"Aucune réplique trouvée dans {scripts_path}")
+
+    out_dir = out_root / time.strftime("batch-%Y%m%d-%H%M%S")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    if processes <= 1:
+        parts = [asyncio.run(arun_slice(scripts, list(range(conversations)), concurrency, out_dir, seed))]
+    else:
+        overrides = {
+            "LLM_BACKEND": Config.LLM_BACKEND,
+            "FAKE_LLM_LATENCY": Config.FAKE_LLM_LATENCY,
+            "TOOL_BACKEND": Config.TOOL_BACKEND,
+        }
+        slices = [list(range(conversations))[p::processes] for p in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(_run_slice_process, overrides, scripts, indices, concurrency, out_dir, seed)
+                for indices in slices if indices
+            ]
+            parts = [f.result() for f in futures]
+    elapsed = time.perf_counter() - started
+
+    turns = sum(p["turns"] for p in parts)
+    summary = {
+        "conversations": conversations,
+        "concurrency": concurrency,
+        "processes": processes,
+        "turns": turns,
+        "seconds": round(elapsed, 3),
+        "turns_per_second": round(turns / elapsed, 2) if elapsed else None,
+        "director_llm_calls": sum(p["director_llm_calls"] for p in parts),
+        "director_script_hits": sum(p["director_script_hits"] for p in parts),
+        "backend": Config.LLM_BACKEND,
+        "tool_backend": Config.TOOL_BACKEND,
+        "transcripts": str(out_dir),
+    }
+    (out_dir / "summary.json").write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulations d'arnaque headless, en parallèle")
+    parser.add_argument("--scripts", default=Config.SCRIPTS_DIR, help="dossier ou fichier (.yaml / .txt)")
+    parser.add_argument("--conversations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--out", default="data/logs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fake", action="store_true", help="modèle local déterministe (aucun réseau)")
+    parser.add_argument("--latency", type=float, default=None, help="latence simulée du modèle local (s)")
+    parser.add_argument("--processes", type=int, default=1, help="process parallèles (ex: nombre de coeurs)")
+    parser.add_argument("--tool-backend", choices=["inprocess", "stdio", "http"], default=None)
+    args = parser.parse_args(argv)
+
+    # Avant toute construction d'agent : make_chat lit Config au moment de l'appel
+    if args.fake:
+        Config.LLM_BACKEND = "fake"
+    if args.latency is not None:
+        Config.FAKE_LLM_LATENCY = args.latency
+    if args.tool_backend:
+        Config.TOOL_BACKEND = args.tool_backend
+    if Config.LLM_BACKEND != "fake" and not Config.OPENAI_API_KEY:
+        raise SystemExit("OPENAI_API_KEY manquant (ou utiliser --fake)")
+
+    setup_logging()
+    summary = run_batch(
+        Path(args.scripts), args.conversations, max(1, args.concurrency), Path(args.out), args.seed, args.processes
+    )
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
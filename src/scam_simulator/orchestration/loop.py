@@ -1,55 +1,178 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import aclosing, suppress
+from typing import TYPE_CHECKING, Optional, Tuple
+
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 
 from scam_simulator.config import Config
-from scam_simulator.agents.victim_agent import VictimAgent
-from scam_simulator.agents.director_agent import DirectorAgent
-from scam_simulator.agents.moderator_agent import ModeratorAgent
+from scam_simulator.guardrails import BLOCKED_MESSAGE, get_guardrails
+from scam_simulator.orchestration.persistence import TurnRecord, get_session_store, resume_session
+from scam_simulator.orchestration.premoderation import premoderate
+from scam_simulator.orchestration.speculative import aspeculative_reply
 from scam_simulator.orchestration.state import SimulationState
 from scam_simulator.orchestration.audience import collect_proposals, run_vote
+from scam_simulator.orchestration.votes import VoteServer, arun_vote
 
+if TYPE_CHECKING:
+    from scam_simulator.agents.director_agent import DirectorAgent
+    from scam_simulator.agents.moderator_agent import ModeratorAgent
+    from scam_simulator.agents.victim_agent import VictimAgent
 
 console = Console()
 
 
-def run_simulation() -> None:
-    if not Config.OPENAI_API_KEY:
+def build_agents() -> Tuple[VictimAgent, DirectorAgent, ModeratorAgent]:
+    """Import (langchain, SDK openai : ~1-2 s) + construction des agents. Appelé dans un thread."""
+    from scam_simulator.agents.director_agent import DirectorAgent
+    from scam_simulator.agents.moderator_agent import ModeratorAgent
+    from scam_simulator.agents.victim_agent import VictimAgent
+
+    return VictimAgent(), DirectorAgent(), ModeratorAgent()
+
+
+async def aprepare_agents() -> Tuple[VictimAgent, DirectorAgent, ModeratorAgent]:
+    """Agents construits hors de la boucle, puis victime pré-chauffée en fond (session MCP, connexion LLM)."""
+    victim, director, moderator = await asyncio.to_thread(build_agents)
+    if Config.PREWARM:
+        victim.prewarm()
+    return victim, director, moderator
+
+
+async def arun_simulation(session_id: Optional[str] = None) -> None:
+    """
+    Boucle CLI async : une seule boucle d'événements pour toute la session.
+    Les input() bloquants passent par un thread pour ne pas geler la boucle.
+    session_id : reprend une session enregistrée (SESSIONS_ENABLED) au lieu d'en créer une.
+    """
+    if Config.LLM_BACKEND != "fake" and not Config.OPENAI_API_KEY:
         console.print("[red]ERREUR: OPENAI_API_KEY manquant. Mets-le dans .env[/red]")
         return
 
-    victim = VictimAgent()
-    director = DirectorAgent()
-    moderator = ModeratorAgent()
+    # la bannière et le prompt s'affichent tout de suite : agents préparés pendant la saisie du premier message
+    agents = asyncio.ensure_future(aprepare_agents())
+    victim: Optional[VictimAgent] = None
     state = SimulationState()
+    store = get_session_store() if Config.SESSIONS_ENABLED else None
+    if store is not None:
+        if session_id and store.session(session_id) is not None:
+            # reprise : mémoire et tracker sont rechargés dans les agents avant le premier message
+            victim, director, moderator = await agents
+            resume_session(session_id, state, victim, director, store)
+            console.print(f"[green]Session {session_id} reprise au tour {state.turn}.[/green]")
+        else:
+            if session_id:
+                console.print(f"[yellow]Session {session_id} inconnue : nouvelle session.[/yellow]")
+            session_id = store.new_session_id()
+        console.print(f"Session : {session_id} (reprise : python -m scam_simulator.main --resume {session_id})")
+    # vote public (HTTP) : un service pour toute la session, une fenêtre minutée par round
+    votes = VoteServer() if Config.VOTE_SERVICE else None
 
     console.print(Panel.fit("SIMULATEUR D'ARNAQUE (LLM + Tools)\nTape 'quit' pour quitter", title="Projet Arnaque"))
 
-    while state.running:
-        scammer = input("Arnaqueur > ").strip()
-        if scammer.lower() == "quit":
-            break
-
-        # Directeur -> objectif dynamique
-        state.current_objective = director.analyze(scammer)
-
-        # Audience tous les 3 tours
-        if state.turn % 3 == 0 and state.turn != 0:
-            proposals = collect_proposals()
-            if proposals:
-                choices = moderator.pick_three(proposals, context=state.current_objective)
-            else:
-                # fallback si personne ne propose
-                choices = ["Quelqu'un sonne à la porte", "Le chien aboie fort", "Quinte de toux"]
-            state.audience_constraint = run_vote(choices)
-
-        # Victime -> peut tool-call
-        reply = victim.respond(
-            user_input=scammer,
-            objective=state.current_objective,
-            constraint=state.audience_constraint,
-        )
-
-        console.print(Panel(reply, title="Jeanne", subtitle=f"objectif: {state.current_objective}"))
-        state.turn += 1
+    try:
+        while state.running:
+            scammer = (await asyncio.to_thread(input, "Arnaqueur > ")).strip()
+            if scammer.lower() == "quit":
+                break
+            if victim is None:
+                victim, director, moderator = await agents
+                state.scenario = director.new_tracker()
+
+            # Directeur -> objectif dynamique
+            # (mode fusionné : seulement le script YAML ; sinon c'est la victime qui le produit)
+            # (mode spéculatif : lancé plus bas, en parallèle du brouillon de la victime)
+            fused = False
+            speculative = Config.DIRECTOR_MODE == "speculative"
+            if Config.DIRECTOR_MODE == "fused":
+                objective = director.from_script(scammer, state.scenario)
+                fused = objective is None
+                state.current_objective = objective or state.current_objective
+            elif not speculative:
+                state.current_objective = await director.aanalyze(scammer, state.scenario)
+
+            # Audience tous les 3 tours
+            if state.turn % 3 == 0 and state.turn != 0:
+                director_task = None
+                if speculative:
+                    # le modérateur a besoin de l'objectif de CE tour : directeur lancé pendant la saisie
+                    # des idées, puis réponse non spéculative (l'objectif est déjà connu)
+                    director_task = asyncio.ensure_future(director.aanalyze(scammer, state.scenario))
+                    speculative = False
+                try:
+                    proposals = await asyncio.to_thread(collect_proposals)
+                    if director_task is not None:
+                        state.current_objective = await director_task
+                finally:
+                    if director_task is not None and not director_task.done():
+                        director_task.cancel()
+                # pré-modération locale : quasi-doublons regroupés, idées dangereuses filtrées, top-K
+                proposals = premoderate(proposals)
+                if proposals:
+                    choices = await moderator.apick_three(proposals, context=state.current_objective)
+                else:
+                    # fallback si personne ne propose
+                    choices = ["Quelqu'un sonne à la porte", "Le chien aboie fort", "Quinte de toux"]
+                if votes is not None:
+                    state.audience_constraint = await arun_vote(choices, server=votes)
+                else:
+                    state.audience_constraint = await asyncio.to_thread(run_vote, choices)
+
+            # Victime -> peut tool-call ; réponse affichée au fil des tokens
+            # Guardrail incrémental : la génération est coupée dès qu'une info sensible apparaît
+            reply = ""
+            guard = get_guardrails().stream()
+            subtitle = "objectif: …" if fused or speculative else f"objectif: {state.current_objective}"
+            with Live(Panel("…", title="Jeanne", subtitle=subtitle), console=console, refresh_per_second=15) as live:
+                if speculative:
+                    stream = aspeculative_reply(scammer, state, victim, director)
+                else:
+                    stream = victim.astream_respond(
+                        user_input=scammer,
+                        objective=state.current_objective,
+                        constraint=state.audience_constraint,
+                        fused=fused,
+                    )
+                async with aclosing(stream):
+                    async for chunk in stream:
+                        reply += guard.feed(chunk)
+                        if guard.violation is not None:
+                            break
+                        live.update(Panel(reply, title="Jeanne", subtitle=subtitle))
+
+                if guard.violation is not None:
+                    reply = BLOCKED_MESSAGE
+                    victim.remember(scammer, reply)
+                else:
+                    reply += guard.finish()
+                if fused and victim.last_objective:
+                    state.current_objective = victim.last_objective
+                subtitle = f"objectif: {state.current_objective}"
+                live.update(Panel(reply, title="Jeanne", subtitle=subtitle))
+            if store is not None:
+                record = TurnRecord(
+                    turn=state.turn,
+                    scammer=scammer,
+                    objective=state.current_objective,
+                    constraint=state.audience_constraint,
+                    reply=reply,
+                    tool_calls=list(victim.last_tool_calls),
+                )
+                store.append(session_id, record, victim.memory.summary)
+            state.turn += 1
+    finally:
+        if votes is not None:
+            await votes.aclose()
+        if victim is None:
+            agents.cancel()  # aucun message envoyé : agents fermés s'ils ont eu le temps d'être construits
+            with suppress(asyncio.CancelledError):
+                victim = (await agents)[0]
+        if victim is not None:
+            await victim.aclose()
+
+
+def run_simulation(session_id: Optional[str] = None) -> None:
+    asyncio.run(arun_simulation(session_id))
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from scam_simulator.config import Config
+from scam_simulator.orchestration.state import SimulationState
+
+if TYPE_CHECKING:
+    # agents et mémoire (langchain) : seulement pour les annotations, le journal s'ouvre sans eux
+    from scam_simulator.agents.director_agent import DirectorAgent
+    from scam_simulator.agents.victim_agent import VictimAgent
+    from scam_simulator.llm.memory import ConversationMemory
+
+_FLUSH = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    turns INTEGER NOT NULL DEFAULT 0,
+    objective TEXT,
+    audience_constraint TEXT,
+    summary TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS turns (
+    session_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    created REAL NOT NULL,
+    scammer TEXT NOT NULL,
+    objective TEXT,
+    audience_constraint TEXT,
+    reply TEXT NOT NULL,
+    tool_calls TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (session_id, turn)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class TurnRecord:
+    turn: int
+    scammer: str
+    objective: Optional[str]
+    constraint: Optional[str]
+    reply: str
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    created: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class SessionInfo:
+    id: str
+    created: float
+    updated: float
+    turns: int
+    objective: Optional[str]
+    constraint: Optional[str]
+    summary: str = ""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")  # WAL : durable au checkpoint, pas de fsync par commit
+    return db
+
+
+class SessionStore:
+    """
+    Journal des conversations (SQLite en WAL) :
+    - append() ne fait qu'un put() ; un thread d'écriture insère par lots, un commit par lot
+    - lectures sur une connexion séparée (WAL : les lecteurs ne bloquent pas l'écrivain)
+    - reprise d'une session : état + mémoire de la victime reconstruits depuis les tours
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        self.path = path or Config.SESSIONS_DB
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size or Config.SESSIONS_BATCH_SIZE
+        self.flush_interval = Config.SESSIONS_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.dropped = 0
+
+        self._writer = _connect(self.path)
+        self._writer.executescript(SCHEMA)
+        self._writer.commit()
+        self._reader = _connect(self.path)
+        self._read_lock = threading.Lock()
+
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._flushed = threading.Condition()
+        self._pending = 0
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    # -----------------------------
+    # Écriture (non bloquante)
+    # -----------------------------
+    @staticmethod
+    def new_session_id() -> str:
+        return uuid.uuid4().hex[:12]
+
+    def append(self, session_id: str, record: TurnRecord, summary: str = "") -> None:
+        with self._flushed:
+            self._pending += 1
+        self._queue.put((session_id, record, summary))
+
+    def _write(self, batch: List[tuple]) -> None:
+        with self._writer:  # une transaction (un commit) pour tout le lot
+            self._writer.executemany(
+                "INSERT OR REPLACE INTO turns VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        sid, r.turn, r.created, r.scammer, r.objective, r.constraint, r.reply,
+                        json.dumps(r.tool_calls, ensure_ascii=False, default=str),
+                    )
+                    for sid, r, _ in batch
+                ],
+            )
+            latest: Dict[str, tuple] = {}
+            for sid, r, summary in batch:
+                latest[sid] = (sid, r.created, r.created, r.turn + 1, r.objective, r.constraint, summary)
+            self._writer.executemany(
+                """
+                INSERT INTO sessions (id, created, updated, turns, objective, audience_constraint, summary)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    updated = excluded.updated, turns = MAX(turns, excluded.turns),
+                    objective = excluded.objective, audience_constraint = excluded.audience_constraint,
+                    summary = CASE WHEN excluded.summary != '' THEN excluded.summary ELSE summary END
+                """,
+                list(latest.values()),
+            )
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[tuple] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if item is _FLUSH:
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    self._write(batch)
+                except sqlite3.Error:
+                    self.dropped += len(batch)
+            with self._flushed:
+                self._pending -= len(batch)
+                self._flushed.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        with self._flushed:
+            if self._pending > 0:
+                self._queue.put(_FLUSH)  # écrit le lot en cours sans attendre flush_interval
+            self._flushed.wait_for(lambda: self._pending <= 0, timeout)
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._writer.close()
+        self._reader.close()
+
+    # -----------------------------
+    # Lecture
+    # -----------------------------
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        self.flush()  # lire ses propres écritures
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def session(self, session_id: str) -> Optional[SessionInfo]:
+        rows = self._query("SELECT * FROM sessions WHERE id = ?", (session_id,))
+        return SessionInfo(*rows[0]) if rows else None
+
+    def sessions(self, limit: int = 20) -> List[SessionInfo]:
+        return [SessionInfo(*r) for r in self._query("SELECT * FROM sessions ORDER BY updated DESC LIMIT ?", (limit,))]
+
+    def count(self, session_id: str) -> int:
+        return self._query("SELECT COUNT(*) FROM turns WHERE session_id = ?", (session_id,))[0][0]
+
+    def page(self, session_id: str, limit: int, before: Optional[int] = None) -> List[TurnRecord]:
+        """`limit` tours précédant le tour `before` (les derniers si None), dans l'ordre chronologique."""
+        rows = self._query(
+            "SELECT turn, scammer, objective, audience_constraint, reply, tool_calls, created FROM turns"
+            " WHERE session_id = ? AND turn < ? ORDER BY turn DESC LIMIT ?",
+            (session_id, before if before is not None else 1 << 62, limit),
+        )
+        return [TurnRecord(t, s, o, c, r, json.loads(tc), cr) for t, s, o, c, r, tc, cr in reversed(rows)]
+
+    def scammer_lines(self, session_id: str) -> List[str]:
+        return [r[0] for r in self._query("SELECT scammer FROM turns WHERE session_id = ? ORDER BY turn", (session_id,))]
+
+    # -----------------------------
+    # Reprise
+    # -----------------------------
+    def restore_memory(self, session_id: str, memory: ConversationMemory, summary: str = "") -> int:
+        """
+        Recharge la fenêtre récente (les derniers tours qui tiennent dans le budget de tokens)
+        et le résumé enregistré ; les tours plus anciens ne sont pas relus. Renvoie le nombre de tours rejoués.
+        """
+        from scam_simulator.llm.memory import count_tokens
+
+        memory.clear()
+        memory.summary = summary
+        budget = memory.budget_tokens
+        recent: List[TurnRecord] = []
+        before: Optional[int] = None
+        while True:
+            page = self.page(session_id, 20, before)
+            if not page:
+                break
+            for record in reversed(page):
+                budget -= count_tokens(record.scammer) + count_tokens(record.reply)
+                if budget < 0 and recent:
+                    break
+                recent.append(record)
+            if budget < 0:
+                break
+            before = page[0].turn
+        for record in reversed(recent):
+            memory.add_turn(record.scammer, record.reply)
+        return len(recent)
+
+
+def resume_session(
+    session_id: str,
+    state: SimulationState,
+    victim: VictimAgent,
+    director: DirectorAgent,
+    store: Optional[SessionStore] = None,
+) -> bool:
+    """Recharge une session enregistrée dans `state` et la mémoire de `victim`. False si inconnue."""
+    store = store or get_session_store()
+    info = store.session(session_id)
+    if info is None:
+        return False
+    state.turn = info.turns
+    state.current_objective = info.objective or state.current_objective
+    state.audience_constraint = info.constraint
+    # étape du script : on rejoue les messages de l'arnaqueur dans un tracker neuf (regex, sans LLM)
+    state.scenario = director.new_tracker()
+    if state.scenario is not None:
+        for line in store.scammer_lines(session_id):
+            state.scenario.observe(line)
+    store.restore_memory(session_id, victim.memory, info.summary)
+    # la contrainte en cours a déjà déclenché son tool avant l'interruption
+    victim.mark_dispatched(info.constraint)
+    return True
+
+
+@lru_cache(maxsize=1)
+def get_session_store() -> SessionStore:
+    store = SessionStore()
+    atexit.register(store.close)
+    return store
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from scam_simulator.config import Config
+from scam_simulator.guardrails import get_guardrails
+from scam_simulator.matching import compile_keywords, normalize
+from scam_simulator.telemetry import span
+
+# Filtre local (avant tout LLM) : idées violentes / hors sujet évidentes
+DEFAULT_BLOCKED = [
+    "tuer", "meurtre", "arme", "fusil", "couteau", "bombe", "suicide", "drogue",
+    "sang", "frapper", "viol", "nazi", "porno", "sexe", "insulte",
+]
+_URL = re.compile(r"https?://|www\.", re.IGNORECASE)
+_PUNCT = re.compile(r"[^\w\s]")
+_WS = re.compile(r"\s+")
+
+MAX_LENGTH = 200
+NGRAM = 3
+PERMUTATIONS = 32
+BANDS = 8  # 8 bandes de 4 lignes : seuil LSH ~ (1/8)^(1/4) ≈ 0.6
+_MASK = (1 << 32) - 1
+# permutations MinHash déterministes : x -> (a*x + b) mod 2^32, a impair (bijection sur 32 bits)
+_PERMS = [
+    (zlib.crc32(f"a{i}".encode()) | 1, zlib.crc32(f"b{i}".encode())) for i in range(PERMUTATIONS)
+]
+
+
+@lru_cache(maxsize=1)
+def _numpy_perms() -> Any:
+    try:
+        import numpy as np
+    except ImportError:  # numpy absent : version pur Python
+        return None
+    return np, np.array([a for a, _ in _PERMS], dtype=np.uint64)[:, None], np.array([b for _, b in _PERMS], dtype=np.uint64)[:, None]
+
+
+def normalize_proposal(text: str) -> str:
+    """Minuscules, sans accents ni ponctuation, espaces compactés."""
+    return _WS.sub(" ", _PUNCT.sub(" ", normalize(text))).strip()
+
+
+def shingles(text: str, n: int = NGRAM) -> Set[int]:
+    padded = f" {text} "
+    if len(padded) <= n:
+        return {zlib.crc32(padded.encode("utf-8"))}
+    return {zlib.crc32(padded[i:i + n].encode("utf-8")) for i in range(len(padded) - n + 1)}
+
+
+def minhash(hashes: Set[int]) -> List[int]:
+    vec = _numpy_perms()
+    if vec is not None:
+        np, a, b = vec
+        x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))[None, :]
+        return ((a * x + b) & np.uint64(_MASK)).min(axis=1).tolist()
+    return [min((a * h + b) & _MASK for h in hashes) for a, b in _PERMS]
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+@dataclass
+class ProposalCluster:
+    representative: str
+    count: int
+    members: List[str] = field(default_factory=list)
+
+
+class PreModerator:
+    """
+    Pré-modération locale des idées de l'audience (avant ModeratorAgent) :
+    - normalisation + regroupement des doublons exacts (Counter)
+    - filtre rapide des idées dangereuses (mots-clés, liens, données sensibles via le guardrail)
+    - quasi-doublons regroupés : MinHash sur n-grammes de caractères + LSH, vérifiés au Jaccard
+    - top-K clusters par nombre de soumissions -> taille du prompt modérateur constante
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        top_k: Optional[int] = None,
+        blocked: Iterable[str] = DEFAULT_BLOCKED,
+    ) -> None:
+        self.threshold = Config.PREMODERATION_SIMILARITY if threshold is None else threshold
+        self.top_k = top_k or Config.PREMODERATION_TOP_K
+        self.blocked = compile_keywords(list(blocked) + list(Config.PREMODERATION_BLOCKED_KEYWORDS))
+        self.dropped = 0
+
+    def is_unsafe(self, text: str, normalized: str) -> bool:
+        return (
+            len(text) > MAX_LENGTH
+            or bool(_URL.search(text))
+            or bool(self.blocked.search(normalized))
+            or get_guardrails().scan(text) is not None
+        )
+
+    def clusters(self, proposals: Iterable[str]) -> List[ProposalCluster]:
+        # 1) doublons exacts (après normalisation) : une seule entrée par forme
+        counts: Counter = Counter()
+        originals: Dict[str, Counter] = {}
+        for raw in proposals:
+            text = (raw or "").strip()
+            key = normalize_proposal(text)
+            if not key:
+                continue
+            if self.is_unsafe(text, key):
+                self.dropped += 1
+                continue
+            counts[key] += 1
+            originals.setdefault(key, Counter())[text] += 1
+
+        keys = list(counts)
+        sets = [shingles(k) for k in keys]
+
+        # 2) LSH : seules les formes qui partagent une bande de signature sont comparées
+        parent = list(range(len(keys)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        rows = PERMUTATIONS // BANDS
+        buckets: Dict[tuple, int] = {}
+        for i, sig in enumerate(minhash(s) for s in sets):
+            for band in range(BANDS):
+                bucket = (band, *sig[band * rows:(band + 1) * rows])
+                j = buckets.setdefault(bucket, i)
+                if j != i and find(i) != find(j) and jaccard(sets[i], sets[j]) >= self.threshold:
+                    parent[find(i)] = find(j)
+
+        # 3) clusters classés par nombre de soumissions
+        # représentant = forme normalisée la plus soumise, dans son écriture d'origine la plus fréquente
+        grouped: Dict[int, List[str]] = {}
+        for i, key in enumerate(keys):
+            grouped.setdefault(find(i), []).append(key)
+        clusters = []
+        for members in grouped.values():
+            best = min(members, key=lambda k: (-counts[k], len(k)))
+            representative = originals[best].most_common(1)[0][0]
+            texts = [t for key in members for t in originals[key]]
+            clusters.append(ProposalCluster(representative, sum(counts[k] for k in members), texts))
+        clusters.sort(key=lambda c: (-c.count, c.representative))
+        return clusters
+
+    def top(self, proposals: Iterable[str]) -> List[ProposalCluster]:
+        proposals = list(proposals)
+        with span("premoderation", proposals=len(proposals)) as sp:
+            clusters = self.clusters(proposals)
+            sp.set(clusters=len(clusters), kept=min(len(clusters), self.top_k))
+        return clusters[: self.top_k]
+
+
+@lru_cache(maxsize=1)
+def get_premoderator() -> PreModerator:
+    return PreModerator()
+
+
+def premoderate(proposals: Iterable[str]) -> List[str]:
+    """Idées représentatives (top-K clusters) à passer au modérateur."""
+    return [c.representative for c in get_premoderator().top(proposals)]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from scam_simulator.config import Config
+from scam_simulator.matching import compile_keywords, normalize
+
+StepKey = Tuple[int, int]  # (index script, index étape)
+
+
+@dataclass
+class ScenarioStep:
+    id: str
+    goal: str
+    objective: str
+    signals: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ScenarioScript:
+    id: str
+    name: str
+    steps: List[ScenarioStep]
+
+
+def _default_objective(goal: str) -> str:
+    return f"L'arnaqueur cherche à: {goal.lower()}. Gagner du temps sans jamais obéir."
+
+
+def load_script(path: Path) -> ScenarioScript:
+    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    steps = [
+        ScenarioStep(
+            id=str(s.get("id", i)),
+            goal=s.get("goal", ""),
+            objective=s.get("objective") or _default_objective(s.get("goal", "")),
+            signals=[str(sig) for sig in s.get("signals") or []],
+        )
+        for i, s in enumerate(data.get("steps") or [])
+    ]
+    return ScenarioScript(id=path.stem, name=data.get("name", path.stem), steps=steps)
+
+
+class ScenarioEngine:
+    """
+    Scripts d'arnaque (data/scripts/*.yaml) compilés en un seul matcher multi-motifs.
+    Partagé par tout le process ; l'état d'une conversation vit dans un ScenarioTracker.
+    """
+
+    def __init__(self, scripts: List[ScenarioScript]) -> None:
+        self.scripts = scripts
+        self._by_signal: Dict[str, List[StepKey]] = defaultdict(list)
+        for si, script in enumerate(scripts):
+            for ti, step in enumerate(script.steps):
+                for sig in step.signals:
+                    key = normalize(sig.strip())
+                    if key and (si, ti) not in self._by_signal[key]:
+                        self._by_signal[key].append((si, ti))
+        self._matcher = compile_keywords(self._by_signal.keys())
+
+    @classmethod
+    def from_dir(cls, path: Path) -> "ScenarioEngine":
+        files = sorted(path.glob("*.yaml")) + sorted(path.glob("*.yml")) if path.is_dir() else []
+        return cls([load_script(f) for f in files])
+
+    def match(self, text: str) -> Dict[StepKey, int]:
+        """Nombre de signaux distincts trouvés par étape, en une seule passe sur le texte."""
+        hits: Dict[StepKey, int] = defaultdict(int)
+        for signal in {m.group() for m in self._matcher.finditer(normalize(text))}:
+            for key in self._by_signal.get(signal, ()):
+                hits[key] += 1
+        return hits
+
+    def step(self, key: StepKey) -> ScenarioStep:
+        return self.scripts[key[0]].steps[key[1]]
+
+    def tracker(self) -> "ScenarioTracker":
+        return ScenarioTracker(self)
+
+
+class ScenarioTracker:
+    """
+    Suit l'étape courante d'UNE conversation au fil des messages.
+    observe() renvoie un objectif quand le match est net (au moins Config.SCENARIO_MIN_SIGNALS signaux
+    sur une seule étape en tête), sinon None (-> Directeur LLM).
+    """
+
+    def __init__(self, engine: ScenarioEngine, min_signals: Optional[int] = None) -> None:
+        self.engine = engine
+        self.min_signals = max(1, min_signals or Config.SCENARIO_MIN_SIGNALS)
+        self.script: Optional[int] = None
+        self.stage: Optional[int] = None
+
+    @property
+    def current_step(self) -> Optional[ScenarioStep]:
+        if self.script is None or self.stage is None:
+            return None
+        return self.engine.step((self.script, self.stage))
+
+    def observe(self, text: str) -> Optional[str]:
+        hits = self.engine.match(text)
+        if not hits:
+            return None
+
+        # Une fois le script identifié, on ne regarde que ses étapes (s'il y en a de touchées)
+        if self.script is not None and any(si == self.script for si, _ in hits):
+            hits = {k: v for k, v in hits.items() if k[0] == self.script}
+
+        per_script: Dict[int, int] = defaultdict(int)
+        for (si, _), n in hits.items():
+            per_script[si] += n
+        best = max(per_script.values())
+        top_scripts = [si for si, n in per_script.items() if n == best]
+        if len(top_scripts) != 1:
+            return None  # signaux partagés entre plusieurs scripts : ambigu
+
+        script = top_scripts[0]
+        steps = {ti: n for (si, ti), n in hits.items() if si == script}
+        best_step = max(steps.values())
+        top_steps = [ti for ti, n in steps.items() if n == best_step]
+        if len(top_steps) != 1:
+            return None  # plusieurs étapes à égalité : ambigu
+        if best_step < self.min_signals:
+            return None  # mot-clé isolé : pas assez sûr pour se passer du directeur
+
+        self.script, self.stage = script, top_steps[0]
+        return self.current_step.objective
+
+
+@lru_cache(maxsize=1)
+def get_scenario_engine() -> ScenarioEngine:
+    """Chargé une fois au démarrage (tous les YAML de Config.SCRIPTS_DIR)."""
+    return ScenarioEngine.from_dir(Path(Config.SCRIPTS_DIR))
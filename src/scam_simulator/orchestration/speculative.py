@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from contextlib import aclosing
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Set
+
+from scam_simulator.config import Config
+from scam_simulator.matching import normalize
+from scam_simulator.orchestration.state import SimulationState
+from scam_simulator.telemetry import emit_span
+
+if TYPE_CHECKING:
+    from scam_simulator.agents.director_agent import DirectorAgent
+    from scam_simulator.agents.victim_agent import VictimAgent
+
+_WORD = re.compile(r"\w{3,}")
+_DONE = object()
+
+
+def _words(text: str) -> Set[str]:
+    return set(_WORD.findall(normalize(text)))
+
+
+def objective_similarity(a: str, b: str) -> float:
+    """Jaccard sur les mots (accents/casse ignorés, mots de moins de 3 lettres ignorés)."""
+    wa, wb = _words(a or ""), _words(b or "")
+    if not wa and not wb:
+        return 1.0
+    return len(wa & wb) / len(wa | wb)
+
+
+def same_objective(old: str, new: str, threshold: Optional[float] = None) -> bool:
+    threshold = Config.SPECULATIVE_SIMILARITY if threshold is None else threshold
+    return old == new or objective_similarity(old, new) >= threshold
+
+
+async def aspeculative_reply(
+    scammer: str,
+    state: SimulationState,
+    victim: VictimAgent,
+    director: DirectorAgent,
+) -> AsyncIterator[str]:
+    """
+    Mode spéculatif : la victime commence tout de suite avec l'objectif précédent
+    pendant que le directeur calcule le nouveau.
+    - objectif équivalent : le brouillon (déjà en partie généré) est streamé puis mémorisé
+    - objectif changé : le brouillon est abandonné et la réponse régénérée avec le nouvel objectif
+    Les tools du brouillon (effets sonores) n'ont lieu qu'une fois le brouillon gardé.
+    Met à jour state.current_objective ; yield les morceaux de la réponse retenue.
+    """
+    previous = state.current_objective
+    generation = victim.memory.generation
+    queue: "asyncio.Queue[object]" = asyncio.Queue()
+    keep = asyncio.Event()
+
+    async def draft() -> None:
+        stream = victim.astream_respond(
+            user_input=scammer,
+            objective=previous,
+            constraint=state.audience_constraint,
+            remember=False,
+            tools_gate=keep,
+        )
+        try:
+            async with aclosing(stream):
+                async for chunk in stream:
+                    queue.put_nowait(chunk)
+        except Exception as exc:
+            queue.put_nowait(exc)
+        finally:
+            queue.put_nowait(_DONE)
+
+    draft_task = asyncio.create_task(draft(), name="victim-draft")
+    t0 = time.perf_counter()
+    try:
+        state.current_objective = await director.aanalyze(scammer, state.scenario)
+    except BaseException:
+        draft_task.cancel()
+        raise
+    similarity = objective_similarity(previous, state.current_objective)
+    kept = same_objective(previous, state.current_objective)
+    emit_span(
+        "speculation.kept" if kept else "speculation.regenerated",
+        time.perf_counter() - t0,
+        similarity=round(similarity, 3),
+    )
+
+    if not kept:
+        draft_task.cancel()
+        await asyncio.gather(draft_task, return_exceptions=True)
+        stream = victim.astream_respond(
+            user_input=scammer,
+            objective=state.current_objective,
+            constraint=state.audience_constraint,
+        )
+        async with aclosing(stream):
+            async for chunk in stream:
+                yield chunk
+        return
+
+    keep.set()
+    parts: List[str] = []
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            parts.append(item)
+            yield item
+    finally:
+        # consommateur arrêté en route (guardrail) : le brouillon n'est pas mémorisé
+        if not draft_task.done():
+            draft_task.cancel()
+    victim.remember(scammer, "".join(parts), generation)
@@ -9,3 +9,6 @@ class SimulationState:
         self.audience_constraint = None
 
         self.running = True
+
+        # Suivi de l'étape du script d'arnaque (ScenarioTracker, optionnel)
+        self.scenario = None
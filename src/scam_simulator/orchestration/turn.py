@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from scam_simulator.agents.director_agent import DirectorAgent
+from scam_simulator.agents.victim_agent import VictimAgent
+from scam_simulator.config import Config
+from scam_simulator.guardrails import guardrails_check
+from scam_simulator.orchestration.speculative import aspeculative_reply
+from scam_simulator.orchestration.state import SimulationState
+from scam_simulator.telemetry import trace
+
+
+@dataclass
+class TurnResult:
+    turn: int
+    scammer: str
+    objective: str
+    constraint: Optional[str]
+    reply: str
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+async def aplay_turn(
+    scammer: str,
+    state: SimulationState,
+    victim: VictimAgent,
+    director: DirectorAgent,
+    mode: Optional[str] = None,
+) -> TurnResult:
+    """
+    Un tour complet sans interface : Directeur -> objectif, réponse de la victime, guardrail.
+    mode "fused" : script YAML si match net, sinon objectif + réponse en un seul appel victime.
+    mode "speculative" : brouillon victime en parallèle du directeur (voir aspeculative_reply).
+    """
+    mode = mode or Config.DIRECTOR_MODE
+    with trace(turn=state.turn, mode=mode):
+        if mode == "speculative":
+            reply = "".join([c async for c in aspeculative_reply(scammer, state, victim, director)])
+            fused = False
+        elif mode == "fused":
+            objective = director.from_script(scammer, state.scenario)
+            fused = objective is None
+            if objective:
+                state.current_objective = objective
+        else:
+            fused = False
+            state.current_objective = await director.aanalyze(scammer, state.scenario)
+        if mode != "speculative":
+            reply = await victim.arespond(
+                user_input=scammer,
+                objective=state.current_objective,
+                constraint=state.audience_constraint,
+                fused=fused,
+            )
+        if fused and victim.last_objective:
+            state.current_objective = victim.last_objective
+        blocked = guardrails_check(reply)
+        if blocked:
+            reply = blocked
+            victim.memory.amend_last_reply(blocked)
+    result = TurnResult(
+        turn=state.turn,
+        scammer=scammer,
+        objective=state.current_objective,
+        constraint=state.audience_constraint,
+        reply=reply,
+        tool_calls=list(victim.last_tool_calls),
+    )
+    state.turn += 1
+    return result
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from scam_simulator.config import Config
+from scam_simulator.runtime import run_sync
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict", 413: "Payload Too Large"}
+# Corps de requête max (lot POST /votes) : refusé avant lecture, un client ne fait pas allouer n'importe quoi
+MAX_BODY = 1 << 20
+
+
+class VoteWindow:
+    """
+    Fenêtre de vote sur les choix du modérateur.
+    Tout tourne sur une seule boucle asyncio : compteurs et ensemble des votants sans verrou.
+    Un votant = une voix (la première compte, les suivantes sont ignorées).
+    """
+
+    def __init__(self, choices: List[str], duration: float) -> None:
+        self.choices = list(choices)
+        self.counts = [0] * len(self.choices)
+        self.voters: Set[str] = set()
+        self.duplicates = 0
+        self.rejected = 0
+        self.opened = time.monotonic()
+        self.deadline = self.opened + duration
+        self._closed = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set() or time.monotonic() >= self.deadline
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def _index(self, choice: str) -> Optional[int]:
+        if choice.isdigit():
+            index = int(choice)
+            return index if 0 <= index < len(self.choices) else None
+        try:
+            return self.choices.index(choice)
+        except ValueError:
+            return None
+
+    def cast(self, voter: str, choice: str) -> str:
+        """Renvoie "ok", "dup", "closed" ou "invalid"."""
+        if self.closed:
+            return "closed"
+        index = self._index(choice)
+        if not voter or index is None:
+            self.rejected += 1
+            return "invalid"
+        if voter in self.voters:
+            self.duplicates += 1
+            return "dup"
+        self.voters.add(voter)
+        self.counts[index] += 1
+        return "ok"
+
+    def close(self) -> None:
+        self._closed.set()
+
+    async def wait(self) -> None:
+        try:
+            await asyncio.wait_for(self._closed.wait(), self.remaining)
+        except asyncio.TimeoutError:
+            pass
+        self.close()
+
+    def winner(self) -> str:
+        # égalité : premier choix proposé par le modérateur
+        best = max(range(len(self.choices)), key=lambda i: (self.counts[i], -i))
+        return self.choices[best]
+
+    def tally(self) -> Dict[str, object]:
+        return {
+            "choices": self.choices,
+            "counts": self.counts,
+            "votes": len(self.voters),
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "remaining": round(self.remaining, 2),
+            "closed": self.closed,
+        }
+
+
+class VoteServer:
+    """
+    Service HTTP/1.1 minimal (asyncio pur, keep-alive + pipelining) :
+    - POST /vote?voter=ID&choice=N  (ou corps JSON {"voter": ..., "choice": ...})
+    - POST /votes                   (lot : une ligne "ID,N" par vote)
+    - GET  /tally                   (décompte courant, JSON)
+    - GET  /stream                  (décomptes en Server-Sent Events jusqu'à la fermeture)
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, tick: float = 0.25) -> None:
+        self.host = host or Config.VOTE_HOST
+        self.port = Config.VOTE_PORT if port is None else port
+        self.tick = tick
+        self.window: Optional[VoteWindow] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._streams: Set[asyncio.Task] = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def aclose(self) -> None:
+        if self.window is not None:
+            self.window.close()
+        if self._streams:
+            # les flux SSE envoient le décompte final avant la fermeture
+            await asyncio.wait(set(self._streams), timeout=1.0)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def open(self, choices: List[str], duration: Optional[float] = None) -> VoteWindow:
+        if self.window is not None:
+            self.window.close()
+        self.window = VoteWindow(choices, Config.VOTE_WINDOW if duration is None else duration)
+        return self.window
+
+    async def aopen(self, choices: List[str], duration: Optional[float] = None) -> VoteWindow:
+        """open() depuis un autre thread (Streamlit) : run_sync(server.aopen(...))."""
+        return self.open(choices, duration)
+
+    async def collect(self, choices: List[str], duration: Optional[float] = None) -> str:
+        """Ouvre une fenêtre, attend la fin du minuteur, renvoie le choix gagnant."""
+        await self.start()
+        window = self.open(choices, duration)
+        await window.wait()
+        return window.winner()
+
+    # -----------------------------
+    # HTTP
+    # -----------------------------
+    @staticmethod
+    def _response(status: int, body: bytes, content_type: str = "text/plain") -> bytes:
+        return (
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode("ascii") + body
+
+    def _vote(self, voter: str, choice: str) -> Tuple[int, bytes]:
+        if self.window is None:
+            return 409, b"closed"
+        result = self.window.cast(voter, choice)
+        status = {"ok": 200, "dup": 200, "closed": 409}.get(result, 400)
+        return status, result.encode("ascii")
+
+    def _route(self, method: str, target: str, body: bytes) -> Tuple[int, bytes, str]:
+        url = urlsplit(target)
+        if method == "POST" and url.path == "/vote":
+            params = dict(parse_qsl(url.query))
+            if not params and body:
+                try:
+                    params = {k: str(v) for k, v in json.loads(body).items()}
+                except (ValueError, AttributeError):
+                    return 400, b"invalid", "text/plain"
+            status, out = self._vote(params.get("voter", ""), params.get("choice", ""))
+            return status, out, "text/plain"
+        if method == "POST" and url.path == "/votes":
+            results: Dict[str, int] = {}
+            for line in body.decode("utf-8", "replace").splitlines():
+                voter, _, choice = line.partition(",")
+                _, out = self._vote(voter.strip(), choice.strip())
+                results[out.decode()] = results.get(out.decode(), 0) + 1
+            return 200, json.dumps(results).encode("utf-8"), "application/json"
+        if method == "GET" and url.path == "/tally":
+            tally = self.window.tally() if self.window is not None else {"closed": True}
+            return 200, json.dumps(tally, ensure_ascii=False).encode("utf-8"), "application/json"
+        return 404, b"not found", "text/plain"
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        window = self.window
+        while True:
+            tally = window.tally() if window is not None else {"closed": True}
+            writer.write(f"data: {json.dumps(tally, ensure_ascii=False)}\n\n".encode("utf-8"))
+            await writer.drain()
+            if window is None or window.closed:
+                return
+            try:
+                await asyncio.wait_for(window._closed.wait(), min(self.tick, window.remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    writer.write(self._response(400, b"bad request"))
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, _ = lines[0].split(" ", 2)
+                    length = 0
+                    for line in lines[1:]:
+                        if line[:15].lower() == "content-length:":
+                            length = int(line[15:].strip() or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    writer.write(self._response(400, b"bad request"))
+                    return
+                if length > MAX_BODY:
+                    writer.write(self._response(413, b"payload too large"))
+                    return
+                body = await reader.readexactly(length) if length else b""
+
+                if method == "GET" and target.startswith("/stream"):
+                    task = asyncio.current_task()
+                    self._streams.add(task)
+                    try:
+                        await self._stream(writer)
+                    finally:
+                        self._streams.discard(task)
+                    return
+                status, out, content_type = self._route(method, target, body)
+                writer.write(self._response(status, out, content_type))
+                await writer.drain()  # immédiat tant que le buffer d'écriture n'est pas plein
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def arun_vote(choices: List[str], duration: Optional[float] = None, server: Optional[VoteServer] = None) -> str:
+    """Vote audience via le service HTTP (CLI) : affiche l'URL et le décompte, renvoie le gagnant."""
+    own = server is None
+    server = server or VoteServer()
+    await server.start()
+    window = server.open(choices, duration)
+    print("\n--- Vote audience (service HTTP) ---")
+    for i, c in enumerate(choices):
+        print(f"{i}. {c}")
+    print(f"POST {server.url}/vote?voter=<id>&choice=<n>  |  décompte live : GET {server.url}/stream")
+    waiter = asyncio.ensure_future(window.wait())
+    try:
+        while not waiter.done():
+            await asyncio.wait({waiter}, timeout=1.0)
+            print(f"  {window.counts} ({len(window.voters)} votants, {window.remaining:.0f}s)")
+        winner = window.winner()
+        print("Gagnant :", winner)
+        print("---------------------\n")
+        return winner
+    finally:
+        waiter.cancel()
+        if own:
+            await server.aclose()
+
+
+@lru_cache(maxsize=1)
+def get_vote_server() -> VoteServer:
+    """Service de vote du process (Streamlit), démarré sur la boucle partagée."""
+    server = VoteServer()
+    run_sync(server.start())
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Service de vote audience (HTTP, asyncio)")
+    parser.add_argument("--host", default=Config.VOTE_HOST)
+    parser.add_argument("--port", type=int, default=Config.VOTE_PORT)
+    parser.add_argument("--duration", type=float, default=Config.VOTE_WINDOW)
+    parser.add_argument("choices", nargs="*", default=["Quelqu'un sonne à la porte", "Le chien aboie fort", "Quinte de toux"])
+    args = parser.parse_args(argv)
+
+    async def run() -> None:
+        server = VoteServer(args.host, args.port)
+        try:
+            print(await server.collect(args.choices, args.duration))
+            print(json.dumps(server.window.tally(), ensure_ascii=False))
+        finally:
+            await server.aclose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
+from functools import lru_cache
 from importlib.resources import files
 
+@lru_cache(maxsize=None)
 def load_prompt(filename: str) -> str:
+    # lu une seule fois par process, partagé par tous les agents
     return (files("scam_simulator.prompts") / filename).read_text(encoding="utf-8")
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from scam_simulator.agents.director_agent import DirectorAgent
+from scam_simulator.agents.moderator_agent import ModeratorAgent
+from scam_simulator.agents.victim_agent import VictimAgent
+from scam_simulator.config import Config
+from scam_simulator.runtime import submit
+from scam_simulator.tools.backends import Soundboard, make_soundboard
+
+# Ressources partagées par toutes les sessions d'un process (Streamlit multi-utilisateurs) :
+# clients LLM (make_chat), prompts (load_prompt), scripts (get_scenario_engine) et serveur MCP.
+# Seul l'état de conversation reste par session : mémoire de la victime + SimulationState/tracker.
+
+
+@lru_cache(maxsize=1)
+def get_soundboard() -> Soundboard:
+    """
+    Backend de tools unique (Config.TOOL_BACKEND : un seul subprocess / une seule connexion, registre chargé une fois).
+    Il vit sur la boucle partagée de runtime.py : à utiliser via les wrappers sync (respond, stream_respond...).
+    """
+    return make_soundboard()
+
+
+@lru_cache(maxsize=1)
+def get_director() -> DirectorAgent:
+    """Directeur sans état de conversation (la progression du script est dans le tracker de session)."""
+    return DirectorAgent()
+
+
+@lru_cache(maxsize=1)
+def get_moderator() -> ModeratorAgent:
+    return ModeratorAgent()
+
+
+def new_victim() -> VictimAgent:
+    """Victime d'une session : mémoire propre, client LLM et serveur MCP partagés."""
+    victim = VictimAgent(soundboard=get_soundboard())
+    if Config.PREWARM:
+        # sur la boucle partagée, pendant que l'utilisateur tape son premier message
+        submit(victim.awarm())
+    return victim
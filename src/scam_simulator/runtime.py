@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Boucle asyncio unique du process, démarrée à la demande dans un thread daemon.
+    Les wrappers sync (CLI, Streamlit) l'utilisent au lieu de créer une boucle par tour.
+    """
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(
+                target=_loop.run_forever,
+                name="scam-simulator-loop",
+                daemon=True,
+            )
+            _thread.start()
+        return _loop
+
+
+async def _in_context(ctx: contextvars.Context, coro: Awaitable[T]) -> T:
+    # propage les ContextVar de l'appelant (trace en cours, recorder...) dans la tâche
+    for var, value in ctx.items():
+        var.set(value)
+    return await coro
+
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    Exécute une coroutine sur la boucle partagée et attend son résultat (appel bloquant).
+    Interdit depuis une coroutine : utiliser directement la version async.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("run_sync() appelé depuis une boucle asyncio : utilisez la méthode async.")
+
+    future = asyncio.run_coroutine_threadsafe(_in_context(contextvars.copy_context(), coro), get_loop())
+    return future.result(timeout)
+
+
+def submit(coro: Awaitable[Any]):
+    """Planifie une coroutine sur la boucle partagée sans attendre (concurrent.futures.Future)."""
+    return asyncio.run_coroutine_threadsafe(_in_context(contextvars.copy_context(), coro), get_loop())
+
+
+def iterate_sync(agen: AsyncIterator[T]) -> Iterator[T]:
+    """Consomme un async generator depuis du code sync, élément par élément (streaming)."""
+
+    async def _next() -> T:
+        return await agen.__anext__()
+
+    try:
+        while True:
+            try:
+                yield run_sync(_next())
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(agen, "aclose", None)
+        if aclose is not None:
+            run_sync(aclose())
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import atexit
+import importlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from scam_simulator.config import Config
+
+Exporter = Callable[[List[Dict[str, Any]]], None]
+
+_recorder: ContextVar[Optional["StageRecorder"]] = ContextVar("stage_recorder", default=None)
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+_tracer: Optional["Tracer"] = None
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class StageRecorder:
+    """Durées par étape d'un tour (directeur, appels victime, tools, guardrail)."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.samples[name].append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+            }
+            for name, values in sorted(self.samples.items())
+        }
+
+
+@contextmanager
+def recording(recorder: StageRecorder) -> Iterator[StageRecorder]:
+    """Active un recorder pour le contexte courant (hérité par les tâches asyncio créées dedans)."""
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+# -----------------------------
+# Spans
+# -----------------------------
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "trace_id", "start", "duration", "attrs")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]) -> None:
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = _trace_id.get() or (parent.trace_id if parent is not None else None)
+        self.start = time.time()
+        self.duration = 0.0
+        self.attrs = attrs
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            **self.attrs,
+        }
+
+
+@contextmanager
+def trace(trace_id: Optional[str] = None, **attrs: Any) -> Iterator[str]:
+    """Regroupe les spans d'un tour sous un même trace_id."""
+    trace_id = trace_id or os.urandom(8).hex()
+    token = _trace_id.set(trace_id)
+    try:
+        with span("turn", **attrs):
+            yield trace_id
+    finally:
+        _trace_id.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """
+    Chronomètre une étape (agent call, tool call...) :
+    - durée envoyée au StageRecorder actif (benchmarks)
+    - span envoyé au Tracer (écriture JSONL en arrière-plan) si le tracing est actif
+    """
+    current = Span(name, _current.get(), attrs)
+    token = _current.set(current)
+    t0 = time.perf_counter()
+    try:
+        yield current
+    except BaseException as exc:
+        current.attrs["error"] = repr(exc)
+        raise
+    finally:
+        current.duration = time.perf_counter() - t0
+        _current.reset(token)
+        recorder = _recorder.get()
+        if recorder is not None:
+            recorder.record(name, current.duration)
+        if _tracer is not None:
+            _tracer.emit(current.to_dict())
+
+
+def emit_span(name: str, seconds: float, **attrs: Any) -> None:
+    """
+    Span mesuré à la main (ex: générateur de streaming, où un ContextVar ne peut pas
+    rester posé entre deux yield). Rattaché au span courant de l'appelant.
+    """
+    current = Span(name, _current.get(), attrs)
+    current.start -= seconds
+    current.duration = seconds
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.record(name, seconds)
+    if _tracer is not None:
+        _tracer.emit(current.to_dict())
+
+
+def annotate(**attrs: Any) -> None:
+    """Ajoute des attributs au span courant (no-op hors span)."""
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def annotate_usage(message: Any) -> None:
+    """Compteurs de tokens d'une réponse LangChain (usage_metadata) sur le span courant."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage:
+        annotate(prompt_tokens=usage.get("input_tokens"), completion_tokens=usage.get("output_tokens"))
+
+
+# -----------------------------
+# Tracer (écriture en arrière-plan)
+# -----------------------------
+class Tracer:
+    """
+    File de spans vidée par un thread d'écriture : le tour ne fait qu'un put() non bloquant.
+    Écriture par lots dans un JSONL avec rotation par taille + exporters optionnels.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 10_000_000,
+        backups: int = 5,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.exporters: List[Exporter] = []
+        self.dropped = 0
+        self._queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+        self._flushed = threading.Condition()
+        self._pending = 0
+        self._thread = threading.Thread(target=self._run, name="span-writer", daemon=True)
+        self._thread.start()
+
+    def add_exporter(self, exporter: Exporter) -> None:
+        self.exporters.append(exporter)
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        with self._flushed:
+            self._pending += 1
+        self._queue.put(record)
+
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self._rotate()
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in batch))
+        for exporter in self.exporters:
+            try:
+                exporter(batch)
+            except Exception:
+                self.dropped += len(batch)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError:
+                    self.dropped += len(batch)
+            with self._flushed:
+                self._pending -= len(batch)
+                self._flushed.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        with self._flushed:
+            self._flushed.wait_for(lambda: self._pending <= 0, timeout)
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+def _load_exporter(spec: str) -> Exporter:
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def setup_tracing(path: Optional[str] = None) -> Optional[Tracer]:
+    """Démarre le tracer global (une fois par process) selon Config.TRACE_*."""
+    global _tracer
+    if _tracer is not None or not Config.TRACE_ENABLED:
+        return _tracer
+    _tracer = Tracer(
+        path or Config.TRACE_PATH,
+        max_bytes=Config.TRACE_MAX_BYTES,
+        backups=Config.TRACE_BACKUPS,
+        batch_size=Config.TRACE_BATCH_SIZE,
+        flush_interval=Config.TRACE_FLUSH_INTERVAL,
+    )
+    if Config.TRACE_EXPORTER:
+        _tracer.add_exporter(_load_exporter(Config.TRACE_EXPORTER))
+    atexit.register(_tracer.close)
+    return _tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Union
+
+from scam_simulator.config import Config
+from scam_simulator.tools.mcp_session import SoundboardPool, ToolSpec, result_to_text, soundboard_connection
+
+BACKENDS = ("inprocess", "stdio", "http")
+
+
+class InProcessSoundboard:
+    """
+    Tools du serveur FastMCP appelés directement dans le process (ni subprocess ni JSON-RPC).
+    Même interface et même format de résultat que SoundboardPool : registre lu sur l'instance
+    FastMCP de tools/mcp_server.py, erreurs renvoyées en [TOOL_ERROR: ...].
+    """
+
+    def __init__(self, server: Any = None) -> None:
+        self._server = server  # None : serveur FastMCP du projet, importé au start() (mcp : ~0.6 s)
+        self._specs: List[ToolSpec] = []
+        self._started = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        if self._server is None:
+            from scam_simulator.tools.mcp_server import mcp
+
+            self._server = mcp
+        self._specs = [
+            ToolSpec(name=t.name, description=t.description or "", input_schema=dict(t.inputSchema or {}), meta=dict(t.meta or {}))
+            for t in await self._server.list_tools()
+        ]
+        self._started = True
+
+    async def list_tools(self) -> List[ToolSpec]:
+        await self.start()
+        return list(self._specs)
+
+    async def call_tool(self, name: str, args: Optional[Dict[str, Any]] = None) -> str:
+        await self.start()
+        from mcp import types  # déjà chargé par start() (serveur FastMCP)
+
+        try:
+            output = await self._server.call_tool(name, args or {})
+        except Exception as exc:
+            # côté serveur MCP, une exception de tool devient un résultat isError
+            return result_to_text(types.CallToolResult(content=[types.TextContent(type="text", text=str(exc))], isError=True))
+        content = output[0] if isinstance(output, tuple) else output
+        return result_to_text(types.CallToolResult(content=list(content), isError=False))
+
+    async def ping(self) -> bool:
+        return self._started
+
+    async def aclose(self) -> None:
+        self._started = False
+
+
+Soundboard = Union[InProcessSoundboard, SoundboardPool]
+
+
+def make_soundboard(backend: Optional[str] = None, **pool_options: Any) -> Soundboard:
+    """
+    Backend des tools selon Config.TOOL_BACKEND :
+    - "inprocess" : appel direct des fonctions FastMCP (latence minimale)
+    - "stdio" : serveur MCP en subprocess (protocole MCP complet, défaut)
+    - "http" : serveur MCP partagé en streamable HTTP (Config.MCP_SOUNDBOARD_URL)
+    """
+    backend = backend or Config.TOOL_BACKEND
+    if backend == "inprocess":
+        return InProcessSoundboard()
+    if backend not in BACKENDS:
+        raise ValueError(f"TOOL_BACKEND inconnu: {backend!r} (attendu: {', '.join(BACKENDS)})")
+    return SoundboardPool(connection=soundboard_connection(backend), **pool_options)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from scam_simulator.matching import compile_keywords, normalize
+from scam_simulator.tools.mcp_session import ToolSpec
+
+# Contrainte audience -> tool soundboard (mots-clés normalisés, sans accents)
+DEFAULT_RULES: Dict[str, List[str]] = {
+    "dog_bark": ["chien", "chiens", "aboie", "aboient", "aboiement", "aboiements", "poupoune"],
+    # "porte" / "visite" seuls sont trop larges ("porte-monnaie", "visite médicale") : expressions entières
+    "doorbell": [
+        "sonne", "sonnette", "on frappe", "frappe a la porte", "a la porte", "livreur", "facteur",
+        "une visite", "de la visite",
+    ],
+    "coughing_fit": ["toux", "tousse", "tousser", "quinte"],
+    "tv_background": ["tele", "television", "feux de l'amour", "emission"],
+}
+
+_WORD = re.compile(r"\w{4,}")
+STEM = 5  # préfixe comparé : "aboiement" ~ "aboie", "sonnette" ~ "sonne"
+MIN_STEM_HITS = 2  # un seul mot de description en commun ("amour", "inter...") n'est pas une association claire
+STOPWORDS = {"faire", "tres", "utile", "pour", "avec", "dans", "plus", "fort", "forte", "secondes"}
+
+
+def _stems(text: str) -> Set[str]:
+    return {w[:STEM] for w in _WORD.findall(normalize(text)) if w not in STOPWORDS}
+
+
+class ToolDispatcher:
+    """
+    Associe une contrainte audience à UN tool soundboard, sans LLM :
+    - règles mots-clés (une regex compilée par tool)
+    - sinon mots distinctifs des descriptions MCP (présents dans la description d'un seul tool) :
+      au moins MIN_STEM_HITS mots, tous du même tool
+    Ambigu (plusieurs tools) ou rien : None, la victime décide comme avant (tool calling LLM).
+    """
+
+    def __init__(self, specs: Iterable[ToolSpec], rules: Optional[Dict[str, List[str]]] = None) -> None:
+        self.specs = {s.name: s for s in specs}
+        rules = DEFAULT_RULES if rules is None else rules
+        self._rules = {
+            name: compile_keywords(words) for name, words in rules.items() if name in self.specs and words
+        }
+
+        # mots de description propres à un seul tool (les mots partagés ne discriminent rien)
+        owners: Dict[str, Set[str]] = defaultdict(set)
+        for spec in self.specs.values():
+            for stem in _stems(f"{spec.name.replace('_', ' ')} {spec.description}"):
+                owners[stem].add(spec.name)
+        self._stems: Dict[str, str] = {stem: next(iter(names)) for stem, names in owners.items() if len(names) == 1}
+
+    def match(self, constraint: Optional[str]) -> Optional[str]:
+        if not constraint:
+            return None
+        text = normalize(constraint)
+        hits = {name for name, pattern in self._rules.items() if pattern.search(text)}
+        if hits:
+            return next(iter(hits)) if len(hits) == 1 else None
+        votes = Counter(self._stems[s] for s in _stems(constraint) if s in self._stems)
+        if len(votes) != 1:
+            return None
+        name, count = votes.most_common(1)[0]
+        return name if count >= MIN_STEM_HITS else None
+
+
+@lru_cache(maxsize=8)
+def _cached_dispatcher(specs: Tuple[Tuple[str, str], ...]) -> ToolDispatcher:
+    return ToolDispatcher(ToolSpec(name=n, description=d) for n, d in specs)
+
+
+def get_dispatcher(specs: Iterable[ToolSpec]) -> ToolDispatcher:
+    """Dispatcher partagé pour un même registre de tools."""
+    return _cached_dispatcher(tuple(sorted((s.name, s.description) for s in specs)))
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+from scam_simulator.tools.mcp_session import ToolSpec
+from scam_simulator.tools.schema_cache import load_tool_specs, local_tool_specs
+
+
+class EffectRegistry:
+    """
+    Effets sonores connus (meta["effect"] des tools) et UNE regex compilée qui trouve
+    leurs tags [SOUND_EFFECT: X] dans une réponse. Ajouter un tool au serveur suffit.
+    """
+
+    def __init__(self, specs: Iterable[ToolSpec]) -> None:
+        self.by_tool: Dict[str, str] = {s.name: s.effect for s in specs if s.effect}
+        self.effects = sorted(set(self.by_tool.values()))
+        alternatives = "|".join(re.escape(e) for e in self.effects) or r"(?!)"
+        self.pattern = re.compile(rf"\[SOUND_EFFECT:\s*({alternatives})\]")
+
+    def find(self, text: str) -> List[str]:
+        """Noms des effets présents dans `text`, dans l'ordre d'apparition."""
+        return self.pattern.findall(text or "")
+
+    def tags(self, text: str) -> List[str]:
+        """Tags complets, sans doublon (ex: « [SOUND_EFFECT: DOORBELL] »)."""
+        return list(dict.fromkeys(m.group(0) for m in self.pattern.finditer(text or "")))
+
+
+@lru_cache(maxsize=1)
+def get_effect_registry() -> EffectRegistry:
+    """Registre construit depuis le cache des schémas (ou le registre local du serveur)."""
+    return EffectRegistry(load_tool_specs() or local_tool_specs())
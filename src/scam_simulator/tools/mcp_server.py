@@ -1,40 +1,153 @@
 from __future__ import annotations
 
+import argparse
+import functools
 import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from scam_simulator.config import Config
+from scam_simulator.telemetry import percentile
 
-# Serveur MCP (transport stdio)
+# Serveur MCP : stdio (un subprocess par agent) ou streamable HTTP (un serveur partagé par tous les process)
 mcp = FastMCP("arnaque-soundboard")
+STARTED = time.time()
+
+
+class ToolStats:
+    """Compteurs d'un tool : appels, erreurs, latences (fenêtre des 1024 derniers appels)."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.recent: "deque[float]" = deque(maxlen=1024)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.total += seconds
+            self.recent.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = list(self.recent)
+            calls, errors, total = self.calls, self.errors, self.total
+        return {
+            "calls": calls,
+            "errors": errors,
+            "mean_ms": round(total / calls * 1000, 4) if calls else 0.0,
+            "p50_ms": round(percentile(recent, 50) * 1000, 4),
+            "p99_ms": round(percentile(recent, 99) * 1000, 4),
+        }
+
+
+STATS: Dict[str, ToolStats] = {}
+
+
+def timed(fn: Callable[..., str]) -> Callable[..., str]:
+    """Mesure chaque appel du tool (signature et docstring conservées pour FastMCP)."""
+    stats = STATS.setdefault(fn.__name__, ToolStats())
 
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> str:
+        t0 = time.perf_counter()
+        error = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            stats.record(time.perf_counter() - t0, error)
 
-@mcp.tool()
+    return wrapper
+
+
+def effect_tag(effect: str) -> str:
+    return f"[SOUND_EFFECT: {effect}]"
+
+
+# meta["effect"] : effet sonore produit, lu par le registre d'effets côté client (tools/effects.py)
+@mcp.tool(meta={"effect": "DOG_BARKING"})
+@timed
 def dog_bark() -> str:
     """Aboiement de chien (Poupoune s'énerve). Utile pour interrompre un interlocuteur pressant."""
-    return "[SOUND_EFFECT: DOG_BARKING]"
+    return effect_tag("DOG_BARKING")
 
 
-@mcp.tool()
+@mcp.tool(meta={"effect": "DOORBELL"})
+@timed
 def doorbell() -> str:
     """Sonnette (livraison/visite). Utile pour faire patienter l'arnaqueur."""
-    return "[SOUND_EFFECT: DOORBELL]"
+    return effect_tag("DOORBELL")
 
 
-@mcp.tool()
+@mcp.tool(meta={"effect": "COUGHING_FIT"})
+@timed
 def coughing_fit() -> str:
     """Quinte de toux ~10 secondes."""
-    return "[SOUND_EFFECT: COUGHING_FIT]"
+    return effect_tag("COUGHING_FIT")
 
 
-@mcp.tool()
+@mcp.tool(meta={"effect": "TV_BACKGROUND_LOUD"})
+@timed
 def tv_background() -> str:
     """Télé en fond très forte (ex: Les Feux de l'Amour)."""
-    return "[SOUND_EFFECT: TV_BACKGROUND_LOUD]"
+    return effect_tag("TV_BACKGROUND_LOUD")
+
+
+def tool_schemas() -> List[Dict[str, Any]]:
+    """Registre local (sans démarrer de transport) : mêmes champs que list_tools côté client."""
+    return [
+        {"name": t.name, "description": t.description or "", "input_schema": t.parameters, "meta": t.meta or {}}
+        for t in mcp._tool_manager.list_tools()
+    ]
+
+
+# -----------------------------
+# Routes HTTP (transport streamable-http uniquement)
+# -----------------------------
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok", "tools": len(STATS), "uptime_s": round(time.time() - STARTED, 1)})
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    return JSONResponse({name: s.snapshot() for name, s in STATS.items()})
+
 
+def main(argv: Optional[List[str]] = None) -> None:
+    url = urlsplit(Config.MCP_SOUNDBOARD_URL)
+    parser = argparse.ArgumentParser(description="Serveur MCP soundboard")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default="stdio")
+    parser.add_argument("--host", default=url.hostname or "127.0.0.1")
+    parser.add_argument("--port", type=int, default=url.port or 8765)
+    parser.add_argument("--stateless", action="store_true", help="sans session serveur (réponses JSON, répartition libre)")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
 
-def main() -> None:
     # NE PAS print sur stdout (stdio transport) -> si besoin, logguez sur stderr
-    print("MCP soundboard server starting (stdio)...", file=sys.stderr)
-    mcp.run(transport="stdio")
+    print(f"MCP soundboard server starting ({args.transport})...", file=sys.stderr)
+    if args.transport == "streamable-http":
+        mcp.settings.host = args.host
+        mcp.settings.port = args.port
+        mcp.settings.streamable_http_path = url.path or "/mcp"
+        mcp.settings.log_level = args.log_level.upper()
+        mcp.settings.stateless_http = args.stateless
+        mcp.settings.json_response = args.stateless
+        print(f"http://{args.host}:{args.port}{mcp.settings.streamable_http_path} (health: /health, stats: /stats)", file=sys.stderr)
+    mcp.run(transport=args.transport)
 
 
 if __name__ == "__main__":
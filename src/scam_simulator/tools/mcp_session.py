@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from scam_simulator.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolSpec:
+    """Schéma d'un tool MCP, au format attendu par bind_tools (function calling OpenAI)."""
+
+    name: str
+    description: str
+    input_schema: Dict[str, Any] = field(default_factory=lambda: {"type": "object", "properties": {}})
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def effect(self) -> Optional[str]:
+        """Effet sonore déclaré par le serveur (meta["effect"]), s'il y en a un."""
+        return self.meta.get("effect")
+
+    def to_openai(self) -> Dict[str, Any]:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.input_schema,
+            },
+        }
+
+
+def soundboard_connection(transport: str = "stdio") -> Dict[str, Any]:
+    """Connexion vers le serveur soundboard (lu depuis Config) : subprocess stdio ou serveur HTTP partagé."""
+    if transport == "http":
+        return {"transport": "streamable_http", "url": Config.MCP_SOUNDBOARD_URL}
+    return {
+        "transport": "stdio",
+        "command": Config.MCP_SOUNDBOARD_COMMAND,
+        "args": Config.MCP_SOUNDBOARD_ARGS,
+    }
+
+
+def result_to_text(result: Any) -> str:
+    """Aplatit un CallToolResult MCP en texte (même format que les tools LangChain)."""
+    parts = [getattr(c, "text", "") for c in (result.content or []) if getattr(c, "type", "") == "text"]
+    text = "\n".join(p for p in parts if p)
+    if getattr(result, "isError", False):
+        return f"[TOOL_ERROR: {text or 'erreur serveur'}]"
+    return text
+
+
+class _SessionWorker:
+    """
+    Une session MCP ouverte en continu.
+    La session vit dans sa propre tâche : les context managers anyio du client stdio
+    doivent être ouverts et fermés dans la même tâche.
+    """
+
+    def __init__(self, connection: Dict[str, Any]) -> None:
+        self._connection = connection
+        self._session = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._session is not None and self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        self._ready.clear()
+        self._closing.clear()
+        self._error = None
+        self._task = asyncio.create_task(self._run(), name="mcp-soundboard-session")
+        await self._ready.wait()
+        if self._session is None:
+            raise RuntimeError(f"Session MCP impossible à ouvrir: {self._error!r}")
+
+    async def _run(self) -> None:
+        # import différé (langchain_mcp_adapters + mcp : ~0.4 s) : payé au démarrage de la session, pas à l'import
+        from langchain_mcp_adapters.sessions import create_session
+
+        try:
+            async with create_session(self._connection) as session:
+                await session.initialize()
+                self._session = session
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as exc:
+            self._error = exc
+            logger.warning("Session MCP terminée: %r", exc)
+        finally:
+            self._session = None
+            self._ready.set()
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self._session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def list_tools(self) -> List[ToolSpec]:
+        result = await self._session.list_tools()
+        return [
+            ToolSpec(name=t.name, description=t.description or "", input_schema=dict(t.inputSchema or {}), meta=dict(t.meta or {}))
+            for t in result.tools
+        ]
+
+    async def call_tool(self, name: str, args: Dict[str, Any]) -> str:
+        return result_to_text(await self._session.call_tool(name, args))
+
+    async def aclose(self) -> None:
+        self._closing.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, 5)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._task.cancel()
+        self._task = None
+
+
+class SoundboardPool:
+    """
+    Petit pool de sessions MCP persistantes vers le serveur soundboard.
+
+    - un seul lancement du subprocess serveur par session (au lieu d'un par tool call)
+    - health check périodique (ping) + respawn automatique si le serveur meurt
+    - fermeture propre via aclose()
+
+    Le pool appartient à la boucle asyncio qui l'a démarré.
+    """
+
+    def __init__(
+        self,
+        connection: Optional[Dict[str, Any]] = None,
+        size: Optional[int] = None,
+        health_interval: Optional[float] = None,
+    ) -> None:
+        self._connection = connection or soundboard_connection()
+        self._size = max(1, size or Config.MCP_SOUNDBOARD_POOL_SIZE)
+        self._health_interval = health_interval if health_interval is not None else Config.MCP_HEALTH_INTERVAL
+        self._workers: List[_SessionWorker] = []
+        self._rr = itertools.count()
+        self._specs: List[ToolSpec] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._respawn_lock: Optional[asyncio.Lock] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._started = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> None:
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+            self._respawn_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._started:
+                return
+            workers = [_SessionWorker(self._connection) for _ in range(self._size)]
+            try:
+                # toutes les sessions vont au bout avant de conclure : aucune ne démarre après le nettoyage
+                results = await asyncio.gather(*(w.start() for w in workers), return_exceptions=True)
+                error = next((r for r in results if isinstance(r, BaseException)), None)
+                if error is not None:
+                    raise error
+                self._specs = await workers[0].list_tools()
+            except BaseException:
+                # échec partiel : les serveurs déjà lancés (subprocess stdio) ne doivent pas survivre
+                await asyncio.gather(*(w.aclose() for w in workers), return_exceptions=True)
+                raise
+            self._workers = workers
+            if self._health_interval > 0:
+                self._monitor = asyncio.create_task(self._health_loop(), name="mcp-soundboard-health")
+            self._started = True
+
+    async def list_tools(self) -> List[ToolSpec]:
+        await self.start()
+        return list(self._specs)
+
+    async def _respawn(self, index: int, broken: Optional[_SessionWorker] = None) -> _SessionWorker:
+        """Relance la session `index` si elle est morte (ou si c'est encore `broken`, jugée cassée)."""
+        async with self._respawn_lock:
+            worker = self._workers[index]
+            if worker.alive and worker is not broken:
+                return worker
+            logger.warning("Serveur MCP soundboard indisponible, respawn (session %d)", index)
+            await worker.aclose()
+            fresh = _SessionWorker(self._connection)
+            await fresh.start()
+            self._workers[index] = fresh
+            return fresh
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._health_interval)
+            for i, worker in enumerate(list(self._workers)):
+                if not await worker.ping(timeout=self._health_interval):
+                    try:
+                        await self._respawn(i, broken=worker)
+                    except Exception as exc:
+                        logger.error("Respawn MCP échoué: %r", exc)
+
+    async def call_tool(self, name: str, args: Optional[Dict[str, Any]] = None) -> str:
+        """Un aller-retour JSON-RPC sur une session déjà ouverte (1 retry après respawn)."""
+        await self.start()
+        index = next(self._rr) % len(self._workers)
+        worker = self._workers[index]
+        if not worker.alive:
+            worker = await self._respawn(index)
+        try:
+            return await worker.call_tool(name, args or {})
+        except Exception as exc:
+            # les erreurs métier reviennent en isError : une exception = transport cassé
+            logger.warning("Tool call MCP en échec (%r), nouvelle tentative après respawn", exc)
+            worker = await self._respawn(index, broken=worker)
+            return await worker.call_tool(name, args or {})
+
+    async def ping(self) -> bool:
+        if not self._started:
+            return False
+        results = await asyncio.gather(*(w.ping(timeout=5) for w in self._workers))
+        return all(results)
+
+    async def aclose(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        await asyncio.gather(*(w.aclose() for w in self._workers), return_exceptions=True)
+        self._workers = []
+        self._started = False
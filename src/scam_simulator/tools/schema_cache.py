@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import logging
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from scam_simulator.config import Config
+from scam_simulator.tools.mcp_session import ToolSpec, soundboard_connection
+
+logger = logging.getLogger(__name__)
+
+SERVER_MODULE = "scam_simulator.tools.mcp_server"
+
+
+def _server_source_hash() -> str:
+    spec = importlib.util.find_spec(SERVER_MODULE)
+    if spec is None or not spec.origin:
+        return ""
+    return hashlib.sha256(Path(spec.origin).read_bytes()).hexdigest()
+
+
+def is_local(backend: str) -> bool:
+    """Serveur = tools/mcp_server.py de ce dépôt (registre lisible sans transport)."""
+    return backend == "inprocess" or (
+        backend == "stdio" and Config.MCP_SOUNDBOARD_ARGS == ["-m", SERVER_MODULE]
+    )
+
+
+def schema_key(backend: Optional[str] = None) -> str:
+    """Clé de cache : backend + connexion + hash du code du serveur (modifier un tool invalide le cache)."""
+    backend = backend or Config.TOOL_BACKEND
+    connection = {} if backend == "inprocess" else soundboard_connection(backend)
+    raw = json.dumps([backend, connection, _server_source_hash()], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _path(key: str) -> Path:
+    return Path(Config.TOOL_SCHEMA_CACHE_DIR) / f"tools-{key}.json"
+
+
+def content_hash(specs: List[ToolSpec]) -> str:
+    raw = json.dumps([asdict(s) for s in specs], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def read_tool_specs(key: str) -> Optional[List[ToolSpec]]:
+    try:
+        data: Dict[str, Any] = json.loads(_path(key).read_text(encoding="utf-8"))
+        specs = [ToolSpec(**t) for t in data["tools"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if data.get("hash") != content_hash(specs):
+        return None  # fichier tronqué / modifié à la main
+    return specs
+
+
+def write_tool_specs(key: str, specs: List[ToolSpec]) -> None:
+    path = _path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"hash": content_hash(specs), "tools": [asdict(s) for s in specs]}, ensure_ascii=False, indent=1),
+            encoding="utf-8",
+        )
+        tmp.replace(path)
+    except OSError as exc:
+        logger.warning("Cache des schémas de tools non écrit: %r", exc)
+
+
+def local_tool_specs() -> List[ToolSpec]:
+    """Registre lu directement sur l'instance FastMCP (import du module serveur, aucun transport)."""
+    from scam_simulator.tools.mcp_server import tool_schemas
+
+    return [ToolSpec(**t) for t in tool_schemas()]
+
+
+def load_tool_specs(backend: Optional[str] = None) -> Optional[List[ToolSpec]]:
+    """
+    Schémas des tools sans aller-retour serveur, si le serveur est celui du dépôt :
+    - cache disque (data/cache) pour ce backend et cette version du code serveur
+    - sinon registre local (puis mis en cache)
+    None : serveur distant (http, stdio hors dépôt), dont le code local ne dit pas la version ;
+    il faudra un list_tools (voir VictimAgent._ensure_tools).
+    """
+    backend = backend or Config.TOOL_BACKEND
+    if not is_local(backend):
+        return None
+    key = schema_key(backend)
+    specs = read_tool_specs(key)
+    if specs is None:
+        specs = local_tool_specs()
+        write_tool_specs(key, specs)
+    return specs
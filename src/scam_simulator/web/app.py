@@ -1,15 +1,25 @@
 from __future__ import annotations
 
 import time
+from collections import deque
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 
 import streamlit as st
 
 from scam_simulator.config import Config
-from scam_simulator.agents.victim_agent import VictimAgent
+from scam_simulator.logging_conf import setup_logging
+from scam_simulator.audio.timeline import Timeline
 from scam_simulator.agents.director_agent import DirectorAgent
 from scam_simulator.agents.moderator_agent import ModeratorAgent
+from scam_simulator.orchestration.persistence import get_session_store, resume_session
+from scam_simulator.orchestration.premoderation import get_premoderator
+from scam_simulator.orchestration.state import SimulationState
+from scam_simulator.orchestration.votes import VoteWindow, get_vote_server
+from scam_simulator.resources import get_director, get_moderator, new_victim
+from scam_simulator.runtime import run_sync
+from scam_simulator.tools.effects import get_effect_registry
+from scam_simulator.web.worker import TurnJob, TurnWorker
 
 
 # -----------------------------
@@ -25,22 +35,43 @@ class ChatTurn:
 # -----------------------------
 # Helpers
 # -----------------------------
+@st.cache_resource
+def shared_director() -> DirectorAgent:
+    return get_director()
+
+
+@st.cache_resource
+def shared_moderator() -> ModeratorAgent:
+    return get_moderator()
+
+
 def ensure_agents():
+    # Directeur / modérateur / serveur MCP / clients LLM : partagés par toutes les sessions.
+    # Par session : uniquement la victime (sa mémoire), son worker de tours et l'état de la simulation.
+    st.session_state.director = shared_director()
+    st.session_state.moderator = shared_moderator()
     if "victim" not in st.session_state:
-        st.session_state.victim = VictimAgent()
-    if "director" not in st.session_state:
-        st.session_state.director = DirectorAgent()
-    if "moderator" not in st.session_state:
-        st.session_state.moderator = ModeratorAgent()
+        st.session_state.victim = new_victim()
+        st.session_state.worker = TurnWorker(st.session_state.victim, st.session_state.director)
 
 
 def init_state():
     st.session_state.turn = 0
     st.session_state.current_objective = "Répondre poliment mais lentement."
     st.session_state.audience_constraint = None
+    st.session_state.scenario = st.session_state.director.new_tracker()
+
+    # Bande son de la conversation (banque de samples partagée par le process)
+    st.session_state.timeline = Timeline()
+    st.session_state.audio_start: Optional[int] = None
 
-    st.session_state.chat: List[ChatTurn] = []
-    st.session_state.logs: List[str] = []
+    # Transcript : en SQLite (pages chargées à la demande) ; sans persistance, seulement les derniers tours
+    st.session_state.session_id = get_session_store().new_session_id() if Config.SESSIONS_ENABLED else None
+    st.session_state.transcript_pages = 1
+    st.session_state.chat = deque(maxlen=2 * Config.TRANSCRIPT_PAGE_SIZE)
+    st.session_state.logs = deque(maxlen=200)
+    if st.session_state.session_id:
+        st.query_params["session"] = st.session_state.session_id
 
     # Audience workflow
     st.session_state.audience_proposals: List[str] = []
@@ -50,71 +81,134 @@ def init_state():
 
 def reset_all():
     # On conserve les agents pour éviter de relancer/recharger trop souvent.
+    st.session_state.worker.cancel()
+    st.session_state.victim.memory.clear()
     init_state()
     st.toast("Simulation réinitialisée ✅")
 
 
+def resume(session_id: str) -> bool:
+    """Recharge une session enregistrée (état, tracker de script, mémoire de la victime)."""
+    st.session_state.worker.cancel()
+    sim = SimulationState()
+    if not resume_session(session_id, sim, st.session_state.victim, st.session_state.director):
+        return False
+    init_state()
+    st.session_state.session_id = session_id
+    st.query_params["session"] = session_id
+    st.session_state.turn = sim.turn
+    st.session_state.current_objective = sim.current_objective
+    st.session_state.audience_constraint = sim.audience_constraint
+    st.session_state.scenario = sim.scenario
+    add_log(f"[SESSION] {session_id} reprise au tour {sim.turn}")
+    return True
+
+
+def transcript() -> List[ChatTurn]:
+    """Dernières pages du transcript (lues en SQLite à chaque rendu, rien d'accumulé en session)."""
+    if not st.session_state.session_id:
+        return list(st.session_state.chat)
+    limit = Config.TRANSCRIPT_PAGE_SIZE * st.session_state.transcript_pages
+    chat: List[ChatTurn] = []
+    for record in get_session_store().page(st.session_state.session_id, limit):
+        chat.append(ChatTurn(role="scammer", text=record.scammer, meta={"turn": record.turn}))
+        if record.tool_calls:
+            chat.append(ChatTurn(role="system", text="🔊 " + ", ".join(c["name"] for c in record.tool_calls)))
+        chat.append(ChatTurn(role="jeanne", text=record.reply))
+    return chat
+
+
 def add_log(msg: str):
     st.session_state.logs.append(f"{time.strftime('%H:%M:%S')} | {msg}")
 
 
-def extract_sound_effects(text: str) -> List[str]:
-    # Très simple : on détecte les tags retournés par tools
-    effects = []
-    for tag in [
-        "[SOUND_EFFECT: DOG_BARKING]",
-        "[SOUND_EFFECT: DOORBELL]",
-        "[SOUND_EFFECT: COUGHING_FIT]",
-        "[SOUND_EFFECT: TV_BACKGROUND_LOUD]",
-    ]:
-        if tag in text:
-            effects.append(tag)
-    return effects
-
-
-def guardrails_check(text: str) -> Optional[str]:
-    """
-    Anti-catastrophe : si Jeanne lâche des infos sensibles, on bloque.
-    (Basique, mais utile pour la note.)
-    """
-    lowered = text.lower()
-    forbidden = ["iban", "rib", "numéro de carte", "carte bancaire", "cvc", "cvv", "mot de passe", "code sms"]
-    if any(f in lowered for f in forbidden):
-        return "🚫 La réponse contenait potentiellement des informations sensibles. Réponse bloquée."
-    return None
+def turn_effects(job: TurnJob) -> List[str]:
+    """Effets du tour : sorties des tools exécutés, puis tags repris dans la réponse (sans doublon)."""
+    # registre généré depuis le cache des schémas ; un tool joué compte même si le modèle n'a pas recopié son tag
+    registry = get_effect_registry()
+    texts = [str(call.get("output", "")) for call in job.tool_calls] + [job.reply]
+    return list(dict.fromkeys(effect for text in texts for effect in registry.find(text)))
 
 
-# -----------------------------
-# Streamlit App
-# -----------------------------
-st.set_page_config(
-    page_title="Simulateur d'Arnaque (MCP + LangChain)",
-    layout="wide",
-)
+def send_message():
+    """Callback du bouton Envoyer : le tour part au worker, le script rend la main tout de suite."""
+    scammer_text = (st.session_state.scammer_input or "").strip()
+    if not scammer_text:
+        st.toast("Écris un message d'arnaqueur.", icon="⚠️")
+        return
+    st.session_state.worker.submit(
+        scammer_text,
+        turn=st.session_state.turn,
+        objective=st.session_state.current_objective,
+        constraint=st.session_state.audience_constraint,
+        scenario=st.session_state.scenario,
+        session_id=st.session_state.session_id,
+    )
+    # dans un callback : vider le widget est permis (il n'est pas encore recréé)
+    st.session_state.scammer_input = ""
 
-st.title("🎭 Simulateur d'Arnaque — Jeanne Dubois (LLM + MCP Tools)")
 
-# Check config
-if not Config.OPENAI_API_KEY:
-    st.error("OPENAI_API_KEY manquant. Ajoute-le dans le fichier .env puis relance Streamlit.")
-    st.stop()
+def apply_turn(job: TurnJob):
+    """Tour terminé par le worker -> état de session (objectif, compteur, bande son, logs)."""
+    st.session_state.logs.extend(job.logs)
+    if job.status != "done":
+        st.toast("Le tour a échoué (voir les logs).", icon="⚠️")
+        return
+    st.session_state.current_objective = job.objective
 
-ensure_agents()
-if "chat" not in st.session_state:
-    init_state()
+    # Log sound effects if present
+    effects = turn_effects(job)
+    for e in effects:
+        add_log(f"[TOOL_EFFECT] {e}")
+    start = st.session_state.timeline.add_turn(job.reply, effects)
+    st.session_state.audio_start = start if effects else None
 
-with st.sidebar:
+    if not st.session_state.session_id:
+        st.session_state.chat.append(ChatTurn(role="scammer", text=job.scammer))
+        st.session_state.chat.append(ChatTurn(role="jeanne", text=job.reply))
+    st.session_state.turn = job.turn + 1
+
+
+def add_proposal():
+    p = (st.session_state.proposal_input or "").strip()
+    if p:
+        st.session_state.audience_proposals.append(p)
+        st.session_state.proposal_input = ""
+        add_log(f"[AUDIENCE] Proposition ajoutée: {p}")
+    else:
+        st.toast("Entre une proposition.", icon="⚠️")
+
+
+def apply_vote(window: VoteWindow):
+    if st.session_state.audience_constraint != window.winner():
+        st.session_state.audience_constraint = window.winner()
+        add_log(f"[AUDIENCE] Vote public: {st.session_state.audience_constraint} ({len(window.voters)} votants)")
+
+
+# -----------------------------
+# Panneaux (fragments) : une interaction ne relance que son panneau
+# -----------------------------
+@st.fragment
+def sidebar_panel():
     st.header("⚙️ Contrôles")
     st.write("Tour :", st.session_state.turn)
-    st.write("Objectif (Directeur) :")
+    st.write("Objectif (Directeur) :" if Config.DIRECTOR_MODE != "fused" else "Objectif (Directeur, mode fusionné) :")
     st.code(st.session_state.current_objective or "", language="text")
-    st.write("Contrainte audience :")
-    st.code(st.session_state.audience_constraint or "Aucune", language="text")
 
     st.divider()
 
+    # reset / reprise : tout l'état change, toute la page est redessinée
     if st.button("🔄 Reset simulation", use_container_width=True):
         reset_all()
+        st.rerun()
+
+    if Config.SESSIONS_ENABLED:
+        st.caption(f"Session : {st.session_state.session_id}")
+        session_input = st.text_input("Reprendre une session", placeholder="identifiant de session")
+        if st.button("📂 Reprendre", use_container_width=True) and session_input.strip():
+            if resume(session_input.strip()):
+                st.rerun()
+            st.toast("Session inconnue.", icon="⚠️")
 
     st.divider()
     st.caption("MCP Soundboard")
@@ -122,43 +216,107 @@ with st.sidebar:
     st.write("Args :", " ".join(Config.MCP_SOUNDBOARD_ARGS))
 
 
-col1, col2, col3 = st.columns([1.2, 2.2, 1.4], gap="large")
-
-# -----------------------------
-# Column 1: Scammer input
-# -----------------------------
-with col1:
-    st.subheader("🕵️ Arnaqueur")
-    scammer_text = st.text_area(
-        "Message de l'arnaqueur",
-        placeholder="Ex: Bonjour madame, je suis du support Microsoft...",
-        height=160,
-        key="scammer_input",
-    )
-
-    send = st.button("📨 Envoyer", type="primary", use_container_width=True)
-
-    st.divider()
-    st.caption("Astuce : tape 'quit' en CLI, ici utilise Reset.")
-
-# -----------------------------
-# Column 3: Audience
-# -----------------------------
-with col3:
+@st.fragment(run_every=Config.UI_POLL_INTERVAL)
+def live_turn():
+    """Tour en cours, relu sur le worker à chaque tick : seul ce bloc est redessiné pendant la génération."""
+    job = st.session_state.worker.take()
+    if job is not None:
+        apply_turn(job)
+        # fin du tour : historique, compteur, objectif et bande son à jour ; le polling s'arrête
+        st.rerun()
+    job = st.session_state.worker.job
+    if job is None:
+        return
+    st.markdown(f"**Arnaqueur :** {job.scammer}")
+    st.markdown(f"**Jeanne :** {job.partial}▌" if job.partial else "_Jeanne réfléchit…_")
+
+
+def older_page():
+    st.session_state.transcript_pages += 1
+
+
+@st.fragment
+def conversation_panel():
+    col1, col2 = st.columns([1.2, 2.2], gap="large")
+    busy = st.session_state.worker.busy
+
+    # -----------------------------
+    # Column 1: Scammer input
+    # -----------------------------
+    with col1:
+        st.subheader("🕵️ Arnaqueur")
+        st.text_area(
+            "Message de l'arnaqueur",
+            placeholder="Ex: Bonjour madame, je suis du support Microsoft...",
+            height=160,
+            key="scammer_input",
+        )
+        st.button("📨 Envoyer", type="primary", use_container_width=True, disabled=busy, on_click=send_message)
+        if busy:
+            st.caption("⏳ Jeanne répond… l'audience peut continuer à proposer et voter.")
+
+        st.divider()
+        st.caption("Astuce : tape 'quit' en CLI, ici utilise Reset.")
+
+    # -----------------------------
+    # Column 2: Conversation
+    # -----------------------------
+    with col2:
+        st.subheader("💬 Conversation")
+        st.caption("Historique + réponse de Jeanne + tools (si déclenchés)")
+
+        # Display chat (pages récentes ; les plus anciennes sont lues à la demande)
+        chat = transcript()
+        if not chat and not busy:
+            st.info("Envoie un premier message de l'arnaqueur pour démarrer la simulation.")
+        elif chat:
+            first = chat[0].meta or {}
+            if first.get("turn", 0) > 0:
+                st.button("⬆️ Tours précédents", use_container_width=True, on_click=older_page)
+            for t in chat:
+                if t.role == "scammer":
+                    st.markdown(f"**Arnaqueur :** {t.text}")
+                elif t.role == "jeanne":
+                    st.markdown(f"**Jeanne :** {t.text}")
+                else:
+                    st.caption(t.text)
+
+        # Tour en cours ou terminé mais pas encore appliqué : rafraîchi seul, sans redessiner l'historique
+        if st.session_state.worker.job is not None:
+            live_turn()
+
+        # Effets sonores du dernier tour (mixés hors-ligne)
+        if st.session_state.audio_start is not None:
+            st.audio(st.session_state.timeline.to_wav_bytes(st.session_state.audio_start), format="audio/wav")
+
+        st.divider()
+        st.subheader("🧾 Logs (debug)")
+        if st.session_state.logs:
+            st.code("\n".join(list(st.session_state.logs)[-25:]), language="text")
+        else:
+            st.caption("Aucun log pour l'instant.")
+
+
+@st.fragment(run_every=Config.UI_POLL_INTERVAL)
+def vote_tally(window: VoteWindow):
+    """Décompte du vote public en direct ; à la fermeture, le gagnant devient la contrainte."""
+    st.json(window.tally())
+    if window.closed:
+        apply_vote(window)
+        st.rerun()  # fenêtre fermée : contrainte affichée, polling arrêté
+
+
+@st.fragment
+def audience_panel():
     st.subheader("🗳️ Audience")
+    st.write("Contrainte (prochain tour) :")
+    constraint_box = st.empty()  # rempli en fin de panneau, après un éventuel vote
 
     # Add proposals
-    proposal = st.text_input("Proposer un événement", placeholder="Ex: Quelqu'un sonne à la porte", key="proposal_input")
+    st.text_input("Proposer un événement", placeholder="Ex: Quelqu'un sonne à la porte", key="proposal_input")
     c1, c2 = st.columns([1, 1])
     with c1:
-        if st.button("➕ Ajouter", use_container_width=True):
-            p = (proposal or "").strip()
-            if p:
-                st.session_state.audience_proposals.append(p)
-                st.session_state.proposal_input = ""
-                add_log(f"[AUDIENCE] Proposition ajoutée: {p}")
-            else:
-                st.toast("Entre une proposition.", icon="⚠️")
+        st.button("➕ Ajouter", use_container_width=True, on_click=add_proposal)
 
     with c2:
         if st.button("🧹 Vider", use_container_width=True):
@@ -167,16 +325,18 @@ with col3:
             st.session_state.audience_vote = ""
             add_log("[AUDIENCE] Propositions vidées.")
 
-    st.write("Propositions (max conseillé: 5) :")
-    if st.session_state.audience_proposals:
-        st.write("\n".join([f"- {p}" for p in st.session_state.audience_proposals]))
+    # Pré-modération locale : quasi-doublons regroupés, idées dangereuses écartées, top-K clusters
+    clusters = get_premoderator().top(st.session_state.audience_proposals)
+    st.write(f"Propositions ({len(st.session_state.audience_proposals)} reçues, idées principales) :")
+    if clusters:
+        st.write("\n".join([f"- {c.representative} (×{c.count})" for c in clusters]))
     else:
         st.info("Aucune proposition pour l'instant.")
 
     st.divider()
 
     if st.button("🤖 Modérateur: générer 3 choix", use_container_width=True):
-        proposals = st.session_state.audience_proposals[:5]
+        proposals = [c.representative for c in clusters]
         if not proposals:
             proposals = ["Quelqu'un sonne à la porte", "Le chien aboie fort", "Quinte de toux"]
         choices = st.session_state.moderator.pick_three(
@@ -187,7 +347,21 @@ with col3:
         st.session_state.audience_vote = choices[0] if choices else ""
         add_log("[MODERATOR] 3 choix générés.")
 
-    if st.session_state.audience_choices:
+    if st.session_state.audience_choices and Config.VOTE_SERVICE:
+        # vote public : fenêtre minutée sur le service HTTP, le gagnant devient la contrainte
+        server = get_vote_server()
+        window = server.window
+        if st.button(f"📡 Ouvrir le vote public ({Config.VOTE_WINDOW:.0f} s)", use_container_width=True):
+            window = run_sync(server.aopen(st.session_state.audience_choices))
+            add_log(f"[AUDIENCE] Vote ouvert: {server.url}/vote?voter=<id>&choice=<0-2>")
+        if window is not None and window.choices == st.session_state.audience_choices:
+            st.caption(f"POST {server.url}/vote?voter=<id>&choice=<0-2> — live : {server.url}/stream")
+            if window.closed:
+                st.json(window.tally())
+                apply_vote(window)
+            else:
+                vote_tally(window)
+    elif st.session_state.audience_choices:
         st.write("Choisis l'événement :")
         st.session_state.audience_vote = st.radio(
             "Vote",
@@ -202,75 +376,38 @@ with col3:
     else:
         st.caption("Génère des choix pour voter.")
 
-# -----------------------------
-# Column 2: Conversation
-# -----------------------------
-with col2:
-    st.subheader("💬 Conversation")
-    st.caption("Historique + réponse de Jeanne + tools (si déclenchés)")
-
-    # Display chat
-    if not st.session_state.chat:
-        st.info("Envoie un premier message de l'arnaqueur pour démarrer la simulation.")
-    else:
-        for t in st.session_state.chat[-20:]:
-            if t.role == "scammer":
-                st.markdown(f"**Arnaqueur :** {t.text}")
-            elif t.role == "jeanne":
-                st.markdown(f"**Jeanne :** {t.text}")
-            else:
-                st.caption(t.text)
+    constraint_box.code(st.session_state.audience_constraint or "Aucune", language="text")
 
-    st.divider()
-    st.subheader("🧾 Logs (debug)")
-    if st.session_state.logs:
-        st.code("\n".join(st.session_state.logs[-25:]), language="text")
-    else:
-        st.caption("Aucun log pour l'instant.")
 
 # -----------------------------
-# Actions: send scammer message
+# Streamlit App
 # -----------------------------
-if send:
-    scammer_text = (st.session_state.scammer_input or "").strip()
-    if not scammer_text:
-        st.toast("Écris un message d'arnaqueur.", icon="⚠️")
-        st.stop()
-
-    # Append scammer message
-    st.session_state.chat.append(ChatTurn(role="scammer", text=scammer_text))
-
-    # Director objective update
-    add_log(f"[SCAMMER] {scammer_text}")
-    obj = st.session_state.director.analyze(scammer_text)
-    st.session_state.current_objective = obj
-    add_log(f"[DIRECTOR] objectif -> {obj}")
-
-    # Victim respond (MCP tools possible)
-    reply = st.session_state.victim.respond(
-        user_input=scammer_text,
-        objective=st.session_state.current_objective,
-        constraint=st.session_state.audience_constraint,
-    )
-
-    # Guardrails: prevent sensitive leakage
-    blocked = guardrails_check(reply)
-    if blocked:
-        add_log("[GUARDRAIL] Réponse bloquée (info sensible détectée).")
-        reply = blocked
+st.set_page_config(
+    page_title="Simulateur d'Arnaque (MCP + LangChain)",
+    layout="wide",
+)
 
-    # Log sound effects if present
-    effects = extract_sound_effects(reply)
-    for e in effects:
-        add_log(f"[TOOL_EFFECT] {e}")
+st.title("🎭 Simulateur d'Arnaque — Jeanne Dubois (LLM + MCP Tools)")
 
-    st.session_state.chat.append(ChatTurn(role="jeanne", text=reply))
+# Check config
+if Config.LLM_BACKEND != "fake" and not Config.OPENAI_API_KEY:
+    st.error("OPENAI_API_KEY manquant. Ajoute-le dans le fichier .env puis relance Streamlit.")
+    st.stop()
 
-    # Increment turn
-    st.session_state.turn += 1
+setup_logging()
+ensure_agents()
+if "chat" not in st.session_state:
+    # redémarrage / nouvel onglet : la session de l'URL est reprise si elle existe
+    requested = st.query_params.get("session")
+    init_state()
+    if Config.SESSIONS_ENABLED and requested:
+        resume(requested)
 
-    # Clear input
-    st.session_state.scammer_input = ""
+with st.sidebar:
+    sidebar_panel()
 
-    # Rerun to refresh UI
-    st.rerun()
+main_col, audience_col = st.columns([3.4, 1.4], gap="large")
+with main_col:
+    conversation_panel()
+with audience_col:
+    audience_panel()
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Future
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from scam_simulator.config import Config
+from scam_simulator.guardrails import BLOCKED_MESSAGE, get_guardrails
+from scam_simulator.orchestration.persistence import TurnRecord, get_session_store
+from scam_simulator.orchestration.speculative import aspeculative_reply
+from scam_simulator.orchestration.state import SimulationState
+from scam_simulator.runtime import submit
+from scam_simulator.telemetry import trace
+
+if TYPE_CHECKING:
+    from scam_simulator.agents.director_agent import DirectorAgent
+    from scam_simulator.agents.victim_agent import VictimAgent
+    from scam_simulator.orchestration.scenario import ScenarioTracker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TurnJob:
+    """Un tour soumis par l'UI : rempli sur la boucle partagée, relu par le script Streamlit."""
+
+    turn: int
+    scammer: str
+    objective: str
+    constraint: Optional[str]
+    status: str = "running"  # "running" | "done" | "error" | "cancelled"
+    partial: str = ""  # réponse au fil des tokens (déjà passée au guardrail)
+    reply: str = ""
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    logs: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    generation: int = 0  # victim.memory.generation à la soumission
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    def log(self, msg: str) -> None:
+        self.logs.append(f"{time.strftime('%H:%M:%S')} | {msg}")
+
+
+class TurnWorker:
+    """
+    Exécute les tours d'une session Streamlit sur la boucle partagée (runtime.py), hors du thread du script :
+    - submit() rend la main tout de suite ; l'UI relit job.partial / job.status à chaque rafraîchissement
+    - un tour à la fois par session (la mémoire de la victime est séquentielle)
+    - take() renvoie le tour terminé une seule fois, pour l'appliquer à l'état de session
+    """
+
+    def __init__(self, victim: VictimAgent, director: DirectorAgent) -> None:
+        self.victim = victim
+        self.director = director
+        self.job: Optional[TurnJob] = None
+        self._future: Optional[Future] = None
+
+    @property
+    def busy(self) -> bool:
+        return self.job is not None and self.job.running
+
+    def submit(
+        self,
+        scammer: str,
+        turn: int,
+        objective: str,
+        constraint: Optional[str],
+        scenario: Optional[ScenarioTracker],
+        session_id: Optional[str],
+    ) -> TurnJob:
+        if self.busy:
+            raise RuntimeError("Un tour est déjà en cours pour cette session.")
+        job = TurnJob(
+            turn=turn,
+            scammer=scammer,
+            objective=objective,
+            constraint=constraint,
+            generation=self.victim.memory.generation,
+        )
+        self.job = job
+        self._future = submit(self._arun(job, scenario, session_id))
+        return job
+
+    def take(self) -> Optional[TurnJob]:
+        job = self.job
+        if job is None or job.running:
+            return None
+        self.job = None
+        return job
+
+    def cancel(self) -> None:
+        """
+        Abandonne le tour en cours (reset, reprise d'une autre session).
+        L'annulation n'est qu'une demande : le tour peut encore finir, mais une fois la mémoire vidée
+        ou restaurée (nouvelle memory.generation), il n'écrit plus ni dans la mémoire ni dans le SessionStore.
+        """
+        if self._future is not None:
+            self._future.cancel()
+        self.job = None
+
+    async def _arun(self, job: TurnJob, scenario: Optional[ScenarioTracker], session_id: Optional[str]) -> None:
+        try:
+            with trace(turn=job.turn):
+                await self._aturn(job, scenario)
+            if self._stale(job):
+                job.status = "cancelled"
+                return
+            if session_id:
+                record = TurnRecord(
+                    turn=job.turn,
+                    scammer=job.scammer,
+                    objective=job.objective,
+                    constraint=job.constraint,
+                    reply=job.reply,
+                    tool_calls=job.tool_calls,
+                )
+                get_session_store().append(session_id, record, self.victim.memory.summary)
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as exc:
+            logger.exception("Tour %s en échec", job.turn)
+            job.error = repr(exc)
+            job.log(f"[ERREUR] {exc!r}")
+            job.status = "error"
+        else:
+            job.status = "done"
+
+    def _stale(self, job: TurnJob) -> bool:
+        return job.generation != self.victim.memory.generation
+
+    async def _aturn(self, job: TurnJob, scenario: Optional[ScenarioTracker]) -> None:
+        job.log(f"[SCAMMER] {job.scammer}")
+        # Mode fusionné : hors match de script, l'objectif vient du même appel que la réponse
+        # Mode spéculatif : le directeur tourne pendant le brouillon de la victime
+        fused = False
+        speculative = Config.DIRECTOR_MODE == "speculative"
+        objective = None
+        if Config.DIRECTOR_MODE == "fused":
+            objective = self.director.from_script(job.scammer, scenario)
+            fused = objective is None
+        elif not speculative:
+            objective = await self.director.aanalyze(job.scammer, scenario)
+        if objective:
+            job.objective = objective
+            job.log(f"[DIRECTOR] objectif -> {objective}")
+
+        # Guardrail incrémental : le flux est coupé dès qu'une info sensible apparaît (rien n'est affiché)
+        reply = ""
+        guard = get_guardrails().stream()
+        sim: Optional[SimulationState] = None
+        if speculative:
+            sim = SimulationState()
+            sim.current_objective = job.objective
+            sim.audience_constraint = job.constraint
+            sim.scenario = scenario
+            stream = aspeculative_reply(job.scammer, sim, self.victim, self.director)
+        else:
+            stream = self.victim.astream_respond(
+                user_input=job.scammer,
+                objective=job.objective,
+                constraint=job.constraint,
+                fused=fused,
+            )
+        async with aclosing(stream):
+            async for chunk in stream:
+                reply += guard.feed(chunk)
+                if guard.violation is not None:
+                    break
+                job.partial = reply
+
+        if guard.violation is not None:
+            job.log(f"[GUARDRAIL] Réponse coupée ({guard.violation.rule}).")
+            reply = BLOCKED_MESSAGE
+            self.victim.remember(job.scammer, reply, job.generation)
+        else:
+            reply += guard.finish()
+
+        if sim is not None:
+            job.objective = sim.current_objective
+            job.log(f"[DIRECTOR] objectif (spéculatif) -> {job.objective}")
+        if fused and self.victim.last_objective:
+            job.objective = self.victim.last_objective
+            job.log(f"[DIRECTOR] objectif (fusionné) -> {job.objective}")
+        job.reply = job.partial = reply
+        job.tool_calls = list(self.victim.last_tool_calls)
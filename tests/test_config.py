@@ -0,0 +1,18 @@
+from scam_simulator.config import Env, flag
+
+
+def test_flag_accepts_common_truthy_spellings():
+    for value in ("1", "true", "TRUE", "Yes", "on", " on "):
+        assert flag(value) is True
+    for value in ("0", "false", "no", "off", ""):
+        assert flag(value) is False
+
+
+def test_env_reads_and_casts_on_first_access(monkeypatch):
+    monkeypatch.setenv("SCAM_TEST_FLAG", "True")
+
+    class Settings:
+        FLAG = Env("SCAM_TEST_FLAG", "0", flag)
+
+    assert Settings.FLAG is True
+    assert Settings.__dict__["FLAG"] is True
@@ -0,0 +1,21 @@
+from scam_simulator.tools.dispatch import ToolDispatcher
+from scam_simulator.tools.schema_cache import local_tool_specs
+
+dispatcher = ToolDispatcher(local_tool_specs())
+
+
+def test_rules_match_clear_constraints():
+    assert dispatcher.match("Le chien aboie fort") == "dog_bark"
+    assert dispatcher.match("On sonne à la porte") == "doorbell"
+    assert dispatcher.match("On frappe") == "doorbell"
+    assert dispatcher.match("Jeanne reçoit une visite") == "doorbell"
+
+
+def test_doorbell_rules_ignore_unrelated_uses_of_porte():
+    assert dispatcher.match("Jeanne cherche son porte-monnaie") is None
+    assert dispatcher.match("Elle porte un gilet") is None
+
+
+def test_single_description_word_does_not_predispatch():
+    assert dispatcher.match("Parle d'amour") is None
+    assert dispatcher.match("Jeanne est interrompue") is None
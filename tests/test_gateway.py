@@ -0,0 +1,35 @@
+import asyncio
+
+from scam_simulator.llm.gateway import GatewayChat, LLMGateway
+
+
+class _CountingChat:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        n = self.calls
+        await asyncio.sleep(0.05)
+        return f"réponse {n}"
+
+
+def _concurrent_calls(coalesce: bool):
+    llm = _CountingChat()
+    chat = GatewayChat(llm, LLMGateway(), model="m", temperature=0.6, coalesce=coalesce)
+
+    async def scenario():
+        return await asyncio.gather(chat.ainvoke("Allô ?"), chat.ainvoke("Allô ?"))
+
+    replies = asyncio.run(scenario())
+    return llm.calls, replies
+
+
+def test_sampled_callers_are_not_coalesced():
+    calls, replies = _concurrent_calls(coalesce=False)
+    assert calls == 2 and replies[0] != replies[1]
+
+
+def test_opt_in_callers_share_one_call():
+    calls, replies = _concurrent_calls(coalesce=True)
+    assert calls == 1 and replies[0] == replies[1]
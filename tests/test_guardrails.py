@@ -0,0 +1,54 @@
+from scam_simulator.guardrails import GuardrailEngine
+
+engine = GuardrailEngine(keywords=[])
+
+
+def test_iban_spaced_followed_by_words():
+    v = engine.scan("Mon numéro: FR76 3000 6000 0112 3456 7890 189 de mon fils")
+    assert v is not None and v.rule == "iban"
+    assert v.match == "FR7630006000011234567890189"
+
+
+def test_iban_compact_followed_by_words():
+    v = engine.scan("Voilà FR7630006000011234567890189 et voilà")
+    assert v is not None and v.rule == "iban"
+
+
+def test_iban_followed_by_uppercase_group():
+    v = engine.scan("FR76 3000 6000 0112 3456 7890 189 DE MON FILS")
+    assert v is not None and v.rule == "iban"
+
+
+def test_invalid_iban_not_blocked():
+    assert engine.scan("Référence FR76 3000 6000 0112 3456 7890 188 merci") is None
+
+
+def test_postal_code_is_not_otp():
+    assert engine.scan("Mon code postal est 75001") is None
+
+
+def test_sms_code_is_otp():
+    v = engine.scan("Le code reçu par SMS c'est 482913")
+    assert v is not None and v.rule == "otp"
+
+
+def test_stream_blocks_iban_split_across_chunks():
+    guard = engine.stream()
+    for chunk in ["Mon numéro: FR76 30", "00 6000 0112 3456 ", "7890 189 de mon fils"]:
+        guard.feed(chunk)
+    guard.finish()
+    assert guard.violation is not None and guard.violation.rule == "iban"
+
+
+def test_stream_releases_the_whole_safe_reply():
+    reply = "Oh mon petit, attendez que je cherche mes lunettes dans le buffet de la cuisine. " * 5
+    guard = engine.stream()
+    out = "".join(guard.feed(reply[i:i + 3]) for i in range(0, len(reply), 3)) + guard.finish()
+    assert guard.violation is None and out == reply
+
+
+def test_stream_blocks_card_fed_char_by_char():
+    guard = GuardrailEngine(keywords=[]).stream()
+    out = "".join(guard.feed(c) for c in "Bon, ma carte c'est le 4111 1111 1111 1111, voilà.") + guard.finish()
+    assert guard.violation is not None and guard.violation.rule == "card"
+    assert "4111" not in out
@@ -0,0 +1,25 @@
+import asyncio
+
+from scam_simulator.llm.cache import LLMCache
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = LLMCache(path=path, flush_interval=10)
+    cache.put("k", {"content": "bonjour", "tool_calls": []})
+    cache.close()  # écritures en file vidées avant fermeture
+
+    reopened = LLMCache(path=path)
+    assert asyncio.run(reopened.aget("k")) == {"content": "bonjour", "tool_calls": []}
+    assert reopened.disk_hits == 1
+    assert asyncio.run(reopened.aget("absent")) is None
+    reopened.close()
+
+
+def test_clear_drops_queued_writes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = LLMCache(path=path, flush_interval=10)
+    cache.put("k", {"content": "x"})
+    cache.clear()
+    cache.close()
+    assert LLMCache(path=path).get("k") is None
@@ -0,0 +1,54 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from scam_simulator.llm.memory import ConversationMemory
+
+
+class _SlowSummarizer:
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def ainvoke(self, prompt: str) -> AIMessage:
+        self.started.set()
+        await self.release.wait()
+        return AIMessage(content="Résumé de l'ancien appel.")
+
+
+class _FailingSummarizer:
+    async def ainvoke(self, prompt: str) -> AIMessage:
+        raise RuntimeError("indisponible")
+
+
+def _count(message) -> int:
+    return 10
+
+
+def test_evicted_turns_stay_out_of_prompt_and_budget():
+    memory = ConversationMemory(budget_tokens=40, summarize_every=1, summarizer=_FailingSummarizer(), counter=_count)
+    for i in range(50):
+        memory.add_turn(f"question {i}", f"réponse {i}")
+        assert sum(_count(m) for m in memory.messages()) <= 40
+    assert memory.messages()[-1].content == "réponse 49"
+    assert len(memory._pending) * 10 <= 40  # le résumeur en panne ne fait pas grossir l'attente
+
+
+def test_clear_drops_inflight_fold():
+    async def scenario() -> ConversationMemory:
+        summarizer = _SlowSummarizer()
+        memory = ConversationMemory(budget_tokens=20, summarize_every=1, summarizer=summarizer, counter=_count)
+        for i in range(3):
+            memory.add_turn(f"question {i}", f"réponse {i}")
+        fold = asyncio.ensure_future(memory.afold())
+        await summarizer.started.wait()
+        memory.clear()
+        memory.add_turn("nouvelle conversation", "bonjour")
+        summarizer.release.set()
+        await fold
+        return memory
+
+    memory = asyncio.run(scenario())
+    assert memory.summary == ""
+    assert not any(isinstance(m, SystemMessage) for m in memory.messages())
+    assert [m.content for m in memory.messages() if isinstance(m, HumanMessage)] == ["nouvelle conversation"]
@@ -0,0 +1,22 @@
+from scam_simulator.orchestration.scenario import ScenarioEngine, ScenarioScript, ScenarioStep
+
+engine = ScenarioEngine([
+    ScenarioScript(id="support", name="Support", steps=[
+        ScenarioStep(id="intro", goal="", objective="intro", signals=["microsoft", "virus", "sécurité"]),
+        ScenarioStep(id="remote", goal="", objective="remote", signals=["anydesk", "teamviewer", "installer"]),
+    ]),
+])
+
+
+def test_single_keyword_is_not_confident():
+    assert engine.tracker().observe("Vous avez un virus.") is None
+
+
+def test_two_signals_on_one_step_skip_the_director():
+    tracker = engine.tracker()
+    assert tracker.observe("Support Microsoft, votre PC a un virus.") == "intro"
+    assert tracker.current_step.id == "intro"
+
+
+def test_tie_between_steps_is_ambiguous():
+    assert engine.tracker().observe("Microsoft, virus : AnyDesk ou TeamViewer.") is None
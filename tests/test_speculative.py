@@ -0,0 +1,52 @@
+import asyncio
+
+from scam_simulator.config import Config
+from scam_simulator.orchestration.speculative import aspeculative_reply
+from scam_simulator.orchestration.state import SimulationState
+
+
+class _Director:
+    def __init__(self, objective: str) -> None:
+        self.objective = objective
+
+    async def aanalyze(self, scammer, scenario):
+        await asyncio.sleep(0.2)
+        return self.objective
+
+
+def _run(monkeypatch, new_objective: str):
+    for name, value in {
+        "LLM_BACKEND": "fake", "OPENAI_API_KEY": "test", "TOOL_BACKEND": "inprocess",
+        "TOOL_PREDISPATCH": False, "LLM_GATEWAY": False,
+    }.items():
+        monkeypatch.setattr(Config, name, value)
+    from scam_simulator.agents.victim_agent import VictimAgent
+
+    async def scenario():
+        victim = VictimAgent()
+        calls = []
+        call_tool = victim.soundboard.call_tool
+
+        async def recording(name, args):
+            calls.append(name)
+            return await call_tool(name, args)
+
+        victim.soundboard.call_tool = recording
+        state = SimulationState()
+        state.current_objective = "Gagner du temps"
+        try:
+            async for _ in aspeculative_reply("Vous entendez le chien ?", state, victim, _Director(new_objective)):
+                pass
+        finally:
+            await victim.aclose()
+        return calls
+
+    return asyncio.run(scenario())
+
+
+def test_discarded_draft_runs_no_tools(monkeypatch):
+    assert _run(monkeypatch, "Demander le nom de la banque et raccrocher") == ["dog_bark"]
+
+
+def test_kept_draft_runs_its_tools(monkeypatch):
+    assert _run(monkeypatch, "Gagner du temps") == ["dog_bark"]
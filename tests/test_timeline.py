@@ -0,0 +1,20 @@
+import numpy as np
+
+from scam_simulator.audio.timeline import CHARS_PER_SECOND, Timeline
+
+
+def test_turn_segment_keeps_trailing_silence():
+    timeline = Timeline()
+    start = timeline.add_turn("x" * int(CHARS_PER_SECOND * 5), ["DOG_BARKING"])
+    pcm = timeline.segment(start)
+    assert len(pcm) == timeline.cursor - start
+    assert np.abs(pcm[:1000]).max() > 0
+
+
+def test_buffer_stays_bounded_over_a_long_conversation():
+    timeline = Timeline()
+    for _ in range(100):
+        timeline.add_turn("x" * 300, ["DOG_BARKING"])
+        timeline.render()
+    assert len(timeline._buffer) * 4 < 1_000_000  # l'audio des tours déjà joués est abandonné
+    assert timeline.seconds > 100 * 20
@@ -0,0 +1,88 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from scam_simulator.config import Config
+
+FIRST = "OBJECTIF: Gagner du temps\nAttendez, le chien… "
+SECOND = "Voilà, il s'est calmé."
+
+
+class _ScriptedChat:
+    """Premier appel : texte + tool call ; second appel : suite de la réponse."""
+
+    def _first(self, messages) -> bool:
+        return not any(getattr(m, "type", "") == "tool" for m in messages)
+
+    async def ainvoke(self, messages):
+        if self._first(messages):
+            return AIMessage(content=FIRST, tool_calls=[{"name": "dog_bark", "args": {}, "id": "c1"}])
+        return AIMessage(content=SECOND)
+
+    async def astream(self, messages):
+        if self._first(messages):
+            yield AIMessageChunk(content=FIRST)
+            yield AIMessageChunk(content="", tool_call_chunks=[{"name": "dog_bark", "args": "{}", "id": "c1", "index": 0}])
+        else:
+            yield AIMessageChunk(content=SECOND)
+
+
+def test_respond_and_stream_give_the_same_reply_with_tools(monkeypatch):
+    for name, value in {
+        "LLM_BACKEND": "fake", "OPENAI_API_KEY": "test", "TOOL_BACKEND": "inprocess",
+        "TOOL_PREDISPATCH": False, "LLM_GATEWAY": False,
+    }.items():
+        monkeypatch.setattr(Config, name, value)
+    from scam_simulator.agents.victim_agent import VictimAgent
+
+    async def scenario():
+        victim = VictimAgent()
+        await victim._ensure_tools()
+        victim.llm = _ScriptedChat()
+        try:
+            reply = await victim.arespond("Allô ?", "Gagner du temps", fused=True, remember=False)
+            objective = victim.last_objective
+            streamed = "".join([c async for c in victim.astream_respond("Allô ?", "Gagner du temps", fused=True, remember=False)])
+        finally:
+            await victim.aclose()
+        return reply, objective, streamed, victim.last_objective
+
+    reply, objective, streamed, streamed_objective = asyncio.run(scenario())
+    assert reply == streamed == "Attendez, le chien… Voilà, il s'est calmé."
+    assert objective == streamed_objective == "Gagner du temps"
+
+
+class _SlowChat:
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+
+    async def astream(self, messages):
+        self.started.set()
+        await asyncio.sleep(0.1)
+        yield AIMessageChunk(content="Allô ? Qui est à l'appareil ?")
+
+
+def test_turn_finishing_after_reset_is_not_remembered(monkeypatch):
+    for name, value in {
+        "LLM_BACKEND": "fake", "OPENAI_API_KEY": "test", "TOOL_BACKEND": "inprocess",
+        "TOOL_PREDISPATCH": False, "LLM_GATEWAY": False,
+    }.items():
+        monkeypatch.setattr(Config, name, value)
+    from scam_simulator.agents.victim_agent import VictimAgent
+
+    async def scenario():
+        victim = VictimAgent()
+        await victim._ensure_tools()
+        victim.llm = chat = _SlowChat()
+
+        async def turn():
+            return "".join([c async for c in victim.astream_respond("Bonjour madame", "Gagner du temps")])
+
+        task = asyncio.ensure_future(turn())
+        await chat.started.wait()
+        victim.memory.clear()  # reset / reprise pendant le tour
+        await task
+        await victim.aclose()
+        return victim.memory.messages()
+
+    assert asyncio.run(scenario()) == []
@@ -0,0 +1,32 @@
+import asyncio
+
+from scam_simulator.orchestration.votes import MAX_BODY, VoteServer
+
+
+async def _request(port: int, raw: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return data
+
+
+def _statuses(*raws: bytes):
+    async def scenario():
+        server = VoteServer("127.0.0.1", 0)
+        await server.start()
+        try:
+            return [(await _request(server.port, raw)).split(b"\r\n", 1)[0] for raw in raws]
+        finally:
+            await server.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_bad_content_length_is_rejected():
+    assert _statuses(
+        b"POST /votes HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+        b"POST /votes HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+        f"POST /votes HTTP/1.1\r\nContent-Length: {MAX_BODY + 1}\r\n\r\n".encode("ascii"),
+    ) == [b"HTTP/1.1 400 Bad Request", b"HTTP/1.1 400 Bad Request", b"HTTP/1.1 413 Payload Too Large"]